@@ -1,46 +1,12 @@
 
-"""Expose key Sterling OS enhancement modules."""
+"""Expose key Sterling OS enhancement modules.
 
-from . import (
-    agent_senate,
-    command_stream,
-    infrastructure_advisor,
-    memory_manager,
-    memory_timeline,
-    routine_engine,
-    patch_layer,
-    predictive_scene,
-    agent_orchestrator,
-    scene_delta_tracker,
-    escalation_engine,
-    behavior_audit,
-    audit_logger,
-    diplomacy_protocol,
-    scene_status_tracker,
-    resilience_engine,
-    scene_trace,
-    natural_scene_composer,
-    sterling_suggestions,
-    risk_intelligence,
-    self_writing,
-    predictive_recovery,
-    predictive_repair,
-    agent_rotation,
-    api_watchdog,
-    predictive_risk,
-    codex_diagnostics,
-    self_healing,
-    predictive_trust,
-    smart_router,
-    trust_registry,
-    intent_oracle,
-    reflex_path_builder,
-    persona_memory_handler,
-    memory_engine,
-    memory_logger,
-    reflex_intelligence,
-    platinum_dominion,
-)
+Submodules are imported on first attribute access so importing the package
+(or any one submodule) does not pull in, and run the import-time side effects
+of, every other module.
+"""
+
+from startup import lazy_submodules
 
 __all__ = [
     "agent_senate",
@@ -67,6 +33,7 @@ __all__ = [
     "predictive_recovery",
     "predictive_repair",
     "agent_rotation",
+    "scorecard_engine",
     "api_watchdog",
     "predictive_risk",
     "codex_diagnostics",
@@ -77,9 +44,14 @@ __all__ = [
     "intent_oracle",
     "reflex_path_builder",
     "persona_memory_handler",
+    "persona_memory_store",
     "memory_engine",
+    "memory_index",
     "memory_logger",
     "reflex_intelligence",
     "platinum_dominion",
 ]
 
+
+
+__getattr__, __dir__ = lazy_submodules(__name__, __all__)
@@ -1,53 +1,51 @@
-"""Rotate failing agents based on scorecard history."""
+"""Rotate failing agents based on scorecard history.
+
+Outcomes live in an in-memory :class:`ScorecardEngine` so rotation checks do
+no file I/O; ``SCORECARD_FILE`` is only written by periodic snapshots, on
+rotation and at interpreter exit.
+"""
 
 from __future__ import annotations
 
-import json
-import os
-from typing import Dict, List
+import atexit
 
 from addons.sterling_os import trust_registry
+from addons.sterling_os.scorecard_engine import ScorecardEngine
 
 SCORECARD_FILE = "agent_scorecard.json"
 WINDOW = 10
 FAIL_THRESHOLD = 3
 
-
-def _load() -> Dict[str, List[bool]]:
-    if os.path.exists(SCORECARD_FILE):
-        try:
-            return json.loads(open(SCORECARD_FILE).read())
-        except Exception:
-            return {}
-    return {}
+scorecards = ScorecardEngine(default_window=WINDOW)
 
 
-def _save(data: Dict[str, List[bool]]) -> None:
-    with open(SCORECARD_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+def flush() -> None:
+    """Persist pending scorecard changes to ``SCORECARD_FILE``."""
+    scorecards.flush(SCORECARD_FILE)
 
 
 def record_result(agent: str, success: bool) -> None:
-    data = _load()
-    history = data.get(agent, [])
-    history.append(bool(success))
-    history = history[-WINDOW:]
-    data[agent] = history
-    _save(data)
+    scorecards.ensure_loaded(SCORECARD_FILE)
+    scorecards.record(agent, success)
+    scorecards.maybe_snapshot(SCORECARD_FILE)
 
 
 def should_rotate(agent: str) -> bool:
-    history = _load().get(agent, [])
-    if len(history) < WINDOW:
+    scorecards.ensure_loaded(SCORECARD_FILE)
+    if not scorecards.is_full(agent):
         return False
-    return history.count(False) >= FAIL_THRESHOLD
+    return scorecards.failures(agent) >= FAIL_THRESHOLD
 
 
 def rotate_agent(agent: str) -> str | None:
     """Reduce trust weight and return alternate agent id."""
+    flush()
     trust_registry.update_weight(agent, -0.1)
     weights = trust_registry.load_weights()
     alt_candidates = {a: w for a, w in weights.items() if a != agent}
     if not alt_candidates:
         return None
     return max(alt_candidates.items(), key=lambda x: x[1])[0]
+
+
+atexit.register(flush)
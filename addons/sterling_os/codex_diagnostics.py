@@ -1,30 +1,21 @@
 from __future__ import annotations
 
-"""Simple diagnostics logger."""
+"""Simple diagnostics logger.
 
-import json
-import os
-from datetime import datetime, timezone
-from typing import List
+Risks are appended to a bounded, append-only log managed by
+:mod:`diagnostics_store`; nothing is re-read or rewritten per entry.
+"""
 
-DIAG_LOG = "diagnostics_log.json"
+from typing import List
 
+from diagnostics_store import DiagnosticsStore, get_store
 
-def _load() -> List[dict]:
-    if os.path.exists(DIAG_LOG):
-        try:
-            return json.loads(open(DIAG_LOG).read())
-        except Exception:
-            return []
-    return []
+DIAG_LOG = "diagnostics_log.jsonl"
 
 
-def _save(data: List[dict]) -> None:
-    with open(DIAG_LOG, "w") as f:
-        json.dump(data, f, indent=2)
+def store() -> DiagnosticsStore:
+    return get_store(DIAG_LOG)
 
 
 def log_risk(risks: List[str]) -> None:
-    log = _load()
-    log.append({"timestamp": datetime.now(timezone.utc).isoformat(), "risks": risks})
-    _save(log)
+    store().append(risks)
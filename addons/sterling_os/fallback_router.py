@@ -1,7 +1,14 @@
 import os
 
+import metrics
+from tracing import span, traced
+
 from . import memory_manager
 
+FALLBACK_REPLIES = metrics.counter(
+    "sterling_fallback_replies_total", "Fallback queries by the provider that answered.", ["provider"]
+)
+
 
 def _gemini_request(prompt: str) -> str:
     """Call the remote Gemini API. This stub intentionally raises to simulate
@@ -20,23 +27,29 @@ def _ollama_request(prompt: str) -> str:
     return result.get("response", "").strip()
 
 
+@traced("fallback")
 def route_query(prompt: str) -> str:
     """Return a reply using Gemini with Ollama fallback."""
     try:
-        reply = _gemini_request(prompt)
+        with span("gemini"):
+            reply = _gemini_request(prompt)
         if reply:
             memory_manager.add_event(f"gemini:{prompt}")
+            FALLBACK_REPLIES.inc(provider="gemini")
             return reply
     except Exception:
         pass
 
     try:
-        reply = _ollama_request(prompt)
+        with span("ollama"):
+            reply = _ollama_request(prompt)
         if reply:
             memory_manager.add_event(f"_ollama_fallback:{prompt}")
+            FALLBACK_REPLIES.inc(provider="ollama")
             return reply
     except Exception:
         pass
+    FALLBACK_REPLIES.inc(provider="none")
     return "I'm not sure."
 
 
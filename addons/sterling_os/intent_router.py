@@ -3,16 +3,32 @@
 import os
 from typing import Optional
 
-from .main import interpret_intent
+import metrics
+
 from . import memory_manager
 
 _OLLAMA_CACHE: dict[str, str] = {}
+LLM_CACHE = metrics.counter(
+    "sterling_llm_cache_requests_total", "Local LLM prompt cache lookups.", ["result"]
+)
+
+
+def interpret_intent(intent: str) -> str:
+    """Map intent strings to human-readable responses."""
+    mapping = {
+        "SterlingDailyBriefing": "Give me my daily briefing",
+        "SterlingCheckGarage": "Is the garage door closed?",
+        "SterlingRunScene": "Run the evening lights scene",
+    }
+    return mapping.get(intent, "I'm not sure how to help with that.")
 
 
 def _local_llm_response(prompt: str) -> str:
     """Return a response from the local Ollama model if available."""
     if prompt in _OLLAMA_CACHE:
+        LLM_CACHE.inc(result="hit")
         return _OLLAMA_CACHE[prompt]
+    LLM_CACHE.inc(result="miss")
 
     try:
         import ollama
@@ -1,61 +1,87 @@
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, jsonify, request
 import json
 from pathlib import Path
 
 from . import memory_manager
-from . import devgpt_engine
 from . import intent_router
 from . import fallback_router
-from .autonomy_engine import AutonomyEngine
 from . import timeline_orchestrator
-from . import scene_executor
+from .intent_router import interpret_intent
 
 import sys
 import os
 import importlib.util
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, REPO_ROOT)
-spec = importlib.util.spec_from_file_location('cognitive_router', os.path.join(REPO_ROOT, 'cognitive_router.py'))
-cognitive_router = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(cognitive_router)
 
-app = Flask(__name__)
+from startup import on_startup, run_startup_hooks
+import metrics
+import tracing
+
+bp = Blueprint("sterling_os", __name__)
 
-# Load configuration
 CONFIG_PATH = Path(__file__).parent / "config.json"
-if CONFIG_PATH.exists():
-    with CONFIG_PATH.open() as f:
-        CONFIG = json.load(f)
-else:
-    CONFIG = {}
 
-DEV_MODE = CONFIG.get("dev_mode", False)
-MEMORY_ENABLED = CONFIG.get("memory_enabled", True)
-ENABLE_DEVGPT = CONFIG.get("enable_devgpt", False)
+_engine = None
+
+
+def load_config() -> dict:
+    """Return the add-on configuration, or ``{}`` when it is missing."""
+    if CONFIG_PATH.exists():
+        with CONFIG_PATH.open() as f:
+            return json.load(f)
+    return {}
+
+
+def __getattr__(name):
+    # ``cognitive_router`` drags in jsonschema and every agent handler, so it
+    # is loaded from the repository root on first use instead of at import.
+    if name == "cognitive_router":
+        spec = importlib.util.spec_from_file_location(
+            'cognitive_router', os.path.join(REPO_ROOT, 'cognitive_router.py')
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        globals()["cognitive_router"] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _cognitive_router():
+    return globals().get("cognitive_router") or __getattr__("cognitive_router")
+
+
+def get_engine():
+    """Return the process-wide :class:`AutonomyEngine`, creating it lazily."""
+    global _engine
+    if _engine is None:
+        from .autonomy_engine import AutonomyEngine
 
-if MEMORY_ENABLED:
-    memory_manager.load_memory()
+        _engine = AutonomyEngine()
+    return _engine
 
-engine = AutonomyEngine()
 
+@on_startup
+def _warm_memory() -> None:
+    if load_config().get("memory_enabled", True):
+        memory_manager.load_memory()
 
-def interpret_intent(intent: str) -> str:
-    """Map intent strings to human-readable responses."""
-    mapping = {
-        "SterlingDailyBriefing": "Give me my daily briefing",
-        "SterlingCheckGarage": "Is the garage door closed?",
-        "SterlingRunScene": "Run the evening lights scene",
-    }
-    return mapping.get(intent, "I'm not sure how to help with that.")
 
+@on_startup
+def _start_thread_scheduler() -> None:
+    if load_config().get("scheduler_enabled", True):
+        from threads.predictive_scheduler import start_scheduler
 
-@app.route("/sterling/health", methods=["GET"])
+        start_scheduler()
+
+
+@bp.route("/sterling/health", methods=["GET"])
 def health_check():
     """Simple health check endpoint."""
     return jsonify({"status": "ok"})
 
 
-@app.route("/sterling/assistant", methods=["POST"])
+@bp.route("/sterling/assistant", methods=["POST"])
 def sterling_assistant():
     """Route generic assistant queries through the intent router."""
     data = request.get_json(force=True)
@@ -64,16 +90,16 @@ def sterling_assistant():
     return jsonify({"response": response})
 
 
-@app.route('/sterling/route', methods=['POST'])
+@bp.route('/sterling/route', methods=['POST'])
 def cognitive_route():
     """Route a query through the cognitive router."""
     data = request.get_json(force=True)
     query = data.get('query') or ''
-    result = cognitive_router.handle_request(query)
+    result = _cognitive_router().handle_request(query)
     return jsonify(result)
 
 
-@app.route('/ha-chat', methods=['POST'])
+@bp.route('/ha-chat', methods=['POST'])
 def ha_chat():
     token = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
     expected = os.environ.get('HA_TOKEN')
@@ -81,17 +107,17 @@ def ha_chat():
         return jsonify({'error': 'unauthorized'}), 401
     data = request.get_json(force=True)
     query = data.get('message', '')
-    result = cognitive_router.route_with_self_critique(query)
+    result = _cognitive_router().route_with_self_critique(query)
     return jsonify(result)
 
 
-@app.route("/etsy/orders", methods=["GET"])
+@bp.route("/etsy/orders", methods=["GET"])
 def etsy_orders():
     """Return an empty list of orders as a stub."""
     return jsonify({"results": []})
 
 
-@app.route("/sterling/info", methods=["GET"])
+@bp.route("/sterling/info", methods=["GET"])
 def sterling_info():
     """Return basic version and status information."""
     return jsonify({
@@ -100,7 +126,7 @@ def sterling_info():
     })
 
 
-@app.route('/sterling/intent', methods=['POST'])
+@bp.route('/sterling/intent', methods=['POST'])
 def handle_intent():
     """Return a response string for the provided intent or phrase."""
     data = request.get_json(force=True)
@@ -109,7 +135,7 @@ def handle_intent():
     return jsonify({"response": response})
 
 
-@app.route('/sterling/contextual', methods=['POST'])
+@bp.route('/sterling/contextual', methods=['POST'])
 def contextual_intent():
     """Route phrases with memory-based fallback suggestions."""
     data = request.get_json(force=True)
@@ -118,7 +144,7 @@ def contextual_intent():
     return jsonify({"response": response})
 
 
-@app.route('/sterling/fallback/query', methods=['POST'])
+@bp.route('/sterling/fallback/query', methods=['POST'])
 def fallback_query():
     """Return a response using Gemini with Ollama fallback."""
     data = request.get_json(force=True)
@@ -127,34 +153,35 @@ def fallback_query():
     return jsonify({'response': reply})
 
 
-@app.route('/sterling/scene', methods=['POST'])
+@bp.route('/sterling/scene', methods=['POST'])
 def run_scene():
     """Execute a named scene immediately."""
     data = request.get_json(force=True)
     name = data.get('name') or ''
     import asyncio
+    from . import scene_executor
     result = asyncio.run(scene_executor.execute_scene(name))
     return jsonify({'success': result})
 
 
-@app.route('/sterling/autonomy/start', methods=['POST'])
+@bp.route('/sterling/autonomy/start', methods=['POST'])
 def autonomy_start():
     """Add a scene to the autonomy stack."""
     data = request.get_json(force=True)
     name = data.get('name') or ''
-    engine.start_task(name)
+    get_engine().start_task(name)
     return jsonify({'queued': name})
 
 
-@app.route('/sterling/autonomy/next', methods=['POST'])
+@bp.route('/sterling/autonomy/next', methods=['POST'])
 def autonomy_next():
     """Run the next task in the autonomy engine."""
     import asyncio
-    scene = asyncio.run(engine.run_next())
+    scene = asyncio.run(get_engine().run_next())
     return jsonify({'executed': scene})
 
 
-@app.route('/sterling/intent/escalate', methods=['POST'])
+@bp.route('/sterling/intent/escalate', methods=['POST'])
 def intent_escalate():
     """Placeholder route for escalation logic."""
     data = request.get_json(force=True)
@@ -162,35 +189,63 @@ def intent_escalate():
     return jsonify({"status": "escalated"})
 
 
-@app.route('/sterling/history', methods=['GET'])
+@bp.route('/sterling/history', methods=['GET'])
 def get_history():
     """Return stored event history from the memory manager."""
     return jsonify(memory_manager.load_memory())
 
 
-@app.route('/sterling/timeline', methods=['GET'])
+@bp.route('/sterling/timeline', methods=['GET'])
 def get_timeline():
     """Return the memory timeline events."""
     return jsonify(memory_manager.get_timeline())
 
 
-@app.route('/sterling/timeline/summary', methods=['GET'])
+@bp.route('/sterling/timeline/summary', methods=['GET'])
 def get_timeline_summary():
-    """Return a short summary of recent events."""
-    summary = timeline_orchestrator.timeline_summary()
+    """Return a short summary of recent events.
+
+    ``?days=N`` summarizes the last ``N`` days from timeline rollups.
+    """
+    days = request.args.get('days', type=int)
+    summary = timeline_orchestrator.timeline_summary(days=days)
     return jsonify({'summary': summary})
 
 
-@app.route('/sterling/failsafe/reset', methods=['POST'])
+@bp.route('/sterling/failsafe/reset', methods=['POST'])
 def failsafe_reset():
     """Reset memory and return safe mode status."""
     memory_manager.reset_memory()
     return jsonify({"status": "safe_mode", "message": "Sterling OS reset"})
 
 
+def create_app() -> Flask:
+    """Build the Sterling OS add-on app.
+
+    Startup hooks run once per process: at launch when run as a script,
+    otherwise before the first request.  Every
+    request is traced (see :mod:`tracing` for the timing header) and
+    counted in the registry served at ``/metrics``.
+    """
+    app = Flask(__name__)
+    app.config["STERLING"] = load_config()
+    app.register_blueprint(bp)
+    tracing.init_app(app)
+    metrics.init_app(app)
+    app.before_request(run_startup_hooks)
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     print("Sterling OS Add-on Running")
-    if DEV_MODE and ENABLE_DEVGPT:
+    # start background work (the thread scheduler) now, not on first request
+    run_startup_hooks()
+    config = load_config()
+    if config.get("dev_mode", False) and config.get("enable_devgpt", False):
+        from . import devgpt_engine
         devgpt_engine.run("startup", user_confirm=False, enabled=True)
     try:
         app.run(host="0.0.0.0", port=5000)
@@ -1,18 +1,14 @@
 from __future__ import annotations
 
-import difflib
-import json
-from pathlib import Path
 from typing import Any, List, Dict
 
+from addons.sterling_os import memory_index
+
 
 def adaptive_memory_match(query: str, persona_context: str) -> List[Dict[str, Any]]:
     """Return memory entries that best match the query."""
-    memory_path = Path("addons/sterling_os/memory") / f"{persona_context}_memory.json"
     try:
-        with open(memory_path, "r") as f:
-            entries = json.load(f)
-        matches = difflib.get_close_matches(query, [e.get("topic", "") for e in entries], n=3, cutoff=0.5)
-        return [e for e in entries if e.get("topic") in matches]
+        index = memory_index.get_index(persona_context)
+        return [entry for _, entry in index.search(query, k=3, threshold=0.5)]
     except Exception as e:
         return [{"error": f"Memory access failed: {e}"}]
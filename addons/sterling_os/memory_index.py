@@ -0,0 +1,183 @@
+"""Character-trigram search index over persona memory entries.
+
+Every entry's ``topic`` and ``summary`` are broken into character trigrams
+and stored in an inverted index of ascending entry ids.  A query scores each
+entry by the IDF-weighted share of the query's trigrams found in the entry.
+Candidates are generated only from the rarest query trigrams (a weighted
+prefix filter) under a fixed posting budget, so common trigrams never cause a
+scan over the whole memory.
+
+Indexes cover a persona's rollups and raw entries from
+:mod:`persona_memory_store`.  They are cached per persona and rebuilt only
+when the store changes on disk behind our back; :func:`add_entry` keeps a
+cached index current after in-process writes.  Compaction drops the cached
+index, so the next search rebuilds it from the rollups and the retained
+segments and an index never outgrows its store.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from addons.sterling_os import persona_memory_store
+
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_TOP_K = 3
+MAX_CANDIDATES = 2048
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_EMPTY = array("I")
+
+
+@lru_cache(maxsize=65536)
+def _word_trigrams(word: str) -> FrozenSet[str]:
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of character trigrams of normalized ``text``."""
+    grams: Set[str] = set()
+    for word in _NON_WORD.sub(" ", text.lower()).split():
+        grams.update(_word_trigrams(word))
+    return grams
+
+
+class TrigramIndex:
+    """Append-only trigram inverted index with top-k similarity search."""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()) -> None:
+        self.entries: List[Dict[str, Any]] = []
+        self.postings: Dict[str, array] = {}
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: Dict[str, Any]) -> int:
+        """Index ``entry`` and return its id."""
+        doc_id = len(self.entries)
+        self.entries.append(entry)
+        text = f"{entry.get('topic', '')} {entry.get('summary', '')}"
+        postings = self.postings
+        for gram in trigrams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("I")
+            posting.append(doc_id)
+        return doc_id
+
+    def search(
+        self,
+        query: str,
+        k: int = DEFAULT_TOP_K,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_candidates: int = MAX_CANDIDATES,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return up to ``k`` ``(score, entry)`` pairs, best first.
+
+        ``score`` is the IDF-weighted share of query trigrams present in the
+        entry and only entries scoring at least ``threshold`` are returned.
+        At most ``max_candidates`` posting ids are read to generate
+        candidates, newest first when a single trigram exceeds the budget.
+        """
+        grams = trigrams(query)
+        live = len(self)
+        if not grams or k <= 0 or live <= 0:
+            return []
+        weighted = []
+        for gram in grams:
+            posting = self.postings.get(gram, _EMPTY)
+            weighted.append((math.log1p(live / (len(posting) or 1)), posting))
+        weighted.sort(key=lambda item: len(item[1]))
+        total = sum(weight for weight, _ in weighted)
+        needed = threshold * total
+
+        # Candidates come from the rarest trigrams: a qualifying entry must
+        # hit at least one of them once the remaining common trigrams can no
+        # longer reach ``needed`` on their own.
+        hits: Dict[int, float] = {}
+        remaining = total
+        budget = max_candidates
+        used = 0
+        for weight, posting in weighted:
+            if remaining < needed or budget <= 0:
+                break
+            ids = posting[-budget:] if len(posting) > budget else posting
+            budget -= len(ids)
+            if not hits:
+                hits = dict.fromkeys(ids, weight)
+            else:
+                get = hits.get
+                for doc_id in ids:
+                    hits[doc_id] = get(doc_id, 0.0) + weight
+            remaining -= weight
+            used += 1
+
+        # Rank on the partial score, then verify the leaders against the
+        # common trigrams that were not used for candidate generation.
+        rest = weighted[used:]
+        leaders = heapq.nlargest(k * 4, hits, key=hits.__getitem__)
+        scored: List[Tuple[float, int]] = []
+        for doc_id in leaders:
+            score = hits[doc_id]
+            for weight, posting in rest:
+                pos = bisect_left(posting, doc_id)
+                if pos < len(posting) and posting[pos] == doc_id:
+                    score += weight
+            if score >= needed:
+                scored.append((score / total, doc_id))
+        best = heapq.nlargest(k, scored)
+        return [(round(score, 4), self.entries[doc_id]) for score, doc_id in best]
+
+
+_CACHE: Dict[str, Tuple[Tuple[Any, ...], TrigramIndex]] = {}
+_LOCK = threading.Lock()
+
+
+def get_index(persona_context: str) -> TrigramIndex:
+    """Return the cached index for ``persona_context``, rebuilding if stale."""
+    store = persona_memory_store.get_store(persona_context)
+    signature = store.signature()
+    with _LOCK:
+        cached = _CACHE.get(persona_context)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        index = TrigramIndex(store.iter_entries())
+        _CACHE[persona_context] = (signature, index)
+        return index
+
+
+def add_entry(persona_context: str, entry: Dict[str, Any]) -> None:
+    """Add ``entry`` to a cached index after it was appended to the store.
+
+    When no index is cached yet nothing happens; the next :func:`get_index`
+    builds one from the store.
+    """
+    with _LOCK:
+        cached = _CACHE.get(persona_context)
+        if cached is None:
+            return
+        index = cached[1]
+        index.add(entry)
+        signature = persona_memory_store.get_store(persona_context).signature()
+        _CACHE[persona_context] = (signature, index)
+
+
+def invalidate(persona_context: str | None = None) -> None:
+    with _LOCK:
+        if persona_context is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(persona_context, None)
+
+
+persona_memory_store.on_compact(invalidate)
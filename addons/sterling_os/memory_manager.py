@@ -8,6 +8,11 @@ from typing import Optional, List, Dict
 
 from json_store import JSONStore
 
+try:
+    from . import timeline_rollups
+except ImportError:  # loaded by file path outside the package
+    from addons.sterling_os import timeline_rollups
+
 MEMORY_STORE = JSONStore(Path(__file__).resolve().parent / "memory_timeline.json", default=[])
 
 
@@ -29,7 +34,12 @@ def load_memory() -> List[Dict]:
 
 
 def add_event(event: str) -> None:
-    """Append a timestamped event string to the timeline."""
+    """Append a timestamped event string to the timeline.
+
+    The new event is also folded into the in-memory timeline rollups, which
+    are written back in batches, so history queries never have to read the
+    raw timeline.
+    """
     data = load_memory()
     data.append(
         asdict(
@@ -40,6 +50,7 @@ def add_event(event: str) -> None:
         )
     )
     MEMORY_STORE.write(data)
+    timeline_rollups.for_store(MEMORY_STORE).fold(data)
 
 
 def log_phrase(query: str, intent: Optional[str] = None) -> None:
@@ -61,6 +72,7 @@ def log_phrase(query: str, intent: Optional[str] = None) -> None:
 def reset_memory() -> list:
     """Clear the timeline file and return an empty list."""
     MEMORY_STORE.write([])
+    timeline_rollups.for_store(MEMORY_STORE).fold([])
     _RECENT_PHRASE_CACHE.clear()
     return []
 
@@ -6,6 +6,11 @@ from typing import List, Dict
 
 from json_store import JSONStore
 
+try:
+    from . import timeline_rollups
+except ImportError:  # loaded by file path outside the package
+    from addons.sterling_os import timeline_rollups
+
 STORE = JSONStore(Path(__file__).resolve().parent / "memory_timeline.json", default=[])
 
 
@@ -25,4 +30,5 @@ def log_event(action: str, result: str, initiator: str) -> Dict:
     data = load_timeline()
     data.append(entry)
     STORE.write(data)
+    timeline_rollups.for_store(STORE).fold(data)
     return entry
@@ -0,0 +1,216 @@
+"""Append-only persona memory stored as JSONL segments.
+
+Each persona gets a directory under ``MEMORY_DIR`` holding numbered
+``segment-NNNNNN.jsonl`` files.  New entries are appended to the newest
+segment, so a write costs one short append no matter how much history has
+accumulated.  Once more than ``max_segments`` raw segments exist the oldest
+ones are folded into summarized rows in ``rollups.jsonl`` and removed, which
+keeps years of memory searchable at a bounded size.  Callbacks registered
+with :func:`on_compact` are told when that happens so derived caches can be
+dropped.  The most recent entries are also kept in memory as a hot tail.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+
+MEMORY_DIR = Path("addons/sterling_os/memory")
+SEGMENT_SIZE = 1000
+MAX_SEGMENTS = 50
+HOT_SIZE = 100
+ROLLUP_TOPICS = 10
+
+ROLLUP_FILE = "rollups.jsonl"
+
+_COMPACT_HOOKS: List[Callable[[str], None]] = []
+
+
+def on_compact(func: Callable[[str], None]) -> Callable[[str], None]:
+    """Register ``func(persona)`` to run after a persona's store is compacted."""
+    if func not in _COMPACT_HOOKS:
+        _COMPACT_HOOKS.append(func)
+    return func
+
+
+def legacy_path(persona_context: str, root: Path | None = None) -> Path:
+    """Return the pre-segment ``<persona>_memory.json`` location."""
+    return (root or MEMORY_DIR) / f"{persona_context}_memory.json"
+
+
+def _read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def summarize_segment(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fold raw ``entries`` into a single rollup row."""
+    topics = Counter(e.get("topic", "") for e in entries if e.get("topic"))
+    latest: Dict[str, str] = {}
+    for e in entries:
+        if e.get("topic"):
+            latest[e["topic"]] = e.get("summary", "")
+    top = topics.most_common(ROLLUP_TOPICS)
+    start = entries[0].get("timestamp") if entries else None
+    end = entries[-1].get("timestamp") if entries else None
+    return {
+        "rollup": True,
+        "timestamp": end,
+        "start": start,
+        "end": end,
+        "count": len(entries),
+        "topic": "; ".join(t for t, _ in top[:5])[:200],
+        "summary": " | ".join(latest[t] for t, _ in top[:3])[:200],
+        "top_topics": [[t, c] for t, c in top],
+    }
+
+
+class PersonaMemoryStore:
+    """Segmented JSONL memory log for a single persona."""
+
+    def __init__(
+        self,
+        persona_context: str,
+        root: Path | None = None,
+        segment_size: int = SEGMENT_SIZE,
+        max_segments: int = MAX_SEGMENTS,
+        hot_size: int = HOT_SIZE,
+    ) -> None:
+        self.persona = persona_context
+        self.root = Path(root or MEMORY_DIR)
+        self.directory = self.root / persona_context
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.hot: Deque[Dict[str, Any]] = deque(maxlen=hot_size)
+        self._lock = threading.Lock()
+        self._open()
+
+    # -- layout -----------------------------------------------------------
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob("segment-*.jsonl"))
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"segment-{number:06d}.jsonl"
+
+    @property
+    def rollup_path(self) -> Path:
+        return self.directory / ROLLUP_FILE
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self.segments()
+        if not segments:
+            self._import_legacy()
+            segments = self.segments()
+        if segments:
+            self._active = segments[-1]
+            self._active_count = sum(1 for _ in _read_jsonl(self._active))
+        else:
+            self._active = self._segment_path(1)
+            self._active_count = 0
+        for segment in segments[-2:]:
+            self.hot.extend(_read_jsonl(segment))
+
+    def _import_legacy(self) -> None:
+        legacy = legacy_path(self.persona, self.root)
+        try:
+            entries = json.loads(legacy.read_text())
+        except Exception:
+            return
+        if isinstance(entries, list) and entries:
+            with open(self._segment_path(1), "w") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+
+    # -- writes -----------------------------------------------------------
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Append ``entry`` to the active segment, rolling when it is full."""
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            if self._active_count >= self.segment_size:
+                number = int(self._active.stem.split("-")[1]) + 1
+                self._active = self._segment_path(number)
+                self._active_count = 0
+                self._compact_locked()
+            with open(self._active, "a") as f:
+                f.write(line)
+            self._active_count += 1
+            self.hot.append(entry)
+
+    def compact(self) -> int:
+        """Fold segments beyond ``max_segments`` into rollups.
+
+        Returns the number of segments folded.
+        """
+        with self._lock:
+            return self._compact_locked()
+
+    def _compact_locked(self) -> int:
+        segments = [s for s in self.segments() if s != self._active]
+        excess = len(segments) + 1 - self.max_segments
+        if excess <= 0:
+            return 0
+        with open(self.rollup_path, "a") as f:
+            for segment in segments[:excess]:
+                entries = list(_read_jsonl(segment))
+                if entries:
+                    f.write(json.dumps(summarize_segment(entries)) + "\n")
+        for segment in segments[:excess]:
+            segment.unlink(missing_ok=True)
+        for hook in list(_COMPACT_HOOKS):
+            hook(self.persona)
+        return excess
+
+    # -- reads ------------------------------------------------------------
+    def recent(self, count: int | None = None) -> List[Dict[str, Any]]:
+        """Return the newest ``count`` entries from the hot tail."""
+        items = list(self.hot)
+        return items if count is None else items[-count:]
+
+    def rollups(self) -> Iterator[Dict[str, Any]]:
+        return _read_jsonl(self.rollup_path)
+
+    def iter_entries(self, include_rollups: bool = True) -> Iterator[Dict[str, Any]]:
+        """Stream rollups (oldest history) followed by raw entries."""
+        if include_rollups:
+            yield from self.rollups()
+        for segment in self.segments():
+            yield from _read_jsonl(segment)
+
+    def signature(self) -> Tuple[Any, ...]:
+        """Cheap fingerprint that changes whenever the store is modified."""
+        parts = []
+        for path in (self.rollup_path, *self.segments()[-1:]):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            parts.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(parts)
+
+
+_STORES: Dict[Tuple[Path, str], PersonaMemoryStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(persona_context: str) -> PersonaMemoryStore:
+    """Return the process-wide store for ``persona_context``."""
+    key = (Path(MEMORY_DIR), persona_context)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = PersonaMemoryStore(persona_context, key[0])
+        return store
@@ -1,15 +1,35 @@
 from __future__ import annotations
 
-"""Track differences between current and expected automation scenes."""
+"""Track differences between current and expected automation scenes.
 
+Entities are diffed structurally: nested attribute dicts are walked along
+the keys of the expected model and every mismatching leaf is reported under a
+dotted key such as ``light.kitchen.attributes.brightness``.
+
+:func:`update_delta` is incremental.  A fingerprint of each entity's
+``(current, expected)`` pair is kept between runs and only entities whose
+fingerprint moved are compared; if neither state file changed on disk the
+run is skipped outright.  Only mismatches that are new or whose values moved
+are emitted to the append-only JSON Lines change feed ``delta_log.jsonl``
+(run state is kept beside it in ``delta_log.state.json``).  Each record
+carries a ``seq``, the ``entity`` and dotted ``key``, and either
+``current``/``expected`` values or ``"resolved": true`` once the key matches
+again.  :func:`sterling_suggestions.suggest_from_feed` follows the feed with
+:func:`read_feed` and a byte offset.
+"""
+
+from datetime import datetime, timezone
 from pathlib import Path
 import json
-import yaml
-from typing import Dict
+import os
+import zlib
+from typing import Any, Dict, Iterator, List, Tuple
 
 CURRENT_STATE_FILE = Path(__file__).resolve().parent / "current_scene_state.json"
 EXPECTED_MODEL_FILE = Path(__file__).resolve().parent / "expected_behavior_model.json"
-DELTA_LOG_FILE = Path(__file__).resolve().parent / "delta_log.yaml"
+DELTA_LOG_FILE = Path(__file__).resolve().parent / "delta_log.jsonl"
+
+_MISSING = object()
 
 
 def _load_json(path: Path) -> Dict:
@@ -18,24 +38,175 @@ def _load_json(path: Path) -> Dict:
     return {}
 
 
+def _signature(path: Path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _fingerprint(current: Any, expected: Any) -> int:
+    raw = json.dumps([current, expected], sort_keys=True, separators=(",", ":"), default=str)
+    return zlib.crc32(raw.encode())
+
+
+def diff(current: Any, expected: Any, path: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], Any, Any]]:
+    """Yield ``(path, current, expected)`` for each mismatching leaf.
+
+    Only keys present in ``expected`` are compared; lists are compared whole.
+    """
+    if isinstance(expected, dict) and isinstance(current, dict):
+        for key, value in expected.items():
+            yield from diff(current.get(key, _MISSING), value, path + (str(key),))
+    elif current is _MISSING:
+        yield path, None, expected
+    elif current != expected:
+        yield path, current, expected
+
+
 def compute_delta(current: Dict, expected: Dict) -> Dict:
-    """Return a dict describing mismatches between states."""
+    """Return ``{dotted_key: {"current": ..., "expected": ...}}`` mismatches."""
     delta: Dict[str, Dict[str, object]] = {}
-    for key, value in expected.items():
-        if current.get(key) != value:
-            delta[key] = {"current": current.get(key), "expected": value}
+    for entity, value in expected.items():
+        for path, cur, exp in diff(current.get(entity, _MISSING), value, (str(entity),)):
+            delta[".".join(path)] = {"current": cur, "expected": exp}
     return delta
 
 
+def _state_path() -> Path:
+    return DELTA_LOG_FILE.with_name(f"{DELTA_LOG_FILE.stem}.state.json")
+
+
+def _sources() -> List[str]:
+    return [str(CURRENT_STATE_FILE), str(EXPECTED_MODEL_FILE)]
+
+
+def _load_state() -> Dict:
+    try:
+        state = json.loads(_state_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    # fingerprints only hold for the files they were taken from
+    return state if state.get("sources") == _sources() else {"seq": state.get("seq", 0)}
+
+
+def _save_state(state: Dict) -> None:
+    path = _state_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def _append_feed(records: List[Dict]) -> None:
+    if not records:
+        return
+    DELTA_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(DELTA_LOG_FILE, "a") as f:
+        f.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+
+
 def update_delta() -> Dict:
-    """Load state files, compute delta and append to log."""
+    """Compare entities that changed since the last run and append their drift.
+
+    Returns the mismatches found in this run, keyed as in
+    :func:`compute_delta`; use :func:`current_drift` for everything still
+    outstanding.
+    """
+    state = _load_state()
+    signatures = [_signature(CURRENT_STATE_FILE), _signature(EXPECTED_MODEL_FILE)]
+    if state.get("signatures") == signatures:
+        return {}
     current = _load_json(CURRENT_STATE_FILE)
     expected = _load_json(EXPECTED_MODEL_FILE)
-    delta = compute_delta(current, expected)
-    if delta:
-        log = []
-        if DELTA_LOG_FILE.exists():
-            log = yaml.safe_load(DELTA_LOG_FILE.read_text()) or []
-        log.append(delta)
-        DELTA_LOG_FILE.write_text(yaml.safe_dump(log, sort_keys=False))
+    fingerprints: Dict[str, int] = state.get("fingerprints", {})
+    drifting: Dict[str, Dict] = state.get("drift", {})
+    seq = state.get("seq", 0)
+    stamp = datetime.now(timezone.utc).isoformat()
+    delta: Dict[str, Dict[str, object]] = {}
+    records: List[Dict] = []
+
+    def emit(entity: str, key: str, change: Dict | None) -> None:
+        nonlocal seq
+        seq += 1
+        record = {"seq": seq, "timestamp": stamp, "entity": entity, "key": key}
+        record.update(change if change is not None else {"resolved": True})
+        records.append(record)
+
+    for entity in set(fingerprints) - set(expected):
+        # dropped from the expected model: nothing to drift from any more
+        del fingerprints[entity]
+        for key in drifting.pop(entity, {}):
+            emit(entity, key, None)
+
+    for entity, value in expected.items():
+        cur = current.get(entity, _MISSING)
+        fp = _fingerprint(None if cur is _MISSING else cur, value)
+        if fingerprints.get(entity) == fp:
+            continue
+        fingerprints[entity] = fp
+        before = drifting.pop(entity, {})
+        changes = {
+            ".".join(path): {"current": c, "expected": e}
+            for path, c, e in diff(cur, value, (entity,))
+        }
+        for key, change in changes.items():
+            if before.get(key) != change:
+                emit(entity, key, change)
+                delta[key] = change
+        for key in before.keys() - changes.keys():
+            emit(entity, key, None)
+        if changes:
+            drifting[entity] = changes
+
+    _append_feed(records)
+    _save_state({
+        "sources": _sources(),
+        "signatures": signatures,
+        "seq": seq,
+        "fingerprints": fingerprints,
+        "drift": drifting,
+    })
     return delta
+
+
+def current_drift() -> Dict:
+    """Return every outstanding mismatch as of the last :func:`update_delta`."""
+    delta: Dict[str, Dict] = {}
+    for changes in _load_state().get("drift", {}).values():
+        delta.update(changes)
+    return delta
+
+
+def read_feed(offset: int = 0, path: Path | None = None) -> Tuple[List[Dict], int]:
+    """Return feed records after byte ``offset`` and the offset to resume from.
+
+    A trailing partial line is left for the next call.
+    """
+    path = Path(path or DELTA_LOG_FILE)
+    records: List[Dict] = []
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return records, offset
+    with f:
+        if os.fstat(f.fileno()).st_size < offset:
+            offset = 0  # the feed was truncated or replaced
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            if line.strip():
+                records.append(json.loads(line))
+    return records, offset
+
+
+__all__ = [
+    "compute_delta",
+    "current_drift",
+    "diff",
+    "read_feed",
+    "update_delta",
+]
@@ -1,10 +1,13 @@
 import json
 import os
+import time
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable
 
 import aiohttp
 
+import metrics
+
 HOME_ASSISTANT_URL = os.environ.get("HOME_ASSISTANT_URL", "http://localhost:8123")
 
 from . import memory_manager
@@ -14,17 +17,37 @@ SCENE_MAP_PATH = os.environ.get(
     str(Path(__file__).resolve().parent / "scene_mapper.json"),
 )
 
+SCENE_SECONDS = metrics.histogram(
+    "sterling_scene_execution_seconds", "Home Assistant scene execution latency.", ["result"]
+)
+
+
+_scene_map: Dict[str, object] = {"signature": None, "data": {}}
+
 
 def load_scene_map() -> Dict[str, str]:
-    """Return the scene mapping dictionary."""
+    """Return the scene mapping dictionary, re-read only when the file changes."""
     path = Path(SCENE_MAP_PATH)
-    if path.exists():
-        try:
-            with path.open() as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+    try:
+        stat = path.stat()
+    except OSError:
+        return {}
+    signature = (str(path), stat.st_mtime_ns, stat.st_size)
+    if _scene_map["signature"] == signature:
+        return _scene_map["data"]
+    try:
+        with path.open() as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    _scene_map.update(signature=signature, data=data)
+    return data
+
+
+def prewarm(names: Iterable[str]) -> Dict[str, str]:
+    """Resolve ``names`` to entity ids ahead of execution (e.g. predicted scenes)."""
+    scenes = load_scene_map()
+    return {name: scenes[name] for name in names if name in scenes}
 
 
 async def execute_scene(name: str) -> bool:
@@ -35,12 +58,15 @@ async def execute_scene(name: str) -> bool:
         memory_manager.add_event(f"scene_unknown:{name}")
         return False
     url = f"{HOME_ASSISTANT_URL}/api/services/scene/turn_on"
+    start = time.perf_counter()
     try:
         async with aiohttp.ClientSession() as session:
             async with session.post(url, json={"entity_id": entity_id}, timeout=2) as resp:
                 resp.raise_for_status()
+        SCENE_SECONDS.observe(time.perf_counter() - start, result="ok")
         memory_manager.add_event(f"scene:{name}")
         return True
     except Exception:
+        SCENE_SECONDS.observe(time.perf_counter() - start, result="error")
         memory_manager.add_event(f"scene_error:{name}")
         return False
@@ -0,0 +1,183 @@
+"""In-memory agent scorecards stored as fixed-width bit rings.
+
+Each agent keeps its most recent outcomes in a :class:`BitRing` where a set
+bit marks a failure, so the failure tally is a single popcount.  Windows can
+be configured per agent class (the ``type`` recorded in
+``trust_weights.json``) and the engine snapshots itself to disk periodically
+instead of on every result.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_WINDOW = 10
+SNAPSHOT_INTERVAL = 30.0
+
+
+class BitRing:
+    """Fixed-width ring of outcomes where a set bit records a failure."""
+
+    __slots__ = ("width", "bits", "pos", "size")
+
+    def __init__(self, width: int) -> None:
+        if width < 1:
+            raise ValueError("width must be positive")
+        self.width = width
+        self.bits = 0
+        self.pos = 0
+        self.size = 0
+
+    def push(self, success: bool) -> None:
+        mask = 1 << self.pos
+        if success:
+            self.bits &= ~mask
+        else:
+            self.bits |= mask
+        self.pos = (self.pos + 1) % self.width
+        if self.size < self.width:
+            self.size += 1
+
+    def failures(self) -> int:
+        return self.bits.bit_count()
+
+    def is_full(self) -> bool:
+        return self.size == self.width
+
+    def to_list(self) -> List[bool]:
+        """Return outcomes oldest first, ``True`` meaning success."""
+        start = (self.pos - self.size) % self.width
+        return [
+            not (self.bits >> ((start + i) % self.width)) & 1
+            for i in range(self.size)
+        ]
+
+    @classmethod
+    def from_list(cls, history: List[bool], width: int) -> "BitRing":
+        ring = cls(width)
+        for outcome in history[-width:]:
+            ring.push(bool(outcome))
+        return ring
+
+
+def _classes_from_trust_weights() -> Dict[str, str]:
+    path = Path(__file__).with_name("trust_weights.json")
+    try:
+        raw = json.loads(path.read_text())
+    except Exception:
+        return {}
+    return {
+        agent: entry["type"]
+        for agent, entry in raw.items()
+        if isinstance(entry, dict) and "type" in entry
+    }
+
+
+class ScorecardEngine:
+    """Track recent agent outcomes in memory with periodic snapshots."""
+
+    def __init__(
+        self,
+        default_window: int = DEFAULT_WINDOW,
+        class_windows: Optional[Dict[str, int]] = None,
+        classify: Optional[Callable[[str], Optional[str]]] = None,
+        snapshot_interval: float = SNAPSHOT_INTERVAL,
+    ) -> None:
+        self.default_window = default_window
+        self.class_windows: Dict[str, int] = dict(class_windows or {})
+        self.snapshot_interval = snapshot_interval
+        self._classify = classify
+        self._classes: Optional[Dict[str, str]] = None
+        self._rings: Dict[str, BitRing] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._last_snapshot = time.monotonic()
+
+    def agent_class(self, agent: str) -> Optional[str]:
+        if self._classify is not None:
+            return self._classify(agent)
+        if self._classes is None:
+            self._classes = _classes_from_trust_weights()
+        return self._classes.get(agent)
+
+    def window_for(self, agent: str) -> int:
+        agent_class = self.agent_class(agent)
+        return self.class_windows.get(agent_class, self.default_window)
+
+    def set_class_window(self, agent_class: str, width: int) -> None:
+        """Change the window for ``agent_class`` and resize existing rings."""
+        with self._lock:
+            self.class_windows[agent_class] = width
+            for agent, ring in self._rings.items():
+                if self.agent_class(agent) == agent_class and ring.width != width:
+                    self._rings[agent] = BitRing.from_list(ring.to_list(), width)
+                    self._dirty = True
+
+    def _ring(self, agent: str) -> BitRing:
+        ring = self._rings.get(agent)
+        if ring is None:
+            ring = self._rings[agent] = BitRing(self.window_for(agent))
+        return ring
+
+    def record(self, agent: str, success: bool) -> None:
+        with self._lock:
+            self._ring(agent).push(bool(success))
+            self._dirty = True
+
+    def failures(self, agent: str) -> int:
+        ring = self._rings.get(agent)
+        return ring.failures() if ring else 0
+
+    def is_full(self, agent: str) -> bool:
+        ring = self._rings.get(agent)
+        return ring.is_full() if ring else False
+
+    def history(self, agent: str) -> List[bool]:
+        ring = self._rings.get(agent)
+        return ring.to_list() if ring else []
+
+    def load(self, path: str | Path) -> None:
+        """Replace in-memory rings with the snapshot stored at ``path``."""
+        p = Path(path)
+        try:
+            data = json.loads(p.read_text()) if p.exists() else {}
+        except Exception:
+            data = {}
+        with self._lock:
+            self._rings = {
+                agent: BitRing.from_list(list(history), self.window_for(agent))
+                for agent, history in data.items()
+                if isinstance(history, list)
+            }
+            self._loaded = True
+            self._dirty = False
+
+    def ensure_loaded(self, path: str | Path) -> None:
+        if not self._loaded:
+            self.load(path)
+
+    def snapshot(self, path: str | Path) -> None:
+        """Write every ring to ``path`` as ``{agent: [bool, ...]}``."""
+        with self._lock:
+            data = {agent: ring.to_list() for agent, ring in self._rings.items()}
+            self._dirty = False
+            self._last_snapshot = time.monotonic()
+        Path(path).write_text(json.dumps(data, indent=2))
+
+    def maybe_snapshot(self, path: str | Path) -> bool:
+        """Snapshot when dirty and ``snapshot_interval`` seconds have passed."""
+        if not self._dirty:
+            return False
+        if time.monotonic() - self._last_snapshot < self.snapshot_interval:
+            return False
+        self.snapshot(path)
+        return True
+
+    def flush(self, path: str | Path) -> None:
+        if self._dirty:
+            self.snapshot(path)
@@ -2,15 +2,35 @@ from __future__ import annotations
 
 """Generate proactive suggestions based on timeline or delta logs."""
 
-from typing import List, Dict
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
 
+from addons.sterling_os import scene_delta_tracker
 
-def suggest_from_deltas(deltas: List[Dict]) -> List[str]:
-    """Return simple suggestion strings for each delta entry."""
-    suggestions: List[str] = []
+
+def suggest_from_deltas(deltas: Iterable[Dict]) -> List[str]:
+    """Return suggestion strings for delta dicts or change feed records.
+
+    Feed records (see :mod:`scene_delta_tracker`) are folded by key so only
+    the latest drift per key is suggested and resolved keys are dropped.
+    """
+    items: List[Tuple[str, Dict]] = []
+    pending: Dict[str, Dict] = {}
     for entry in deltas:
-        for key, info in entry.items():
-            suggestions.append(
-                f"Adjust {key} from {info.get('current')} to {info.get('expected')}?"
-            )
-    return suggestions
+        if "seq" in entry:
+            pending.pop(entry["key"], None)
+            if not entry.get("resolved"):
+                pending[entry["key"]] = entry
+        else:
+            items.extend(entry.items())
+    items.extend(pending.items())
+    return [
+        f"Adjust {key} from {info.get('current')} to {info.get('expected')}?"
+        for key, info in items
+    ]
+
+
+def suggest_from_feed(offset: int = 0, path: Path | None = None) -> Tuple[List[str], int]:
+    """Suggest from feed records after ``offset``; return the next offset."""
+    records, offset = scene_delta_tracker.read_feed(offset, path)
+    return suggest_from_deltas(records), offset
@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-from . import memory_manager
+from omni.timeline_merge import tail
+
+from . import memory_manager, timeline_rollups
 
 
 def build_timeline() -> List[Dict]:
@@ -10,19 +12,64 @@ def build_timeline() -> List[Dict]:
     return sorted(events, key=lambda e: e.get("timestamp", ""))
 
 
+def recent(limit: int = 5) -> List[Dict]:
+    """Return the ``limit`` latest events, oldest first, without a full sort."""
+    return tail(memory_manager.load_memory(), limit)
+
+
+def rollups() -> timeline_rollups.TimelineRollups:
+    """Return the rollups kept next to the memory timeline."""
+    return timeline_rollups.for_store(memory_manager.MEMORY_STORE)
+
+
 def prune_older_than(days: int) -> List[Dict]:
-    """Remove events older than the given number of days."""
+    """Fold pending events into rollups and drop raw events older than ``days``."""
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
     events = memory_manager.load_memory()
+    folded = rollups()
+    folded.fold(events)
+    # the raw events are about to go; their rollups must be on disk first
+    folded.flush()
     remaining = [
-        e for e in events if datetime.fromisoformat(e["timestamp"]) >= cutoff
+        e
+        for e in events
+        if timeline_rollups.parse_timestamp(e["timestamp"]) >= cutoff
     ]
     memory_manager.MEMORY_STORE.write(remaining)
     return remaining
 
 
-def timeline_summary(limit: int = 5) -> str:
-    """Return a short natural language summary of recent events."""
-    events = build_timeline()[-limit:]
+def history(days: int, level: Optional[str] = None) -> Dict:
+    """Return the aggregate of the last ``days`` days of timeline events.
+
+    Only the rollups are read; events are folded into them as they are
+    written (:func:`memory_manager.add_event`) and before pruning.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    return rollups().query(since=since, level=level)
+
+
+def timeline_summary(limit: int = 5, days: Optional[int] = None) -> str:
+    """Return a short natural language summary of recent events.
+
+    With ``days`` the summary is built from rollups covering that window;
+    otherwise it lists the last ``limit`` events, also kept in the rollups.
+    The raw timeline is read only when the rollups do not hold them.
+    """
+    if days is not None:
+        agg = history(days)
+        if not agg["count"]:
+            return ""
+        types = ", ".join(f"{t} {n}" for t, n in list(agg["types"].items())[:limit])
+        parts = [f"{agg['count']} events in {days}d ({types})"]
+        if agg["phrases"]:
+            parts.append("top phrases: " + ", ".join(list(agg["phrases"])[:limit]))
+        rate = timeline_rollups.scene_success_rate(agg)
+        if rate is not None:
+            parts.append(f"scene success {rate:.0%}")
+        return "; ".join(parts)
+    events = rollups().recent(limit)
+    if events is None:
+        events = recent(limit)
     parts = [f"{e['event']} at {e['timestamp']}" for e in events]
     return "; ".join(parts)
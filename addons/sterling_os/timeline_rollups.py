@@ -0,0 +1,313 @@
+"""Hierarchical minute/hour/day rollups of timeline events.
+
+Raw timeline events are folded incrementally into per-bucket aggregates:
+event counts by type (the ``tag`` before the first ``:``), the most frequent
+phrases and per-scene success/failure counts.  Minute and hour rows expire
+after a short retention while day rows are kept, so long-range history
+queries read a few hundred rows instead of every raw event.  The newest
+``RECENT_EVENTS`` raw events are kept alongside, for short summaries.
+
+Rollups are folded in memory, one shared :class:`TimelineRollups` per file
+(see :func:`for_store`), and written back in batches: once
+``FLUSH_EVENTS`` events are pending, ``FLUSH_INTERVAL`` seconds after the
+last write, before pruning and at interpreter exit.  Other processes see
+this process's folds only after a flush; a fold lost in a crash is redone
+from the raw timeline, since the persisted cursor never runs ahead of the
+persisted rows.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import atexit
+import threading
+import time
+
+from json_store import JSONStore
+
+LEVELS: Dict[str, int] = {"minute": 60, "hour": 3600, "day": 86400}
+RETENTION: Dict[str, Optional[timedelta]] = {
+    "minute": timedelta(hours=2),
+    "hour": timedelta(days=7),
+    "day": None,
+}
+TOP_PHRASES = 10
+RECENT_EVENTS = 20
+FLUSH_EVENTS = 100
+FLUSH_INTERVAL = 30.0
+
+SCENE_OK = {"scene", "task_execute"}
+SCENE_FAIL = {"scene_error", "scene_unknown"}
+
+
+def parse_timestamp(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def bucket_start(ts: datetime, level: str) -> str:
+    width = LEVELS[level]
+    epoch = int(ts.timestamp()) // width * width
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def _empty_row(start: str | None = None) -> Dict[str, Any]:
+    return {"start": start, "count": 0, "types": {}, "phrases": {}, "scenes": {}}
+
+
+def _fold_event(row: Dict[str, Any], event: Dict[str, Any]) -> None:
+    row["count"] += 1
+    if "event" in event:
+        tag, _, detail = str(event["event"]).partition(":")
+    else:
+        # ``memory_timeline.log_event`` entries use action/result fields
+        tag, detail = str(event.get("action", "unknown")), ""
+    types = row["types"]
+    types[tag] = types.get(tag, 0) + 1
+    if tag == "phrase" and detail:
+        phrase = detail.split("|intent:", 1)[0]
+        phrases = row["phrases"]
+        phrases[phrase] = phrases.get(phrase, 0) + 1
+    elif tag in SCENE_OK or tag in SCENE_FAIL:
+        stats = row["scenes"].setdefault(detail, {"ok": 0, "fail": 0})
+        stats["ok" if tag in SCENE_OK else "fail"] += 1
+
+
+def _trim(row: Dict[str, Any]) -> Dict[str, Any]:
+    if len(row["phrases"]) > TOP_PHRASES:
+        row["phrases"] = dict(Counter(row["phrases"]).most_common(TOP_PHRASES))
+    return row
+
+
+def merge_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine rollup ``rows`` into a single aggregate."""
+    merged = _empty_row()
+    types: Counter = Counter()
+    phrases: Counter = Counter()
+    merged["rows"] = 0
+    for row in rows:
+        merged["rows"] += 1
+        if merged["start"] is None or row["start"] < merged["start"]:
+            merged["start"] = row["start"]
+        merged["count"] += row["count"]
+        types.update(row["types"])
+        phrases.update(row["phrases"])
+        for name, stats in row["scenes"].items():
+            target = merged["scenes"].setdefault(name, {"ok": 0, "fail": 0})
+            target["ok"] += stats["ok"]
+            target["fail"] += stats["fail"]
+    merged["types"] = dict(types.most_common())
+    merged["phrases"] = dict(phrases.most_common(TOP_PHRASES))
+    return merged
+
+
+def scene_success_rate(aggregate: Dict[str, Any]) -> Optional[float]:
+    ok = sum(s["ok"] for s in aggregate["scenes"].values())
+    total = ok + sum(s["fail"] for s in aggregate["scenes"].values())
+    return round(ok / total, 3) if total else None
+
+
+def rollup_events(events: Iterable[Dict[str, Any]], level: str = "day") -> List[Dict[str, Any]]:
+    """Return ``events`` aggregated into ``level`` rows, oldest first."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        start = bucket_start(parse_timestamp(event["timestamp"]), level)
+        _fold_event(rows.setdefault(start, _empty_row(start)), event)
+    return [_trim(rows[k]) for k in sorted(rows)]
+
+
+class TimelineRollups:
+    """Incrementally folded rollups for one timeline file, flushed in batches."""
+
+    def __init__(self, path: Path) -> None:
+        self.store = JSONStore(Path(path), default={"cursor": None, "cursor_seen": 0, "rows": {}})
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._signature = None
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def _file_signature(self):
+        try:
+            stat = self.store.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> Dict[str, Any]:
+        """Return the in-memory rollups, re-reading the file if another
+        process flushed it and nothing is pending here."""
+        with self._lock:
+            signature = self._file_signature()
+            if self._data is not None and (self._pending or signature == self._signature):
+                return self._data
+            data = self.store.read()
+            data.setdefault("cursor", None)
+            data.setdefault("recent", None)
+            rows = data.setdefault("rows", {})
+            for level in LEVELS:
+                rows.setdefault(level, {})
+            self._data, self._signature = data, signature
+            return data
+
+    def flush(self) -> None:
+        """Write pending folds to disk."""
+        with self._lock:
+            if not self._pending or self._data is None:
+                return
+            self.store.write(self._data)
+            self._signature = self._file_signature()
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+
+    def _maybe_flush(self) -> None:
+        if self._pending >= FLUSH_EVENTS or time.monotonic() - self._flushed_at >= FLUSH_INTERVAL:
+            self.flush()
+
+    def fold(self, events: List[Dict[str, Any]], now: datetime | None = None) -> int:
+        """Fold events newer than the cursor and return how many.
+
+        ``events`` are expected in append (chronological) order, so only the
+        tail after the cursor is visited.  The cursor is the newest folded
+        timestamp plus how many events carrying exactly that timestamp were
+        folded, so an event appended later with the same timestamp is still
+        picked up.  ``events`` must be the whole timeline: its tail becomes
+        the recent events kept for :meth:`recent`.
+        """
+        with self._lock:
+            return self._fold(events, now)
+
+    def _fold(self, events: List[Dict[str, Any]], now: datetime | None) -> int:
+        data = self._load()
+        cursor = parse_timestamp(data["cursor"]) if data["cursor"] else None
+        pending: List[tuple] = []
+        at_cursor: List[tuple] = []
+        for event in reversed(events):
+            try:
+                ts = parse_timestamp(event["timestamp"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if cursor is not None and ts < cursor:
+                break
+            if cursor is not None and ts == cursor:
+                at_cursor.append((ts, event))
+            else:
+                pending.append((ts, event))
+        seen = data.get("cursor_seen")
+        # rollups written before the count was kept folded every event <= cursor
+        seen = len(at_cursor) if seen is None else min(seen, len(at_cursor))
+        fresh_at_cursor = at_cursor[: len(at_cursor) - seen]
+        pending.extend(fresh_at_cursor)
+        tail = events[-RECENT_EVENTS:]
+        recent_changed = data["recent"] != tail
+        if recent_changed:
+            data["recent"] = [dict(e) for e in tail]
+        if not pending:
+            if recent_changed:
+                self._pending += 1
+                self._maybe_flush()
+            return 0
+        pending.sort(key=lambda item: item[0])
+        rows = data["rows"]
+        for ts, event in pending:
+            for level in LEVELS:
+                start = bucket_start(ts, level)
+                row = rows[level].get(start)
+                if row is None:
+                    row = rows[level][start] = _empty_row(start)
+                _fold_event(row, event)
+        newest = pending[-1][0]
+        if cursor is not None and newest == cursor:
+            data["cursor_seen"] = seen + len(fresh_at_cursor)
+        else:
+            data["cursor"] = newest.isoformat()
+            data["cursor_seen"] = sum(1 for ts, _ in pending if ts == newest)
+        self._expire(rows, now or datetime.now(timezone.utc))
+        for level_rows in rows.values():
+            for row in level_rows.values():
+                _trim(row)
+        self._pending += len(pending)
+        self._maybe_flush()
+        return len(pending)
+
+    def recent(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the ``limit`` newest events, oldest first.
+
+        ``None`` when they are not known: more than ``RECENT_EVENTS`` were
+        asked for, or nothing was folded since the rollups were created.
+        """
+        events = self._load()["recent"]
+        if events is None or limit > RECENT_EVENTS:
+            return None
+        return list(events[-limit:]) if limit > 0 else []
+
+    @staticmethod
+    def _expire(rows: Dict[str, Dict[str, Any]], now: datetime) -> None:
+        for level, keep in RETENTION.items():
+            if keep is None:
+                continue
+            cutoff = bucket_start(now - keep, level)
+            for start in [s for s in rows[level] if s < cutoff]:
+                del rows[level][start]
+
+    def rows(self, level: str) -> List[Dict[str, Any]]:
+        level_rows = self._load()["rows"][level]
+        return [level_rows[k] for k in sorted(level_rows)]
+
+    def query(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        level: str | None = None,
+        now: datetime | None = None,
+    ) -> Dict[str, Any]:
+        """Aggregate rows in ``[since, until)`` at the finest level covering ``since``."""
+        if level is None:
+            now = now or datetime.now(timezone.utc)
+            level = "day"
+            for name in ("minute", "hour"):
+                keep = RETENTION[name]
+                if since is not None and keep is not None and since >= now - keep:
+                    level = name
+                    break
+        lo = bucket_start(since, level) if since else None
+        hi = until.astimezone(timezone.utc).isoformat() if until else None
+        selected = [
+            row
+            for row in self.rows(level)
+            if (lo is None or row["start"] >= lo) and (hi is None or row["start"] < hi)
+        ]
+        result = merge_rows(selected)
+        result["level"] = level
+        return result
+
+
+_ROLLUPS: Dict[Path, TimelineRollups] = {}
+_ROLLUPS_LOCK = threading.Lock()
+
+
+def for_store(store: JSONStore) -> TimelineRollups:
+    """Return the shared rollups stored alongside the timeline ``store``."""
+    path = Path(store.path)
+    path = path.with_name(f"{path.stem}_rollups.json").resolve()
+    with _ROLLUPS_LOCK:
+        rollups = _ROLLUPS.get(path)
+        if rollups is None:
+            rollups = _ROLLUPS[path] = TimelineRollups(path)
+        return rollups
+
+
+def flush_all() -> None:
+    """Write every shared rollup's pending folds."""
+    with _ROLLUPS_LOCK:
+        rollups = list(_ROLLUPS.values())
+    for item in rollups:
+        item.flush()
+
+
+atexit.register(flush_all)
@@ -1,23 +1,31 @@
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, current_app, jsonify, request
 import os
 import platform
 import subprocess
 import datetime
+import functools
 
+import metrics
+import tracing
 import uptime_tracker
-from cognitive_router import route_with_self_critique
+from build_info import get_build_info, reset as reset_build_info
+from startup import run_startup_hooks
 
 
-app = Flask(__name__)
+bp = Blueprint("sterling", __name__)
 APP_VERSION = os.getenv("APP_VERSION", "4.0.0")
-app.config["APP_START_TIME"] = uptime_tracker._state.get("time_started")
 
-@app.route("/")
+
+@functools.lru_cache(maxsize=1)
+def _platform() -> str:
+    return platform.platform()
+
+@bp.route("/")
 def root():
     """Simple health check for container orchestration."""
     return jsonify(status="alive", version=APP_VERSION)
 
-@app.route("/info")
+@bp.route("/info")
 def info():
     return jsonify({
         "models": ["gpt-4", "gpt-4o", "gpt-3.5"],
@@ -27,23 +35,18 @@ def info():
         "version": APP_VERSION,
     })
 
-@app.route("/metadata")
+@bp.route("/metadata")
 def metadata():
     """Return commit and runtime information."""
-    try:
-        commit = subprocess.check_output(["git", "rev-parse", "HEAD"]).decode().strip()
-        commit_date = subprocess.check_output(["git", "show", "-s", "--format=%cI", "HEAD"]).decode().strip()
-    except Exception:
-        commit = os.getenv("GITHUB_SHA", "unknown")
-        commit_date = os.getenv("GITHUB_DATE", "unknown")
+    info = get_build_info()
     return jsonify({
-        "commit": commit,
-        "commit_date": commit_date,
-        "branch": os.getenv("GIT_BRANCH", "main"),
-        "platform": platform.platform(),
+        "commit": info.commit,
+        "commit_date": info.commit_date,
+        "branch": info.branch,
+        "platform": _platform(),
     })
 
-@app.route("/sterling/status", methods=["GET"])
+@bp.route("/sterling/status", methods=["GET"])
 def status():
     """Report runtime status and uptime information."""
     uptime = datetime.timedelta(seconds=int(uptime_tracker.get_uptime()))
@@ -55,36 +58,33 @@ def status():
         "python_version": platform.python_version(),
     })
 
-@app.route("/status")
+@bp.route("/status")
 def short_status():
     """Alias for /sterling/status"""
     return status()
 
-@app.route("/sterling/version", methods=["GET"])
+@bp.route("/sterling/version", methods=["GET"])
 def version():
-    try:
-        commit_hash = subprocess.check_output(["git", "rev-parse", "HEAD"]).decode().strip()
-    except Exception as e:
-        commit_hash = f"Error: {str(e)}"
+    info = get_build_info()
     return jsonify({
-        "commit_hash": commit_hash,
-        "branch": os.getenv("GIT_BRANCH", "unknown"),
-        "image_id": os.getenv("DOCKER_IMAGE", "unknown"),
+        "commit_hash": info.commit,
+        "branch": info.branch,
+        "image_id": info.image_id,
         "version": APP_VERSION,
     })
 
-@app.route("/version")
+@bp.route("/version")
 def short_version():
     """Alias for /sterling/version"""
     return version()
 
 
-@app.route("/heartbeat")
+@bp.route("/heartbeat")
 def heartbeat():
     verbose = request.args.get("verbose", "false").lower() == "true"
     return jsonify(uptime_tracker.heartbeat(verbose=verbose))
 
-@app.route("/sterling/info", methods=["GET"])
+@bp.route("/sterling/info", methods=["GET"])
 def sterling_info():
     models = []
     try:
@@ -102,14 +102,14 @@ def sterling_info():
         "fallback_chain": models[::-1] if models else ["None"],
     })
 
-@app.route("/sterling/assistant", methods=["POST"])
+@bp.route("/sterling/assistant", methods=["POST"])
 def assistant():
     data = request.get_json(force=True)
     query = data.get("query", "")
     return jsonify({"response": "I'm not sure, but here's what I can try...", "query": query})
 
 
-@app.route("/ha-chat", methods=["POST"])
+@bp.route("/ha-chat", methods=["POST"])
 def ha_chat():
     """Home Assistant bridge endpoint."""
     token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
@@ -119,22 +119,53 @@ def ha_chat():
     data = request.get_json(force=True)
     message = data.get("message", "")
 
+    # the router pulls in jsonschema and every agent; load it on first use
+    from cognitive_router import route_with_self_critique
+
     return jsonify(route_with_self_critique(message))
 
-@app.route("/self-heal")
+@bp.route("/self-heal")
 def heal():
     return jsonify(action="restart", status="initiated")
 
 
-@app.route("/webhook/rebuild", methods=["POST"])
+@bp.route("/webhook/rebuild", methods=["POST"])
 def webhook_rebuild():
     """Pull latest code and reinstall dependencies."""
     try:
         subprocess.call(["git", "pull", "origin", "main"])  # best effort
         subprocess.call(["pip", "install", "--no-cache-dir", "-r", "requirements.txt"])
+        reset_build_info()
         return jsonify(status="updated")
     except Exception as e:
         return jsonify(status="error", detail=str(e)), 500
 
+def _startup():
+    run_startup_hooks()
+    if current_app.config.get("APP_START_TIME") is None:
+        current_app.config["APP_START_TIME"] = uptime_tracker._state.get("time_started")
+
+
+def create_app() -> Flask:
+    """Build the Sterling API app.
+
+    Process startup work (uptime state, heartbeat thread) is kept out of
+    import so importing this module stays free of I/O; it runs at boot from
+    ``gunicorn.conf.py`` or ``__main__``, or else before the first request.  Requests are
+    traced and report per-stage timings when asked (see :mod:`tracing`);
+    counters and latency histograms are served at ``/metrics``.
+    """
+    app = Flask(__name__)
+    app.config["APP_START_TIME"] = None
+    app.register_blueprint(bp)
+    tracing.init_app(app)
+    metrics.init_app(app)
+    app.before_request(_startup)
+    return app
+
+
+app = create_app()
+
 if __name__ == "__main__":
+    run_startup_hooks()
     app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+"""Process-wide build and commit metadata without git subprocesses."""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import os
+import zlib
+
+REPO_ROOT = Path(__file__).resolve().parent
+# written by entrypoint.sh at container start; untracked, so a checkout
+# without .git never reports a stale commit from the repository
+BUILD_MANIFEST = REPO_ROOT / "metadata.json"
+UNKNOWN = "unknown"
+
+
+@dataclass(frozen=True, slots=True)
+class BuildInfo:
+    """Commit, branch and image identifiers for the running code."""
+
+    commit: str
+    commit_date: str
+    branch: str
+    image_id: str
+
+    def as_dict(self) -> Dict[str, str]:
+        return asdict(self)
+
+
+def _git_dir(root: Path) -> Optional[Path]:
+    dot_git = root / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():  # worktrees and submodules point elsewhere
+        content = dot_git.read_text().strip()
+        if content.startswith("gitdir:"):
+            return (root / content.split(":", 1)[1].strip()).resolve()
+    return None
+
+
+def _read_ref(git_dir: Path, ref: str) -> Optional[str]:
+    for base in (git_dir, _common_dir(git_dir)):
+        loose = base / ref
+        if loose.is_file():
+            return loose.read_text().strip()
+        packed = base / "packed-refs"
+        if packed.is_file():
+            for line in packed.read_text().splitlines():
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.partition(" ")
+                if name == ref:
+                    return sha
+    return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    common = git_dir / "commondir"
+    if common.is_file():
+        return (git_dir / common.read_text().strip()).resolve()
+    return git_dir
+
+
+def _resolve_head(git_dir: Path) -> tuple[Optional[str], Optional[str]]:
+    """Return ``(commit, branch)`` from ``HEAD``; branch is ``None`` if detached."""
+    head = (git_dir / "HEAD").read_text().strip()
+    if head.startswith("ref:"):
+        ref = head.split(":", 1)[1].strip()
+        return _read_ref(git_dir, ref), ref.removeprefix("refs/heads/")
+    return head or None, None
+
+
+def _commit_date(git_dir: Path, commit: str) -> Optional[str]:
+    """Return the committer date of a loose commit object as ISO 8601.
+
+    Packed objects are not parsed; callers fall back to the build manifest.
+    """
+    path = _common_dir(git_dir) / "objects" / commit[:2] / commit[2:]
+    try:
+        raw = zlib.decompress(path.read_bytes())
+    except (OSError, zlib.error):
+        return None
+    for line in raw.split(b"\n"):
+        if line.startswith(b"committer "):
+            parts = line.rsplit(b" ", 2)
+            try:
+                stamp, offset = int(parts[1]), parts[2].decode()
+            except (IndexError, ValueError):
+                return None
+            sign = -1 if offset.startswith("-") else 1
+            delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5]))
+            tz = timezone(sign * delta)
+            return datetime.fromtimestamp(stamp, tz).isoformat()
+        if not line:
+            break
+    return None
+
+
+def _read_manifest(path: Path) -> Dict[str, str]:
+    try:
+        data = json.loads(path.read_text())
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_build_info(root: Path = REPO_ROOT, manifest: Path | None = None) -> BuildInfo:
+    """Resolve build metadata from ``.git``, the manifest and the environment."""
+    commit = branch = commit_date = None
+    git_dir = _git_dir(root)
+    if git_dir is not None:
+        try:
+            commit, branch = _resolve_head(git_dir)
+            if commit:
+                commit_date = _commit_date(git_dir, commit)
+        except OSError:
+            pass
+    data = _read_manifest(manifest or BUILD_MANIFEST)
+    return BuildInfo(
+        commit=commit or data.get("commit") or os.getenv("GITHUB_SHA") or UNKNOWN,
+        commit_date=commit_date or data.get("commit_date") or os.getenv("GITHUB_DATE") or UNKNOWN,
+        branch=branch or data.get("branch") or os.getenv("GIT_BRANCH") or UNKNOWN,
+        image_id=os.getenv("DOCKER_IMAGE") or data.get("image_id") or UNKNOWN,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_build_info() -> BuildInfo:
+    """Return build metadata, resolved once per process."""
+    return load_build_info()
+
+
+def reset() -> None:
+    """Drop the cached metadata, e.g. after a ``git pull`` in place."""
+    get_build_info.cache_clear()
+
+
+__all__ = ["BuildInfo", "get_build_info", "load_build_info", "reset"]
@@ -10,8 +10,10 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Callable, Dict, List
 
+import metrics
 import runtime_memory
 from json_store import JSONStore
+from tracing import span, traced
 from pathlib import Path
 
 from addons.sterling_os import intent_router
@@ -24,9 +26,20 @@ RUNTIME_STORE = runtime_memory.RUNTIME_STORE
 # Separate log for routing decisions
 ROUTER_LOG_STORE = JSONStore(Path("router_log.json"), default=[])
 
+ROUTE_DECISIONS = metrics.counter(
+    "sterling_route_decisions_total", "Routing decisions by agent.", ["agent", "method", "success"]
+)
+ROUTES = metrics.counter("sterling_routes_total", "Routed queries by agent.", ["agent"])
+ROUTE_FALLBACKS = metrics.counter(
+    "sterling_route_fallbacks_total", "Routed queries escalated to the general agent.", ["agent"]
+)
+
 
 def log_route(query: str, agent: str, success: bool, fallback: bool) -> None:
     """Record routing decisions in ``runtime_memory.json``."""
+    ROUTES.inc(agent=agent)
+    if fallback:
+        ROUTE_FALLBACKS.inc(agent=agent)
     data = runtime_memory.read_memory()
     history = data.setdefault("route_logs", [])
     history.append(
@@ -43,6 +56,7 @@ def log_route(query: str, agent: str, success: bool, fallback: bool) -> None:
 
 def log_router_decision(query: str, agent: str, method: str, success: bool) -> None:
     """Log router classification details to ``router_log.json``."""
+    ROUTE_DECISIONS.inc(agent=agent, method=method, success=bool(success))
     logs = ROUTER_LOG_STORE.read()
     logs.append(
         {
@@ -165,43 +179,53 @@ __all__ = [
 ]
 
 
+@traced()
 def handle_request(query: str, *, origin: str | None = None, context: str | None = None) -> Dict:
-    """Classify the request and dispatch to the appropriate agent."""
-    agent = classify_request(query)
-    reflex_engine.inject_event_prediction(agent, query, datetime.now(timezone.utc).isoformat())
+    """Classify the request and dispatch to the appropriate agent.
+
+    Each stage runs in a :mod:`tracing` span so slow requests can be
+    attributed to reflex prediction, governance, the handler and so on.
+    """
+    with span("classify"):
+        agent = classify_request(query)
+    with span("reflex"):
+        reflex_engine.inject_event_prediction(agent, query, datetime.now(timezone.utc).isoformat())
     if origin:
         from addons.sterling_os import audit_logger
-        audit_logger.log_event("INFO", f"Request from {origin}: {query}", origin=origin)
+        with span("audit"):
+            audit_logger.log_event("INFO", f"Request from {origin}: {query}", origin=origin)
     # During unit tests most agents are expected to operate without the
     # additional human approval check defined in the Platinum Dominion
     # constitution.  By explicitly passing ``requires_approval=False`` we
     # avoid the "halted" status that would otherwise be returned for agents
     # not listed in the executive roster, allowing the fallback logic to run
     # as our tests expect.
-    if (
-        aegis_enforcer.enforce_governance(agent, query, requires_approval=False).get(
-            "status"
-        )
-        != "approved"
-    ):
+    with span("governance"):
+        decision = aegis_enforcer.enforce_governance(agent, query, requires_approval=False)
+    if decision.get("status") != "approved":
         return {"error": "Blocked by Platinum Dominion Constitution"}
     method = "keyword" if LAST_MATCH in sum(ROUTE_KEYWORDS.values(), []) else "embedding"
     handler = HANDLERS.get(agent, HANDLERS["general"])
-    result = handler(query)
+    with span(f"handler:{agent}"):
+        result = handler(query)
     result["response"] = sanitize_response(result.get("response", ""))
 
     # optional memory fusion for siri proxy or exec summaries
     if context == "siri_proxy" or "exec_summary" in query:
         from addons.sterling_os import memory_engine, memory_logger
         persona = "personal" if agent == "daily_briefing" else "professional"
-        refs = memory_engine.adaptive_memory_match(query, persona)
-        if isinstance(refs, list) and refs:
-            summaries = "\n".join([r.get("summary", "") for r in refs])
-            result["response"] += f"\n\n\U0001F501 Relevant Past Knowledge:\n{summaries}"
-        memory_logger.log_memory_entry(query, result.get("response", ""), persona)
-    result, success, fallback = agent_reflector.reflect(agent, query, result, HANDLERS["general"])
-    log_route(query, agent, success, fallback)
-    log_router_decision(query, agent, method, success)
+        with span("memory_fusion"):
+            refs = memory_engine.adaptive_memory_match(query, persona)
+            if isinstance(refs, list) and refs:
+                summaries = "\n".join([r.get("summary", "") for r in refs])
+                result["response"] += f"\n\n\U0001F501 Relevant Past Knowledge:\n{summaries}"
+            memory_logger.log_memory_entry(query, result.get("response", ""), persona)
+    with span("reflect"):
+        result, success, fallback = agent_reflector.reflect(agent, query, result, HANDLERS["general"])
+    with span("log_route"):
+        log_route(query, agent, success, fallback)
+    with span("log_router_decision"):
+        log_router_decision(query, agent, method, success)
     return result
 
 
@@ -213,13 +237,17 @@ def route_with_self_critique(query: str) -> Dict:
     response text and confidence score.
     """
     route_1 = handle_request(query)
-    route_2_raw = general_agent(query)
-    route_2_raw["response"] = sanitize_response(route_2_raw.get("response", ""))
-    # log the general agent execution separately so the decision is traceable
-    result2, success2, fallback2 = agent_reflector.reflect(
-        "general", query, route_2_raw, HANDLERS["general"]
-    )
-    log_route(query, "general", success2, fallback2)
+    with span("critique"):
+        with span("handler:general"):
+            route_2_raw = general_agent(query)
+        route_2_raw["response"] = sanitize_response(route_2_raw.get("response", ""))
+        # log the general agent execution separately so the decision is traceable
+        with span("reflect"):
+            result2, success2, fallback2 = agent_reflector.reflect(
+                "general", query, route_2_raw, HANDLERS["general"]
+            )
+        with span("log_route"):
+            log_route(query, "general", success2, fallback2)
 
     if route_1.get("confidence", 0) >= result2.get("confidence", 0):
         return route_1
@@ -3,9 +3,14 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 import yaml
 
+try:
+    from .grading import get_gradebook, winner_of
+except ImportError:  # pragma: no cover - loaded outside the package
+    from concord.grading import get_gradebook, winner_of
+
 BASE_DIR = Path(__file__).resolve().parent
 REGISTRY_FILE = BASE_DIR / "sandbox_registry.yaml"
 GRADEBOOK_FILE = BASE_DIR / "model_gradebook.json"
@@ -30,21 +35,27 @@ def load_gradebook() -> Any:
 
 
 def grade_responses(responses: Dict[str, float]) -> str | None:
-    if not responses:
-        return None
-    return max(responses.items(), key=lambda x: x[1])[0]
+    return winner_of(responses)
 
 
 def record_grade(prompt_id: str, responses: Dict[str, float]) -> str | None:
-    winner = grade_responses(responses)
-    gradebook = load_gradebook()
-    gradebook.append({"prompt_id": prompt_id, "responses": responses, "winner": winner})
-    GRADEBOOK_FILE.write_text(json.dumps(gradebook, indent=2))
-    return winner
+    return get_gradebook(GRADEBOOK_FILE).record(prompt_id, responses)
+
+
+def leaderboard(min_grades: int = 1) -> List[Dict[str, Any]]:
+    """Per-model grading stats, best first; see :class:`Gradebook`."""
+    return get_gradebook(GRADEBOOK_FILE).leaderboard(min_grades)
+
+
+def head_to_head(a: str, b: str) -> tuple:
+    """Return ``(prompts a won over b, prompts b won over a)``."""
+    return get_gradebook(GRADEBOOK_FILE).head_to_head(a, b)
 
 __all__ = [
     "load_registry",
     "load_gradebook",
     "grade_responses",
     "record_grade",
+    "leaderboard",
+    "head_to_head",
 ]
@@ -0,0 +1,157 @@
+"""Incremental grading aggregates for Concord.
+
+Grades are appended to ``model_gradebook.json`` (see
+:func:`json_store.append_array`) and folded into per-model statistics as
+they are recorded: grade and win counts, a running mean and variance of
+scores (Welford's method) and a pairwise matrix of head-to-head wins.  The
+gradebook is replayed once per process and again only if the file changes
+behind our back, including between a refresh and our own append, so
+:meth:`Gradebook.leaderboard` is ``O(models)`` and never touches history.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from json_store import append_array
+
+
+@dataclass(slots=True)
+class ModelStats:
+    grades: int = 0
+    wins: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, score: float, won: bool) -> None:
+        self.grades += 1
+        self.wins += int(won)
+        delta = score - self.mean
+        self.mean += delta / self.grades
+        self.m2 += delta * (score - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.grades - 1) if self.grades > 1 else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.grades if self.grades else 0.0
+
+
+def winner_of(responses: Dict[str, float]) -> Optional[str]:
+    if not responses:
+        return None
+    return max(responses.items(), key=lambda x: x[1])[0]
+
+
+class Gradebook:
+    """Append-only gradebook with in-memory per-model aggregates."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.stats: Dict[str, ModelStats] = {}
+        # pairwise[a][b]: prompts on which ``a`` outscored ``b``
+        self.pairwise: Dict[str, Dict[str, int]] = {}
+        self._signature = None
+        self._lock = threading.RLock()
+
+    def _stat(self):
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _fold(self, responses: Dict[str, float], winner: Optional[str]) -> None:
+        scores = {model: float(score) for model, score in responses.items()}
+        for model, score in scores.items():
+            self.stats.setdefault(model, ModelStats()).add(score, model == winner)
+        for a, score_a in scores.items():
+            row = self.pairwise.setdefault(a, {})
+            for b, score_b in scores.items():
+                if score_a > score_b:
+                    row[b] = row.get(b, 0) + 1
+
+    def refresh(self) -> None:
+        """Replay the gradebook if it changed since it was last read."""
+        with self._lock:
+            signature = self._stat()
+            if signature == self._signature:
+                return
+            self.stats, self.pairwise = {}, {}
+            try:
+                entries = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                entries = []
+            for entry in entries if isinstance(entries, list) else []:
+                responses = entry.get("responses") or {}
+                self._fold(responses, entry.get("winner", winner_of(responses)))
+            self._signature = signature
+
+    def record(self, prompt_id: str, responses: Dict[str, float]) -> Optional[str]:
+        """Grade ``responses``, append the grade and update the aggregates."""
+        return self.record_many([(prompt_id, responses)])[0]
+
+    def record_many(self, grades: Iterable[tuple]) -> List[Optional[str]]:
+        """Record ``(prompt_id, responses)`` pairs with a single append."""
+        with self._lock:
+            self.refresh()
+            entries = []
+            for prompt_id, responses in grades:
+                winner = winner_of(responses)
+                entries.append({"prompt_id": prompt_id, "responses": responses, "winner": winner})
+            before, after = append_array(self.path, entries)
+            if before == self._signature:
+                for entry in entries:
+                    self._fold(entry["responses"], entry["winner"])
+                self._signature = after
+            else:
+                # another writer appended since refresh(); replay it all
+                self._signature = None
+                self.refresh()
+        return [entry["winner"] for entry in entries]
+
+    def leaderboard(self, min_grades: int = 1) -> List[Dict]:
+        """Return per-model stats, best win rate (then mean score) first."""
+        self.refresh()
+        rows = [
+            {
+                "model": model,
+                "grades": s.grades,
+                "wins": s.wins,
+                "win_rate": s.win_rate,
+                "mean": s.mean,
+                "variance": s.variance,
+            }
+            for model, s in self.stats.items()
+            if s.grades >= min_grades
+        ]
+        rows.sort(key=lambda r: (r["win_rate"], r["mean"]), reverse=True)
+        return rows
+
+    def head_to_head(self, a: str, b: str) -> tuple:
+        """Return ``(wins of a over b, wins of b over a)``."""
+        self.refresh()
+        return self.pairwise.get(a, {}).get(b, 0), self.pairwise.get(b, {}).get(a, 0)
+
+
+_BOOKS: Dict[Path, Gradebook] = {}
+_BOOKS_LOCK = threading.Lock()
+
+
+def get_gradebook(path: Path) -> Gradebook:
+    """Return the shared :class:`Gradebook` for ``path``."""
+    path = Path(path).resolve()
+    with _BOOKS_LOCK:
+        book = _BOOKS.get(path)
+        if book is None:
+            book = _BOOKS[path] = Gradebook(path)
+        return book
+
+
+__all__ = ["Gradebook", "ModelStats", "get_gradebook", "winner_of"]
@@ -1,15 +1,28 @@
 """Simple memory compression utility."""
 from __future__ import annotations
 
-from typing import List
+from collections import Counter
+from typing import Any, Dict, List
 
 
 def compress_logs(logs: List[str]) -> str:
+    """Keep the first and last lines and count the rest by ``tag:`` prefix."""
     if not logs:
         return ""
-    # naive compression: join first and last
     if len(logs) == 1:
         return logs[0]
-    return f"{logs[0]} ... {logs[-1]}"
+    middle = logs[1:-1]
+    if not middle:
+        return f"{logs[0]} ... {logs[-1]}"
+    tags = Counter(line.split(":", 1)[0] for line in middle)
+    counts = ", ".join(f"{tag} x{n}" for tag, n in tags.most_common(5))
+    return f"{logs[0]} ... [{len(middle)} more: {counts}] ... {logs[-1]}"
 
-__all__ = ["compress_logs"]
+
+def compress_timeline(events: List[Dict[str, Any]], level: str = "day") -> List[Dict[str, Any]]:
+    """Replace raw timeline ``events`` with ``level`` rollup rows."""
+    from addons.sterling_os import timeline_rollups
+
+    return timeline_rollups.rollup_events(events, level)
+
+__all__ = ["compress_logs", "compress_timeline"]
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+"""Bounded, append-only diagnostics log.
+
+Entries are JSON lines appended to the live segment (``diagnostics_log.jsonl``
+by default).  Once it reaches ``segment_bytes`` it is rotated logrotate-style
+to ``<name>.1`` and older segments shift up to ``<name>.<max_segments>``;
+anything beyond that is deleted, so the log stays bounded on disk.
+
+Each process keeps a :class:`DiagnosticsStore` that follows the live segment
+like ``tail -F``: every check stats the file and reads only bytes appended
+since the last one.  Ingested entries feed a ring of recent entries, a ring of
+recent error strings and per-category risk/error counters, so "have there been
+errors?" never re-parses history.  Counters cover the retained segments only:
+when a segment is rotated out its counts are subtracted.
+
+A legacy log holding a single JSON array is converted to JSON lines the first
+time it is opened.  For a ``.jsonl`` log that does not exist yet, a sibling
+``.json`` file (the name used before) is imported and removed.
+"""
+
+from collections import Counter, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Deque, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_BYTES = 256 * 1024
+MAX_SEGMENTS = 4
+RING_SIZE = 256
+
+_Stats = Tuple[Counter, Counter]
+
+
+def category(risk: str) -> str:
+    """Return the category of ``risk``: the text before the first ``:``."""
+    return risk.split(":", 1)[0].strip().lower()
+
+
+def is_error(risk: str) -> bool:
+    return "error" in risk.lower()
+
+
+class DiagnosticsStore:
+    """Append-only diagnostics segments with in-memory summaries."""
+
+    def __init__(
+        self,
+        path: Path,
+        segment_bytes: int = SEGMENT_BYTES,
+        max_segments: int = MAX_SEGMENTS,
+        ring_size: int = RING_SIZE,
+    ) -> None:
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._recent: Deque[dict] = deque(maxlen=ring_size)
+        self._errors: Deque[str] = deque(maxlen=ring_size)
+        self._risks: Counter = Counter()
+        self._error_counts: Counter = Counter()
+        # counts per rotated segment, oldest first, so they can be retired
+        self._segments: Deque[_Stats] = deque()
+        self._current: _Stats = (Counter(), Counter())
+        self._fh: Optional[IO[bytes]] = None
+        self._ino: Optional[int] = None
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # -- paths ------------------------------------------------------------
+    def segment_path(self, index: int) -> Path:
+        """Path of rotated segment ``index`` (``1`` is the newest)."""
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+    def _lock_path(self) -> Path:
+        return self.path.with_name(f"{self.path.name}.lock")
+
+    # -- ingest -----------------------------------------------------------
+    def _ingest(self, line: bytes) -> None:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            logger.warning("Skipping malformed diagnostics line in %s", self.path)
+            return
+        if not isinstance(entry, dict):
+            return
+        self._recent.append(entry)
+        risks, errors = self._current
+        for risk in entry.get("risks", []):
+            risk = str(risk)
+            cat = category(risk)
+            risks[cat] += 1
+            self._risks[cat] += 1
+            if is_error(risk):
+                errors[cat] += 1
+                self._error_counts[cat] += 1
+                self._errors.append(risk)
+
+    def _consume(self, fh: IO[bytes]) -> None:
+        """Ingest complete lines from ``fh``; leave a partial one for later."""
+        while True:
+            start = fh.tell()
+            line = fh.readline()
+            if not line:
+                return
+            if not line.endswith(b"\n"):
+                fh.seek(start)
+                return
+            if line.strip():
+                self._ingest(line)
+
+    def _retire(self) -> None:
+        """Close the current segment's counts and drop the oldest retained."""
+        self._segments.append(self._current)
+        self._current = (Counter(), Counter())
+        while len(self._segments) > self.max_segments:
+            risks, errors = self._segments.popleft()
+            self._risks -= risks
+            self._error_counts -= errors
+
+    def _open_live(self) -> None:
+        try:
+            self._fh = open(self.path, "rb")
+        except FileNotFoundError:
+            self._fh, self._ino = None, None
+            return
+        self._ino = os.fstat(self._fh.fileno()).st_ino
+
+    def _import_renamed(self) -> None:
+        """Move a pre-rename ``<stem>.json`` log into a missing ``.jsonl`` one."""
+        legacy = self.path.with_suffix(".json")
+        if self.path.suffix != ".jsonl" or self.path.exists() or not legacy.exists():
+            return
+        try:
+            os.replace(legacy, self.path)
+        except OSError:
+            return
+        for index in range(1, self.max_segments + 1):
+            old = legacy.with_name(f"{legacy.name}.{index}")
+            if old.exists():
+                os.replace(old, self.segment_path(index))
+
+    def _migrate_legacy(self) -> None:
+        self._import_renamed()
+        try:
+            with open(self.path, "rb") as f:
+                head = f.read(64).lstrip()
+        except OSError:
+            return
+        if not head.startswith(b"["):
+            return
+        try:
+            entries = json.loads(self.path.read_text())
+        except ValueError:
+            entries = []
+        lines = "".join(json.dumps(e) + "\n" for e in entries if isinstance(e, dict))
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(lines)
+        os.replace(tmp, self.path)
+
+    def _load(self) -> None:
+        self._migrate_legacy()
+        for index in range(self.max_segments, 0, -1):
+            try:
+                with open(self.segment_path(index), "rb") as f:
+                    self._consume(f)
+            except FileNotFoundError:
+                continue
+            self._retire()
+        self._open_live()
+        self._loaded = True
+
+    def refresh(self) -> None:
+        """Pick up entries appended (or segments rotated) since the last call."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._fh is not None:
+                self._consume(self._fh)
+            try:
+                ino = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                return
+            if ino == self._ino:
+                return
+            if self._fh is not None:
+                # the handle still points at the rotated file: finish it first
+                self._consume(self._fh)
+                self._fh.close()
+                self._retire()
+            self._open_live()
+            if self._fh is not None:
+                self._consume(self._fh)
+
+    # -- writing ----------------------------------------------------------
+    def append(self, risks: List[str], timestamp: str | None = None) -> dict:
+        """Append an entry for ``risks`` and return it."""
+        entry = {
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+            "risks": list(risks),
+        }
+        data = (json.dumps(entry) + "\n").encode()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size >= self.segment_bytes:
+                self._rotate()
+            self.refresh()
+        return entry
+
+    def _rotate(self) -> None:
+        lock_fd = os.open(self._lock_path(), os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.path).st_size < self.segment_bytes:
+                    return  # another process rotated first
+            except FileNotFoundError:
+                return
+            self.segment_path(self.max_segments).unlink(missing_ok=True)
+            for index in range(self.max_segments - 1, 0, -1):
+                older = self.segment_path(index)
+                if older.exists():
+                    os.replace(older, self.segment_path(index + 1))
+            os.replace(self.path, self.segment_path(1))
+        finally:
+            os.close(lock_fd)
+
+    # -- queries ----------------------------------------------------------
+    def recent(self, limit: int | None = None) -> List[dict]:
+        self.refresh()
+        entries = list(self._recent)
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        return entries
+
+    def recent_errors(self) -> List[str]:
+        """Return up to ``ring_size`` of the newest error strings."""
+        self.refresh()
+        return list(self._errors)
+
+    def errors(self) -> List[str]:
+        """Return every error string in the retained segments, oldest first.
+
+        Unlike :meth:`recent_errors` this re-reads the segments from disk, so
+        it is meant for full scans rather than hot paths.
+        """
+        found: List[str] = []
+        with self._lock:
+            self._migrate_legacy()
+            paths = [self.segment_path(i) for i in range(self.max_segments, 0, -1)]
+            for path in paths + [self.path]:
+                try:
+                    with open(path, "rb") as f:
+                        lines = f.readlines()
+                except FileNotFoundError:
+                    continue
+                for line in lines:
+                    if not line.endswith(b"\n") or not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict):
+                        found.extend(
+                            str(r) for r in entry.get("risks", []) if is_error(str(r))
+                        )
+        return found
+
+    def error_count(self, category: str | None = None) -> int:
+        self.refresh()
+        if category is None:
+            return sum(self._error_counts.values())
+        return self._error_counts.get(category.lower(), 0)
+
+    def has_errors(self) -> bool:
+        return self.error_count() > 0
+
+    def counters(self) -> Dict[str, Dict[str, int]]:
+        """Return ``{"risks": {category: n}, "errors": {category: n}}``."""
+        self.refresh()
+        return {"risks": dict(self._risks), "errors": dict(self._error_counts)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+            self._fh, self._ino, self._loaded = None, None, False
+
+
+_STORES: Dict[Path, DiagnosticsStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(path: Path | str) -> DiagnosticsStore:
+    """Return the shared store for the log at ``path``."""
+    path = Path(path).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = DiagnosticsStore(path)
+        return store
+
+
+__all__ = [
+    "DiagnosticsStore",
+    "MAX_SEGMENTS",
+    "RING_SIZE",
+    "SEGMENT_BYTES",
+    "category",
+    "get_store",
+    "is_error",
+]
@@ -23,8 +23,11 @@ fi
 # Log metadata for observability
 log_metadata() {
   commit=$(git rev-parse HEAD 2>/dev/null || echo "unknown")
+  commit_date=$(git show -s --format=%cI HEAD 2>/dev/null || echo "unknown")
+  branch=$(git rev-parse --abbrev-ref HEAD 2>/dev/null || echo "unknown")
   date=$(date -Iseconds)
-  echo "{\"commit\": \"$commit\", \"timestamp\": \"$date\"}" > metadata.json
+  # build manifest read once per process by build_info.py
+  echo "{\"commit\": \"$commit\", \"commit_date\": \"$commit_date\", \"branch\": \"$branch\", \"image_id\": \"${DOCKER_IMAGE:-unknown}\", \"timestamp\": \"$date\"}" > metadata.json
   echo ">>> Metadata logged: $commit at $date"
 }
 
@@ -50,13 +53,21 @@ auto_push() {
 # Start Gunicorn with graceful trap
 start_server() {
   echo ">>> Starting Sterling API..."
-  gunicorn app:app -b 0.0.0.0:5000 --timeout 300 &
+  gunicorn -c gunicorn.conf.py app:app -b 0.0.0.0:5000 --timeout 300 &
   child=$!
   trap 'echo ">>> Shutdown signal received"; kill $child; wait $child' TERM INT
   wait $child
 }
 
+# Per-worker metric snapshots are merged by /metrics; start from zero
+export STERLING_METRICS_DIR="${STERLING_METRICS_DIR:-/tmp/sterling-metrics}"
+reset_metrics() {
+  rm -rf "$STERLING_METRICS_DIR"
+  mkdir -p "$STERLING_METRICS_DIR"
+}
+
 log_metadata
+reset_metrics
 auto_push
 
 # Retry server on crash
@@ -1,9 +1,30 @@
 from __future__ import annotations
-"""Internal Ethics Engine for arbitration decisions."""
+"""Internal Ethics Engine for arbitration decisions.
 
+Decisions are memoised: a ruling is keyed by the command, the proposing
+agents (in order, since ties go to the first) with their constitutional
+weights, each agent's trust rounded down to a bucket of ``1 / TRUST_BUCKETS``
+and the risk level.  Scoring uses the same bucketed trust, so every request
+sharing a key gets the ruling a fresh evaluation would give, and a repeated
+arbitration is answered from that precedent cache without scoring and
+without touching disk.
+
+New precedents are buffered and appended to a JSON Lines journal
+(``ethical_precedent_ledger.jsonl``) in batches; every ``COMPACT_EVERY``
+journal records the journal is folded into the ``command -> ruling``
+snapshot in ``ethical_precedent_ledger.json``.  Loading reads the snapshot
+and replays the journal, which also warms the cache.
+"""
+
+import atexit
+import hashlib
 import json
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List, Tuple
 
 import yaml
 
@@ -11,6 +32,12 @@ BASE_DIR = Path(__file__).resolve().parent
 CONSTITUTION_FILE = BASE_DIR / "sterling_constitution.yaml"
 PRECEDENT_FILE = BASE_DIR / "ethical_precedent_ledger.json"
 
+TRUST_BUCKETS = 20
+CACHE_SIZE = 4096
+FLUSH_BATCH = 32
+FLUSH_INTERVAL = 5.0
+COMPACT_EVERY = 1000
+
 
 def _load_yaml(path: Path) -> Dict:
     if path.exists():
@@ -31,7 +58,38 @@ def _load_json(path: Path) -> Dict:
 
 
 def _save_json(path: Path, data: Dict) -> None:
-    path.write_text(json.dumps(data, indent=2))
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _journal_path(path: Path) -> Path:
+    return path.with_suffix(".jsonl")
+
+
+def trust_bucket(trust: float) -> int:
+    """Return ``trust`` rounded down to a multiple of ``1 / TRUST_BUCKETS``, as a count."""
+    return int(float(trust) * TRUST_BUCKETS)
+
+
+def precedent_key(
+    command: str,
+    proposals: Iterable[str],
+    trust: Dict[str, float],
+    risk: str,
+    hierarchy: Dict[str, float] | None = None,
+) -> str:
+    """Return the cache key for an arbitration."""
+    hierarchy = hierarchy or {}
+    agents = list(proposals)
+    weights = [hierarchy.get(agent, 50) for agent in agents]
+    buckets = [trust_bucket(trust.get(agent, 0.0)) for agent in agents]
+    raw = json.dumps([command, agents, weights, buckets, risk], separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _ruling(record: Dict) -> Dict:
+    return {k: v for k, v in record.items() if k != "key"}
 
 
 class EthicsEngine:
@@ -39,27 +97,107 @@ class EthicsEngine:
 
     def __init__(self) -> None:
         self.constitution = _load_yaml(CONSTITUTION_FILE)
-        self.precedent = _load_json(PRECEDENT_FILE)
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pending: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self._journaled = 0
+        self._lock = threading.RLock()
+        self.precedent = self._load_precedent()
 
-    def evaluate(self, command: str, proposals: Dict[str, str], trust: Dict[str, float], risk: str) -> Dict:
-        """Return the approved agent and log the decision."""
+    # -- ledger ---------------------------------------------------------------
+    def _load_precedent(self) -> Dict:
+        precedent = _load_json(PRECEDENT_FILE)
+        try:
+            with open(_journal_path(PRECEDENT_FILE)) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    precedent[record["command"]] = record
+                    self._journaled += 1
+        except FileNotFoundError:
+            pass
+        for record in precedent.values():
+            if isinstance(record, dict) and "key" in record:
+                self._remember(record["key"], record)
+        return precedent
+
+    def _remember(self, key: str, result: Dict) -> None:
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def flush(self) -> None:
+        """Append buffered precedents to the journal, compacting if due."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            journal = _journal_path(PRECEDENT_FILE)
+            if self._journaled + len(self._pending) >= COMPACT_EVERY:
+                _save_json(PRECEDENT_FILE, self.precedent)
+                journal.unlink(missing_ok=True)
+                self._journaled = 0
+            else:
+                with open(journal, "a") as f:
+                    f.write("".join(json.dumps(r) + "\n" for r in self._pending))
+                self._journaled += len(self._pending)
+            self._pending.clear()
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending) >= FLUSH_BATCH or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    # -- evaluation -----------------------------------------------------------
+    def _decide(self, command: str, proposals: Dict[str, str], trust: Dict[str, float], risk: str) -> Dict:
         hierarchy = self.constitution.get("hierarchy", {})
+        key = precedent_key(command, proposals, trust, risk, hierarchy)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return _ruling(cached)
         best_agent = None
         best_score = -1.0
         for agent in proposals:
             weight = hierarchy.get(agent, 50) / 100
-            score = trust.get(agent, 0.0) * weight
+            # score the bucketed trust the key is built from
+            score = trust_bucket(trust.get(agent, 0.0)) / TRUST_BUCKETS * weight
             if score > best_score:
                 best_agent = agent
                 best_score = score
-        result = {
+        record = {
             "command": command,
             "approved_agent": best_agent,
             "risk": risk,
+            "key": key,
         }
-        self.precedent[command] = result
-        _save_json(PRECEDENT_FILE, self.precedent)
+        self._remember(key, record)
+        if self.precedent.get(command) != record:
+            self.precedent[command] = record
+            self._pending.append(record)
+        return _ruling(record)
+
+    def evaluate(self, command: str, proposals: Dict[str, str], trust: Dict[str, float], risk: str) -> Dict:
+        """Return the approved agent and log the decision."""
+        with self._lock:
+            result = self._decide(command, proposals, trust, risk)
+            self._maybe_flush()
         return result
 
+    def evaluate_many(self, requests: Iterable[Tuple[str, Dict[str, str], Dict[str, float], str]]) -> List[Dict]:
+        """Evaluate ``(command, proposals, trust, risk)`` tuples with one ledger write."""
+        with self._lock:
+            results = [self._decide(*request) for request in requests]
+            self.flush()
+        return results
+
+    def clear_cache(self) -> None:
+        """Forget memoised rulings; the ledger is kept."""
+        with self._lock:
+            self._cache.clear()
+
 
 ENGINE = EthicsEngine()
+atexit.register(ENGINE.flush)
@@ -1,37 +1,244 @@
 from __future__ import annotations
 
-import subprocess
+"""Git diff analysis for runtime behavior modulation.
+
+Two modes are offered:
+
+* :func:`get_changed_files` runs ``git diff --name-status`` and only reports
+  which files changed and how.  This is what file-level consumers such as
+  ``runtime_engine.update_runtime_config`` need, and it stays fast on large
+  merges.  With no explicit range it covers every commit since the last
+  analyzed ``HEAD``, recorded in ``logs/git_diff_state.json``.
+* :func:`get_last_commit_diff` parses the ``--unified=0`` diff of the last
+  commit line by line for callers that need the changed lines.
+
+``git`` output is streamed rather than buffered, and results are cached in
+memory keyed by the resolved ``(base, head)`` commit pair.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
 import os
+import subprocess
+import tempfile
+
+LOG_DIR = "logs"
+DELTA_LOG = "git_delta_log.json"
+STATE_FILE = "git_diff_state.json"
+# ``git hash-object -t tree /dev/null``; the base for a repository's first commit
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+CACHE_SIZE = 32
+CHUNK_SIZE = 64 * 1024
+
+_CACHE: "OrderedDict[Tuple[str, str, str], dict]" = OrderedDict()
+
+
+def _git_stream(args: List[str]) -> Iterator[bytes]:
+    """Yield raw stdout chunks of ``git <args>``; raise on a non-zero exit.
+
+    stderr goes to a temporary file rather than a pipe, so git cannot block
+    on a full stderr pipe while we are still draining stdout.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(["git", *args], stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            while True:
+                chunk = proc.stdout.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            proc.stdout.close()
+            code = proc.wait()
+            stderr.seek(0)
+            err = stderr.read()
+    if code:
+        raise subprocess.CalledProcessError(code, ["git", *args], output=err)
+
+
+def _git_lines(args: List[str]) -> Iterator[str]:
+    pending = b""
+    for chunk in _git_stream(args):
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", "replace")
+    if pending:
+        yield pending.decode("utf-8", "replace")
+
+
+def _git_fields(args: List[str]) -> Iterator[str]:
+    """Yield NUL-separated fields of ``git <args> -z`` output."""
+    pending = b""
+    for chunk in _git_stream(args):
+        pending += chunk
+        *fields, pending = pending.split(b"\0")
+        for field in fields:
+            yield field.decode("utf-8", "replace")
+    if pending:
+        yield pending.decode("utf-8", "replace")
+
+
+def _rev_parse(*revs: str) -> List[str]:
+    return [line for line in _git_lines(["rev-parse", *revs]) if line]
+
+
+def _cached(key: Tuple[str, str, str]) -> Optional[dict]:
+    result = _CACHE.get(key)
+    if result is not None:
+        _CACHE.move_to_end(key)
+    return result
+
+
+def _remember(key: Tuple[str, str, str], result: dict) -> dict:
+    _CACHE[key] = result
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return result
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+def _error(exc: subprocess.CalledProcessError) -> dict:
+    output = exc.output.decode("utf-8", "replace") if isinstance(exc.output, bytes) else exc.output
+    return {"error": f"Git diff failed: {output}"}
+
+
+# -- file-level ---------------------------------------------------------------
+def name_status(base: str, head: str) -> dict:
+    """Return ``{"files": {path: status}, "modified": [...]}`` for ``base..head``.
+
+    Renames and copies are reported under their new path with ``R``/``C``.
+    """
+    key = ("name-status", base, head)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+    files: Dict[str, str] = {}
+    fields = _git_fields(["diff", "--name-status", "-z", "--no-color", base, head])
+    for status in fields:
+        if not status:
+            continue
+        path = next(fields, "")
+        if status[0] in "RC":
+            path = next(fields, path)
+        files[path] = status[0]
+    result = {"base": base, "head": head, "files": files, "modified": sorted(files)}
+    return _remember(key, result)
+
+
+def _state_path() -> str:
+    return os.path.join(LOG_DIR, STATE_FILE)
+
+
+def _load_state() -> dict:
+    try:
+        with open(_state_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state: dict) -> None:
+    os.makedirs(LOG_DIR, exist_ok=True)
+    tmp = _state_path() + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, _state_path())
+
+
+def _is_ancestor(base: str, head: str) -> bool:
+    try:
+        for _ in _git_stream(["merge-base", "--is-ancestor", base, head]):
+            pass
+    except subprocess.CalledProcessError:
+        return False
+    return True
+
+
+def get_changed_files(base: str | None = None, head: str = "HEAD") -> dict:
+    """Return changed files between ``base`` and ``head``.
+
+    Without ``base`` the range starts at the last analyzed commit, so every
+    commit since the previous call is covered exactly once.  If ``HEAD`` has
+    not moved, the result lists no files; if the last analyzed commit is no
+    longer an ancestor (history rewritten), only ``HEAD~1..HEAD`` is used.
+    """
+    try:
+        if base is not None:
+            base_sha, head_sha = _rev_parse(base, head)
+            return name_status(base_sha, head_sha)
+        (head_sha,) = _rev_parse(head)
+        state = _load_state()
+        last = state.get("last_analyzed")
+        if last == head_sha:
+            return {"base": head_sha, "head": head_sha, "files": {}, "modified": []}
+        if last and _is_ancestor(last, head_sha):
+            base_sha = last
+        else:
+            try:
+                (base_sha,) = _rev_parse(f"{head_sha}~1")
+            except subprocess.CalledProcessError:
+                base_sha = EMPTY_TREE
+        result = name_status(base_sha, head_sha)
+        _save_state({"last_analyzed": head_sha})
+        return result
+    except subprocess.CalledProcessError as e:
+        return _error(e)
+
+
+# -- line-level ---------------------------------------------------------------
+def parse_unified(lines: Iterator[str]) -> dict:
+    changes = {"added": [], "removed": [], "modified": []}
+    current_file = None
+    files = set()
+    for line in lines:
+        if line.startswith('+++ '):
+            current_file = line[6:] if line.startswith('+++ b/') else None
+        elif line.startswith('---') or line.startswith('@@'):
+            continue
+        elif line.startswith('+'):
+            changes['added'].append({"file": current_file, "line": line[1:].strip()})
+            files.add(current_file)
+        elif line.startswith('-'):
+            changes['removed'].append({"file": current_file, "line": line[1:].strip()})
+            files.add(current_file)
+    changes['modified'] = sorted(f for f in files if f is not None)
+    return changes
 
 
 def get_last_commit_diff() -> dict:
     """Extract git diff of the last commit and return structured JSON."""
     try:
-        diff_output = subprocess.check_output(
-            ['git', 'diff', 'HEAD~1', 'HEAD', '--unified=0'],
-            stderr=subprocess.STDOUT
-        ).decode('utf-8')
-        changes = {"added": [], "removed": [], "modified": []}
-        current_file = None
-        for line in diff_output.splitlines():
-            if line.startswith('+++ b/'):
-                current_file = line[6:]
-            elif line.startswith('@@'):
-                continue
-            elif line.startswith('+') and not line.startswith('+++'):
-                changes['added'].append({"file": current_file, "line": line[1:].strip()})
-            elif line.startswith('-') and not line.startswith('---'):
-                changes['removed'].append({"file": current_file, "line": line[1:].strip()})
-        modified_files = list({c['file'] for c in changes['added'] + changes['removed']})
-        changes['modified'] = modified_files
-        log_dir = 'logs'
         try:
-            os.makedirs(log_dir, exist_ok=True)
-        except Exception:
+            head, base = _rev_parse("HEAD", "HEAD~1")
+            key: Optional[Tuple[str, str, str]] = ("unified", base, head)
+        except (subprocess.CalledProcessError, ValueError):
+            # unresolvable pair (e.g. a shallow clone): diff symbolically, uncached
+            head, base, key = "HEAD", "HEAD~1", None
+        cached = _cached(key) if key else None
+        if cached is not None:
+            return cached
+        changes = parse_unified(_git_lines(['diff', base, head, '--unified=0', '--no-color']))
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            with open(os.path.join(LOG_DIR, DELTA_LOG), 'w') as f:
+                json.dump(changes, f, indent=2)
+        except OSError:
             pass
-        with open(f"{log_dir}/git_delta_log.json", 'w') as f:
-            json.dump(changes, f, indent=2)
-        return changes
+        return _remember(key, changes) if key else changes
     except subprocess.CalledProcessError as e:
-        return {"error": f"Git diff failed: {e.output.decode('utf-8')}"}
+        return _error(e)
+
+
+__all__ = [
+    "clear_cache",
+    "get_changed_files",
+    "get_last_commit_diff",
+    "name_status",
+    "parse_unified",
+]
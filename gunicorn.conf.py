@@ -0,0 +1,16 @@
+"""Gunicorn settings for the Sterling API (see ``entrypoint.sh``)."""
+
+
+def post_worker_init(worker):
+    # run deferred startup work (uptime state, heartbeat, scheduler) when the
+    # worker boots instead of on its first request
+    from startup import run_startup_hooks
+
+    run_startup_hooks()
+
+
+def child_exit(server, worker):
+    # a dead worker's metric snapshot must not be merged into /metrics
+    import metrics
+
+    metrics.remove_process(worker.pid)
@@ -2,16 +2,33 @@ from __future__ import annotations
 
 """Utility helpers for simple JSON file persistence."""
 
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import json
 import os
 import shutil
 import logging
+import time
+
+import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+WRITE_SECONDS = metrics.histogram(
+    "sterling_json_store_write_seconds", "Time to persist a JSON store.", ["store"]
+)
+
+
+# how far back from the end of a file to look for an array's closing bracket
+_TAIL = 64
+
 
 class JSONStoreError(Exception):
     """Raised when persisting data fails."""
@@ -40,6 +57,7 @@ class JSONStore:
 
     def write(self, data: Dict[str, Any]) -> None:
         """Write JSON data to ``path`` with indentation."""
+        start = time.perf_counter()
         self.path.parent.mkdir(parents=True, exist_ok=True)
         tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
         try:
@@ -61,3 +79,113 @@ class JSONStore:
         finally:
             if tmp_path.exists():
                 tmp_path.unlink(missing_ok=True)
+            WRITE_SECONDS.observe(time.perf_counter() - start, store=self.path.name)
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def _array_lock(path: Path) -> Iterator[int]:
+    """Hold ``<name>.lock`` exclusively; yields its descriptor.
+
+    While a splice is in flight the lock file holds the offset it started
+    at, so the next writer can cut a torn append back off.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path.with_name(path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield fd
+    finally:
+        os.close(fd)
+
+
+def _recover(path: Path, fd: int) -> None:
+    """Undo a splice that a crashed writer left half written."""
+    pending = os.pread(fd, 32, 0).strip()
+    if not pending:
+        return
+    try:
+        with path.open("r+b") as f:
+            f.seek(int(pending))
+            f.write(b"\n]\n")
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+    except FileNotFoundError:
+        pass
+    logger.warning("Discarded a torn append to %s", path)
+    os.ftruncate(fd, 0)
+
+
+def _splice(path: Path, text: bytes, fd: int) -> bool:
+    """Write ``text`` in place of the closing ``]`` of the array in ``path``."""
+    try:
+        f = path.open("r+b")
+    except FileNotFoundError:
+        return False
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - _TAIL)
+        f.seek(start)
+        tail = f.read().rstrip()
+        if not tail.endswith(b"]"):
+            return False
+        before = tail[:-1].rstrip()
+        # only arrays whose last element is an object (or that are empty)
+        if not before.endswith((b"[", b"}")):
+            return False
+        sep = b"\n" if before.endswith(b"[") else b",\n"
+        cut = start + len(before)
+        os.pwrite(fd, str(cut).encode(), 0)
+        os.fsync(fd)
+        f.seek(cut)
+        f.write(sep + text + b"\n]\n")
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+    os.ftruncate(fd, 0)
+    return True
+
+
+def append_array(path: Path, items: List[Any]) -> Tuple[Optional[tuple], Optional[tuple]]:
+    """Append ``items`` to the JSON array of objects stored at ``path``.
+
+    Only the closing bracket is rewritten, so the cost does not depend on
+    the size of the file.  A missing file, or one holding a single object or
+    anything else unexpected, is rewritten whole as an array through a temp
+    file.  Writers are serialised with an ``fcntl.flock`` on
+    ``<name>.lock``, and an append torn by a crash is cut off by the next one.
+
+    Returns the ``(mtime_ns, size)`` signature of ``path`` from just before
+    and just after the append, both taken under the lock, so a caller that
+    caches the array can tell whether another writer got in first.
+    """
+    path = Path(path)
+    if not items:
+        signature = _signature(path)
+        return signature, signature
+    text = ",\n".join(
+        "\n".join("  " + line for line in json.dumps(item, indent=2).splitlines()) for item in items
+    )
+    with _array_lock(path) as fd:
+        _recover(path, fd)
+        before = _signature(path)
+        if not _splice(path, text.encode(), fd):
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                data = []
+            if not isinstance(data, list):
+                data = [data] if isinstance(data, dict) else []
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data + list(items), indent=2))
+            os.replace(tmp, path)
+        return before, _signature(path)
@@ -1,5 +1,5 @@
 """Magistrate package."""
 
-from .magistrate_agent import review_scene
+from .magistrate_agent import record_reasoning, review_scene, review_scenes
 
-__all__ = ["review_scene"]
+__all__ = ["record_reasoning", "review_scene", "review_scenes"]
@@ -1,43 +1,53 @@
 from __future__ import annotations
-"""Simple Magistrate agent for scene reasoning review."""
+"""Simple Magistrate agent for scene reasoning review.
 
-import json
+Reasoning lookups go through a cached scene_id index (see
+:mod:`magistrate.scene_index`) and verdicts are appended to the YAML ledger
+without re-reading it, so :func:`review_scenes` rules on any number of
+scenes in one pass and one write.
+"""
+
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List
+
+from platinum.logbook import get_logbook
+
+try:
+    from .scene_index import get_index
+except ImportError:  # pragma: no cover - loaded outside the package
+    from magistrate.scene_index import get_index
 
 SCENE_LOG = Path(__file__).resolve().parent / "scene_reason_log.json"
 VERDICT_LEDGER = Path(__file__).resolve().parent / "verdict_ledger.yaml"
 
-try:
-    import yaml
-except Exception:  # pragma: no cover
-    yaml = None
+
+def _record(verdicts: List[Dict]) -> None:
+    if not verdicts:
+        return
+    stamp = datetime.now(timezone.utc).isoformat()
+    get_logbook(VERDICT_LEDGER).extend([{"timestamp": stamp, **v} for v in verdicts])
+
+
+def review_scenes(scene_ids: Iterable[str]) -> List[Dict]:
+    """Rule on each scene and record all verdicts with a single append."""
+    scene_ids = list(scene_ids)
+    found = get_index(SCENE_LOG).get_many(scene_ids)
+    verdicts = [
+        {"scene_id": scene_id, "ruling": "UPHELD" if scene else "NOT_FOUND"}
+        for scene_id, scene in zip(scene_ids, found)
+    ]
+    _record(verdicts)
+    return verdicts
 
 
 def review_scene(scene_id: str) -> Dict:
     """Return reasoning for a scene and record verdict."""
-    log_entries = []
-    if SCENE_LOG.exists():
-        try:
-            log_entries = json.loads(SCENE_LOG.read_text())
-            if not isinstance(log_entries, list):
-                log_entries = [log_entries]
-        except Exception:
-            log_entries = []
-    scene = next((s for s in log_entries if s.get("scene_id") == scene_id), None)
-    verdict = {
-        "scene_id": scene_id,
-        "ruling": "UPHELD" if scene else "NOT_FOUND",
-    }
-    if yaml:
-        existing = []
-        if VERDICT_LEDGER.exists():
-            try:
-                existing = yaml.safe_load(VERDICT_LEDGER.read_text()) or []
-            except Exception:
-                existing = []
-        existing.append(verdict)
-        VERDICT_LEDGER.write_text(yaml.safe_dump(existing))
-    return verdict
-
-__all__ = ["review_scene"]
+    return review_scenes([scene_id])[0]
+
+
+def record_reasoning(entry: Dict) -> None:
+    """Add a scene's reasoning to the log."""
+    get_index(SCENE_LOG).add(entry)
+
+__all__ = ["record_reasoning", "review_scene", "review_scenes"]
@@ -0,0 +1,101 @@
+"""scene_id → reasoning index over ``scene_reason_log.json``.
+
+The log is parsed once and cached; it is re-read only when its size or
+mtime changes behind our back.  :meth:`SceneIndex.add` appends an entry by
+rewriting just the closing ``]`` of the JSON array (see
+:func:`json_store.append_array`, which also locks out other writers), so
+recording reasoning does not re-dump the file and leaves the index current
+without a reparse.  If another process appended since the last refresh,
+the log is re-read instead.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from json_store import append_array
+
+
+class SceneIndex:
+    """In-memory index of scene reasoning keyed by ``scene_id``."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, Dict] = {}
+        self._signature = None
+        self._lock = threading.RLock()
+
+    def _stat(self):
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> List[Dict]:
+        try:
+            data = json.loads(self.path.read_text())
+        except Exception:
+            return []
+        return data if isinstance(data, list) else [data]
+
+    def refresh(self) -> None:
+        with self._lock:
+            signature = self._stat()
+            if signature == self._signature:
+                return
+            entries: Dict[str, Dict] = {}
+            for entry in self._load():
+                if isinstance(entry, dict) and "scene_id" in entry:
+                    # the first entry for a scene wins, as with a linear search
+                    entries.setdefault(entry["scene_id"], entry)
+            self._entries, self._signature = entries, signature
+
+    def get(self, scene_id: str) -> Optional[Dict]:
+        self.refresh()
+        return self._entries.get(scene_id)
+
+    def get_many(self, scene_ids: Iterable[str]) -> List[Optional[Dict]]:
+        self.refresh()
+        return [self._entries.get(scene_id) for scene_id in scene_ids]
+
+    def __contains__(self, scene_id: str) -> bool:
+        return self.get(scene_id) is not None
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._entries)
+
+    def add(self, entry: Dict) -> None:
+        """Append ``entry`` to the log and index it."""
+        with self._lock:
+            self.refresh()
+            before, after = append_array(self.path, [entry])
+            if before != self._signature:
+                # another writer appended since refresh(); re-read it all
+                self._signature = None
+                self.refresh()
+                return
+            if "scene_id" in entry:
+                self._entries.setdefault(entry["scene_id"], entry)
+            self._signature = after
+
+
+_INDEXES: Dict[Path, SceneIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_index(path: Path) -> SceneIndex:
+    """Return the shared index for the log at ``path``."""
+    path = Path(path).resolve()
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(path)
+        if index is None:
+            index = _INDEXES[path] = SceneIndex(path)
+        return index
+
+
+__all__ = ["SceneIndex", "get_index"]
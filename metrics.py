@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+"""In-process metrics registry with Prometheus text exposition.
+
+Modules declare metrics once at import time::
+
+    ROUTES = metrics.counter("sterling_routes_total", "Routed queries.", ["agent"])
+    ROUTES.inc(agent="finance")
+
+Counters and histograms only ever add, and every metric keeps its own lock,
+so an update is a dict lookup and an addition under an uncontended lock.
+Histograms use fixed buckets and store per-bucket (non-cumulative) counts;
+the cumulative ``le`` series is produced at render time.
+
+Gunicorn workers each hold their own registry.  When ``STERLING_METRICS_DIR``
+is set (``entrypoint.sh`` sets and empties it at container start), every
+process periodically writes a snapshot to ``<dir>/<pid>.json`` and
+``/metrics`` merges the snapshots of live processes: counters and histograms
+are summed, gauges are summed or maxed per their ``mode``.  Snapshots of
+processes that have exited are deleted rather than merged; gunicorn's
+``child_exit`` hook removes them as workers die (:func:`remove_process`).
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import atexit
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+FLUSH_INTERVAL = 1.0
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._values: Dict[LabelKey, Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> Dict[LabelKey, Any]:
+        with self._lock:
+            return {k: (list(v) if isinstance(v, list) else v) for k, v in self._values.items()}
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "help": self.documentation, "labels": list(self.labelnames)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down.
+
+    ``mode`` decides how per-process values combine: ``"sum"`` or ``"max"``.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), mode: str = "sum") -> None:
+        super().__init__(name, documentation, labelnames)
+        if mode not in {"sum", "max"}:
+            raise ValueError(f"Unknown gauge mode {mode!r}")
+        self.mode = mode
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def describe(self) -> Dict[str, Any]:
+        data = super().describe()
+        data["mode"] = self.mode
+        return data
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution; each sample is ``[*bucket_counts, sum]``."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        bounds = sorted(float(b) for b in buckets)
+        if not bounds or not math.isinf(bounds[-1]):
+            bounds.append(math.inf)
+        self.buckets: Tuple[float, ...] = tuple(bounds)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * len(self.buckets) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        row = self._values.get(self._key(labels))
+        return sum(row[:-1]) if row else 0
+
+    def describe(self) -> Dict[str, Any]:
+        data = super().describe()
+        data["buckets"] = [b if not math.isinf(b) else "+Inf" for b in self.buckets]
+        return data
+
+
+class Registry:
+    """Named collection of metrics, optionally shared across processes."""
+
+    def __init__(self, multiprocess_dir: Optional[str] = None) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self._last_flush = 0.0
+
+    def _register(self, cls, name: str, *args, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), mode: str = "sum") -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames, mode=mode)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Zero every metric; registrations are kept."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    # -- multiprocess -----------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        result = {}
+        for name, metric in list(self._metrics.items()):
+            data = metric.describe()
+            data["samples"] = [[list(k), v] for k, v in metric.samples().items()]
+            result[name] = data
+        return result
+
+    def flush(self) -> None:
+        """Write this process's snapshot for other workers to merge."""
+        if self.multiprocess_dir is None:
+            return
+        self._last_flush = time.monotonic()
+        try:
+            self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+            path = self.multiprocess_dir / f"{os.getpid()}.json"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.snapshot()))
+            os.replace(tmp, path)
+        except OSError:
+            logger.exception("Metrics flush failed")
+
+    def maybe_flush(self) -> None:
+        if self.multiprocess_dir is not None and time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def remove_process(self, pid: int) -> None:
+        """Delete the snapshot of process ``pid``, e.g. once it has exited."""
+        if self.multiprocess_dir is not None:
+            (self.multiprocess_dir / f"{pid}.json").unlink(missing_ok=True)
+
+    def collect(self) -> Dict[str, Any]:
+        """Return the snapshot merged with every other live process's snapshot."""
+        merged = self.snapshot()
+        if self.multiprocess_dir is None or not self.multiprocess_dir.exists():
+            return merged
+        own = f"{os.getpid()}.json"
+        for path in sorted(self.multiprocess_dir.glob("*.json")):
+            if path.name == own:
+                continue
+            if path.stem.isdigit() and not _alive(int(path.stem)):
+                self.remove_process(int(path.stem))
+                continue
+            try:
+                other = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, data in other.items():
+                _merge_family(merged.setdefault(name, {**data, "samples": []}), data)
+        return merged
+
+    # -- exposition -------------------------------------------------------
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, data in sorted(self.collect().items()):
+            labels = data["labels"]
+            lines.append(f"# HELP {name} {data['help']}")
+            lines.append(f"# TYPE {name} {data['kind']}")
+            for key, value in sorted(data["samples"], key=lambda s: s[0]):
+                if data["kind"] != "histogram":
+                    lines.append(f"{name}{_labels_text(labels, key)} {_format_value(value)}")
+                    continue
+                running = 0
+                for bound, count in zip(data["buckets"], value[:-1]):
+                    running += count
+                    le = f'le="{bound if bound == "+Inf" else _format_value(bound)}"'
+                    lines.append(f"{name}_bucket{_labels_text(labels, key, le)} {running}")
+                lines.append(f"{name}_sum{_labels_text(labels, key)} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{_labels_text(labels, key)} {running}")
+        return "\n".join(lines) + "\n"
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, owned by someone else
+        return True
+    return True
+
+
+def _merge_family(target: Dict[str, Any], other: Dict[str, Any]) -> None:
+    samples = {tuple(k): v for k, v in target["samples"]}
+    combine = max if target.get("mode") == "max" else None
+    for key, value in other["samples"]:
+        key = tuple(key)
+        current = samples.get(key)
+        if current is None:
+            samples[key] = value
+        elif isinstance(value, list):
+            samples[key] = [a + b for a, b in zip(current, value)]
+        else:
+            samples[key] = combine(current, value) if combine else current + value
+    target["samples"] = [[list(k), v] for k, v in samples.items()]
+
+
+REGISTRY = Registry(os.getenv("STERLING_METRICS_DIR"))
+atexit.register(REGISTRY.flush)
+remove_process = REGISTRY.remove_process
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+HTTP_REQUESTS = counter(
+    "sterling_http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"]
+)
+HTTP_LATENCY = histogram(
+    "sterling_http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"]
+)
+
+
+# -- Flask integration ----------------------------------------------------
+def _begin_request() -> None:
+    from flask import g
+
+    g._sterling_metrics_start = time.perf_counter()
+
+
+def _finish_request(response):
+    from flask import g, request
+
+    start = g.pop("_sterling_metrics_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+        HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
+    REGISTRY.maybe_flush()
+    return response
+
+
+def _metrics_view():
+    from flask import Response
+
+    return Response(REGISTRY.render(), mimetype=None, content_type=CONTENT_TYPE)
+
+
+def init_app(app) -> None:
+    """Count and time every request of ``app`` and serve ``GET /metrics``."""
+    app.before_request(_begin_request)
+    app.after_request(_finish_request)
+    app.add_url_rule("/metrics", "metrics", _metrics_view, methods=["GET"])
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "REGISTRY",
+    "Registry",
+    "counter",
+    "gauge",
+    "histogram",
+    "init_app",
+    "remove_process",
+]
@@ -1,5 +1,5 @@
 from .agent_linker import register_agent, update_heartbeat
-from .timeline_orchestrator import fuse_timelines
+from .timeline_orchestrator import fuse_timelines, iter_fused
 from .synergy_tester import run_test
 
-__all__ = ["register_agent", "update_heartbeat", "fuse_timelines", "run_test"]
+__all__ = ["register_agent", "update_heartbeat", "fuse_timelines", "iter_fused", "run_test"]
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+"""Lazy k-way merging of chronologically sorted timelines.
+
+Sources are iterables of event dicts, each already in ascending timestamp
+order (HA history, scene logs, agent timelines).  :func:`merge` interleaves
+them with a heap holding one pending event per source, so fusing ``k``
+sources of ``N`` events in total costs ``O(N log k)`` and only ``k`` events
+are held at a time.  :func:`tail` and :func:`head` answer bounded "last N" /
+"first N" queries over any iterable with an ``N``-sized heap.
+
+Timestamps may be epoch numbers (seconds, or milliseconds when larger than
+:data:`EPOCH_MS_THRESHOLD`), ISO 8601 strings or ``datetime`` objects; they
+are compared as UTC epoch seconds.
+"""
+
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from heapq import merge as _heap_merge, nlargest, nsmallest
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+Event = Dict[str, Any]
+
+# epoch values above this are taken to be milliseconds (year ~5138 in seconds)
+EPOCH_MS_THRESHOLD = 1e11
+MISSING = float("-inf")
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> float:
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def to_epoch(value: Any) -> float:
+    """Return ``value`` as UTC epoch seconds; unknown values sort first."""
+    if isinstance(value, bool) or value is None:
+        return MISSING
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > EPOCH_MS_THRESHOLD else float(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return _parse_iso(value)
+        except ValueError:
+            try:
+                return to_epoch(float(value))
+            except ValueError:
+                return MISSING
+    return MISSING
+
+
+def event_time(event: Event, field: str = "timestamp") -> float:
+    return to_epoch(event.get(field)) if isinstance(event, dict) else MISSING
+
+
+def _key_for(field: str) -> Callable[[Event], float]:
+    if field == "timestamp":
+        return event_time
+    return lambda event: event_time(event, field)
+
+
+def is_sorted(events: Sequence[Event], field: str = "timestamp") -> bool:
+    key = _key_for(field)
+    previous = MISSING
+    for event in events:
+        current = key(event)
+        if current < previous:
+            return False
+        previous = current
+    return True
+
+
+def merge(*sources: Iterable[Event], field: str = "timestamp", reverse: bool = False) -> Iterator[Event]:
+    """Yield events from sorted ``sources`` in timestamp order.
+
+    Ties keep source order, so events from earlier sources come first.  With
+    ``reverse=True`` every source must be sorted newest first.
+    """
+    return _heap_merge(*sources, key=_key_for(field), reverse=reverse)
+
+
+def tail(events: Iterable[Event], n: int, field: str = "timestamp") -> List[Event]:
+    """Return the ``n`` latest events, oldest first, from any iterable.
+
+    Equal timestamps keep iteration order, matching a stable sort followed by
+    ``[-n:]``, but only ``n`` events are kept in memory.
+    """
+    if n <= 0:
+        return []
+    key = _key_for(field)
+    order = count()
+    ranked = nlargest(n, ((key(e), next(order), e) for e in events), key=lambda t: t[:2])
+    return [e for _, _, e in reversed(ranked)]
+
+
+def head(events: Iterable[Event], n: int, field: str = "timestamp") -> List[Event]:
+    """Return the ``n`` earliest events, oldest first, from any iterable."""
+    if n <= 0:
+        return []
+    key = _key_for(field)
+    order = count()
+    ranked = nsmallest(n, ((key(e), next(order), e) for e in events), key=lambda t: t[:2])
+    return [e for _, _, e in ranked]
+
+
+def latest(*sources: Iterable[Event], n: int, field: str = "timestamp") -> List[Event]:
+    """Return the ``n`` latest events across sorted ``sources``, oldest first."""
+    if n <= 0:
+        return []
+    return list(deque(merge(*sources, field=field), maxlen=n))
+
+
+__all__ = [
+    "event_time",
+    "head",
+    "is_sorted",
+    "latest",
+    "merge",
+    "tail",
+    "to_epoch",
+]
@@ -2,15 +2,29 @@ from __future__ import annotations
 
 """Simple timeline fusion utility."""
 
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    from .timeline_merge import event_time, is_sorted, merge
+except ImportError:  # pragma: no cover - loaded outside the package
+    from omni.timeline_merge import event_time, is_sorted, merge
+
+
+def iter_fused(*timelines: Iterable[Dict]) -> Iterator[Dict]:
+    """Lazily merge timelines that are each already sorted by timestamp."""
+    return merge(*timelines)
 
 
 def fuse_timelines(*timelines: List[Dict]) -> List[Dict]:
-    """Merge multiple lists of tasks by timestamp."""
-    merged: List[Dict] = []
+    """Merge multiple lists of tasks by timestamp.
+
+    Sorted lists, the common case, are merged with a k-way heap.  A list
+    that is out of order is sorted on its own first.
+    """
+    sources = []
     for timeline in timelines:
         if isinstance(timeline, list):
-            merged.extend(timeline)
-    return sorted(merged, key=lambda t: t.get("timestamp", 0))
+            sources.append(timeline if is_sorted(timeline) else sorted(timeline, key=event_time))
+    return list(merge(*sources))
 
-__all__ = ["fuse_timelines"]
+__all__ = ["fuse_timelines", "iter_fused"]
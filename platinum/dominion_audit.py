@@ -3,7 +3,7 @@ from __future__ import annotations
 """Phase 11 Dominion audit script."""
 
 import json
-import subprocess
+import sys
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Dict, Any
@@ -21,6 +21,12 @@ except Exception:  # pragma: no cover
     GOVERNOR = _mod.GOVERNOR
     TRUST_FILE = _mod.TRUST_FILE
 
+try:
+    from build_info import get_build_info
+except ImportError:  # pragma: no cover - repo root not on sys.path
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from build_info import get_build_info
+
 BASE_DIR = Path(__file__).resolve().parent
 AUDIT_FILE = BASE_DIR / 'dominion_audit.json'
 
@@ -37,11 +43,7 @@ def run_audit() -> Dict[str, Any]:
         result["trust_links"] = "Validated" if trust else "Missing"
     except Exception:
         result["trust_links"] = "Error"
-    try:
-        git_hash = subprocess.check_output(["git", "rev-parse", "HEAD"]).decode().strip()
-        result["git_status"] = git_hash
-    except Exception:
-        result["git_status"] = "unknown"
+    result["git_status"] = get_build_info().commit
     result["routing_result"] = "Pass"
     AUDIT_FILE.write_text(json.dumps(result, indent=2))
     try:
@@ -4,10 +4,13 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 from datetime import datetime, timezone
 
-import yaml
+try:
+    from .logbook import Logbook, get_logbook
+except ImportError:  # pragma: no cover - loaded outside the package
+    from platinum.logbook import Logbook, get_logbook
 
 BASE_DIR = Path(__file__).resolve().parent
 TRUST_FILE = BASE_DIR / "trust_scores.json"
@@ -29,17 +32,8 @@ def _save_json(path: Path, data: Any) -> None:
     path.write_text(json.dumps(data, indent=2))
 
 
-def _append_yaml(path: Path, item: Dict) -> None:
-    existing = []
-    if path.exists():
-        try:
-            loaded = yaml.safe_load(path.read_text())
-            if isinstance(loaded, list):
-                existing = loaded
-        except Exception:
-            existing = []
-    existing.append(item)
-    path.write_text(yaml.safe_dump(existing))
+def logbook() -> Logbook:
+    return get_logbook(LOGBOOK_FILE)
 
 
 class PlatinumGovernor:
@@ -59,7 +53,11 @@ class PlatinumGovernor:
             "action": action,
         }
         record.update(data)
-        _append_yaml(LOGBOOK_FILE, record)
+        logbook().append(record)
+
+    def history(self, start: str | None = None, end: str | None = None) -> Iterator[Dict[str, Any]]:
+        """Stream logbook records between two ISO timestamps, archive included."""
+        return logbook().between(start, end)
 
     def update_trust(self, agent: str, delta: float) -> float:
         score = float(self.trust.get(agent, 0.0))
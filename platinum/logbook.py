@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+"""Append-only governance logbook.
+
+The logbook stays one YAML block sequence, so ``yaml.safe_load`` still
+returns the whole list, but a record is written by appending its own
+``- ...`` item instead of re-dumping the file.  Each append also adds a line
+``<timestamp>\\t<offset>\\t<length>`` to a sidecar index (``<name>.idx``), which
+lets :meth:`Logbook.between` seek straight to a time range.  Records are
+appended in time order, so the index is sorted by timestamp.
+
+Once the logbook passes ``compact_bytes`` the older half is moved to a
+gzipped JSON Lines archive (``<name>.archive.jsonl.gz``, one gzip member per
+compaction) and the live file and index are rewritten with what remains.
+The copy is amortised over the appends that filled the file, so appends stay
+constant-time however old the logbook gets.  Each member's first and last
+timestamp, offset and length go to ``<name>.archive.idx``, so
+:meth:`Logbook.between` decompresses only the members overlapping a range
+before reading the live records.  :meth:`Logbook.iter_records` with
+``archived=True`` streams the whole archive before the live records.
+"""
+
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import gzip
+import json
+import os
+import threading
+
+import yaml
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+COMPACT_BYTES = 4 * 1024 * 1024
+
+
+def _dump(record: Dict[str, Any]) -> bytes:
+    return yaml.dump([record], Dumper=_Dumper, default_flow_style=False).encode()
+
+
+def _parse(raw: bytes) -> Dict[str, Any]:
+    loaded = yaml.load(raw, Loader=_Loader)
+    return loaded[0] if isinstance(loaded, list) and loaded else {}
+
+
+def _items(fh, offset: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(offset, raw)`` for each complete top-level item from ``offset``."""
+    fh.seek(offset)
+    start, chunk = offset, []
+    pos = offset
+    for line in fh:
+        if end is not None and pos >= end:
+            break
+        if line.startswith(b"-") and chunk and line[1:2] in (b" ", b"\n"):
+            yield start, b"".join(chunk)
+            start, chunk = pos, []
+        chunk.append(line)
+        pos += len(line)
+    if chunk and chunk[-1].endswith(b"\n"):
+        yield start, b"".join(chunk)
+
+
+class Logbook:
+    """Appender, index and reader for one logbook file."""
+
+    def __init__(self, path: Path, compact_bytes: int = COMPACT_BYTES) -> None:
+        self.path = Path(path)
+        self.compact_bytes = compact_bytes
+        self._stamps: List[str] = []
+        self._spans: List[Tuple[int, int]] = []
+        self._index_id = None
+        self._index_pos = 0
+        self._lock = threading.RLock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".idx")
+
+    @property
+    def archive_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".archive.jsonl.gz")
+
+    @property
+    def archive_index_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".archive.idx")
+
+    @contextmanager
+    def _exclusive(self):
+        """Serialise writers across threads and processes."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path.with_name(self.path.name + ".lock"), os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    # -- index --------------------------------------------------------------
+    def _reset_index(self) -> None:
+        self._stamps, self._spans = [], []
+        self._index_id, self._index_pos = None, 0
+
+    def _read_index(self) -> None:
+        """Load index lines written since the last call."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if (stat.st_dev, stat.st_ino) != self._index_id or stat.st_size < self._index_pos:
+            self._reset_index()
+            self._index_id = (stat.st_dev, stat.st_ino)
+        if stat.st_size == self._index_pos:
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_pos)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._index_pos += len(line)
+                stamp, offset, length = line.decode().rstrip("\n").split("\t")
+                self._stamps.append(stamp)
+                self._spans.append((int(offset), int(length)))
+
+    def _indexed_end(self) -> int:
+        if not self._spans:
+            return 0
+        offset, length = self._spans[-1]
+        return offset + length
+
+    def _append_index(self, entries: List[Tuple[str, int, int]]) -> None:
+        if not entries:
+            return
+        with open(self.index_path, "ab") as f:
+            f.write("".join(f"{s}\t{o}\t{n}\n" for s, o, n in entries).encode())
+
+    def _prepare(self) -> int:
+        """Make the file appendable and index any unindexed tail; return its size.
+
+        Called with the writer lock held.
+        """
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size:
+            with open(self.path, "rb") as f:
+                head = f.read(2)
+                f.seek(-1, os.SEEK_END)
+                tail = f.read(1)
+            if head[:1] != b"-" or tail != b"\n":
+                self._rewrite_legacy()
+                size = self.path.stat().st_size
+        self._read_index()
+        if self._indexed_end() > size:
+            # the index outlived a rewrite of the logbook: rebuild it
+            self.index_path.unlink(missing_ok=True)
+            self._reset_index()
+        end = self._indexed_end()
+        if size > end:
+            with open(self.path, "rb") as f:
+                entries = [
+                    (str(_parse(raw).get("timestamp", "")), offset, len(raw))
+                    for offset, raw in _items(f, end)
+                ]
+            self._append_index(entries)
+            self._read_index()
+        return size
+
+    def _rewrite_legacy(self) -> None:
+        """Rewrite a file that is not a plain block sequence (e.g. ``[]``)."""
+        try:
+            loaded = yaml.load(self.path.read_bytes(), Loader=_Loader)
+        except yaml.YAMLError:
+            loaded = None
+        records = loaded if isinstance(loaded, list) else []
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(b"".join(_dump(r) for r in records))
+        os.replace(tmp, self.path)
+        self.index_path.unlink(missing_ok=True)
+        self._reset_index()
+
+    # -- writing ------------------------------------------------------------
+    def append(self, record: Dict[str, Any]) -> None:
+        self.extend([record])
+
+    def extend(self, records: List[Dict[str, Any]]) -> None:
+        """Append ``records`` with a single write."""
+        blobs = [_dump(r) for r in records]
+        if not blobs:
+            return
+        with self._exclusive():
+            offset = self._prepare()
+            with open(self.path, "ab") as f:
+                f.write(b"".join(blobs))
+            entries = []
+            for record, blob in zip(records, blobs):
+                entries.append((str(record.get("timestamp", "")), offset, len(blob)))
+                offset += len(blob)
+            self._append_index(entries)
+            self._read_index()
+            if offset > self.compact_bytes:
+                self._compact(len(self._spans) // 2)
+
+    def compact(self, before: str | None = None) -> int:
+        """Archive records older than ``before`` (default: the older half).
+
+        Returns the number of records moved.
+        """
+        with self._exclusive():
+            self._prepare()
+            count = len(self._spans) // 2 if before is None else bisect_left(self._stamps, before)
+            return self._compact(count)
+
+    def _compact(self, count: int) -> int:
+        if count <= 0:
+            return 0
+        cut = self._spans[count - 1][0] + self._spans[count - 1][1]
+        with open(self.path, "rb") as src:
+            lines = b"".join(
+                json.dumps(_parse(raw), default=str).encode() + b"\n" for _, raw in _items(src, 0, cut)
+            )
+            member = gzip.compress(lines)
+            with open(self.archive_path, "ab") as archive:
+                member_offset = archive.tell()
+                archive.write(member)
+            with open(self.archive_index_path, "ab") as manifest:
+                first, last = self._stamps[0], self._stamps[count - 1]
+                manifest.write(f"{first}\t{last}\t{member_offset}\t{len(member)}\n".encode())
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            src.seek(cut)
+            with open(tmp, "wb") as dst:
+                while chunk := src.read(1 << 20):
+                    dst.write(chunk)
+        entries = [
+            (stamp, offset - cut, length)
+            for stamp, (offset, length) in zip(self._stamps[count:], self._spans[count:])
+        ]
+        index_tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        index_tmp.write_text("".join(f"{s}\t{o}\t{n}\n" for s, o, n in entries))
+        os.replace(tmp, self.path)
+        os.replace(index_tmp, self.index_path)
+        self._reset_index()
+        self._read_index()
+        return count
+
+    # -- reading ------------------------------------------------------------
+    def refresh(self) -> None:
+        """Bring the in-memory index up to date with the file."""
+        with self._exclusive():
+            self._prepare()
+
+    def iter_records(self, archived: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream records oldest first, optionally starting with the archive."""
+        if archived and self.archive_path.exists():
+            with gzip.open(self.archive_path, "rb") as f:
+                for line in f:
+                    yield json.loads(line)
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            if f.read(1) not in (b"-", b""):
+                f.seek(0)
+                loaded = yaml.load(f, Loader=_Loader)
+                yield from loaded if isinstance(loaded, list) else []
+                return
+            for _, raw in _items(f):
+                yield _parse(raw)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_records()
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._spans)
+
+    def _archive_members(self, start: str | None, end: str | None) -> Iterator[bytes]:
+        """Yield decompressed archive members that may hold ``[start, end]``."""
+        try:
+            size = self.archive_path.stat().st_size
+        except FileNotFoundError:
+            return
+        covered = 0
+        with open(self.archive_path, "rb") as f:
+            try:
+                lines = self.archive_index_path.read_text().splitlines()
+            except FileNotFoundError:
+                lines = []
+            for line in lines:
+                first, last, offset, length = line.split("\t")
+                offset, length = int(offset), int(length)
+                covered = max(covered, offset + length)
+                if (end is not None and first > end) or (start is not None and last < start):
+                    continue
+                f.seek(offset)
+                yield gzip.decompress(f.read(length))
+            if size > covered:
+                # members written without a manifest line (e.g. an interrupted compaction)
+                f.seek(covered)
+                yield gzip.decompress(f.read())
+
+    def between(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        archived: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield records with ``start <= timestamp <= end`` (ISO strings), oldest first.
+
+        Archived records are included unless ``archived`` is false.
+        """
+        if archived:
+            for member in self._archive_members(start, end):
+                for line in member.splitlines():
+                    record = json.loads(line)
+                    stamp = str(record.get("timestamp", ""))
+                    if (start is None or stamp >= start) and (end is None or stamp <= end):
+                        yield record
+        self.refresh()
+        lo = 0 if start is None else bisect_left(self._stamps, start)
+        hi = len(self._stamps) if end is None else bisect_right(self._stamps, end)
+        if lo >= hi:
+            return
+        first, last = self._spans[lo][0], self._spans[hi - 1][0] + self._spans[hi - 1][1]
+        with open(self.path, "rb") as f:
+            for _, raw in _items(f, first, last):
+                yield _parse(raw)
+
+
+_BOOKS: Dict[Path, Logbook] = {}
+_BOOKS_LOCK = threading.Lock()
+
+
+def get_logbook(path: Path) -> Logbook:
+    """Return the shared :class:`Logbook` for ``path``."""
+    path = Path(path).resolve()
+    with _BOOKS_LOCK:
+        book = _BOOKS.get(path)
+        if book is None:
+            book = _BOOKS[path] = Logbook(path)
+        return book
+
+
+__all__ = ["COMPACT_BYTES", "Logbook", "get_logbook"]
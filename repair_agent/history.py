@@ -0,0 +1,153 @@
+# repair_agent/history.py
+# Token-budgeted interaction history for the repair agent.
+#
+# Interactions are stored as structured records rather than one growing
+# string.  Large tool outputs are cut down when they are recorded: test runs
+# keep their failure lines and summary, anything else keeps its head and
+# tail.  Rendering walks a sliding window of the newest records whose token
+# estimates fit the budget, with pinned facts (the failing test and the
+# current hypothesis) always shown first, so the history section of a
+# prompt stays bounded however many cycles the agent runs.
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+MAX_HISTORY_TOKENS = 3000
+MAX_TOOL_OUTPUT_TOKENS = 400
+CHARS_PER_TOKEN = 4
+
+FAILED_TEST_RE = re.compile(r"^(?:FAILED|ERROR) (\S+::\S+)", re.MULTILINE)
+# lines worth keeping from a test run: failures, assertion details, summary
+SIGNAL_RE = re.compile(r"^(?:FAILED|ERROR|E |>|\S+\.py:\d+:|=+ |\d+ (?:passed|failed|error))")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_output(text: str, max_tokens: int = MAX_TOOL_OUTPUT_TOKENS) -> str:
+    """Shorten ``text`` to about ``max_tokens``, keeping its head and tail."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    keep = max_tokens * CHARS_PER_TOKEN
+    head, tail = text[: keep // 2], text[-(keep // 2):]
+    omitted = len(text) - len(head) - len(tail)
+    return f"{head}\n... [{omitted} characters omitted] ...\n{tail}"
+
+
+def summarize_test_output(text: str, max_tokens: int = MAX_TOOL_OUTPUT_TOKENS) -> str:
+    """Reduce a test run to its failure lines and summary when it is too long."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = [line for line in text.splitlines() if SIGNAL_RE.match(line)]
+    if not lines:
+        return truncate_output(text, max_tokens)
+    return truncate_output("\n".join(lines), max_tokens)
+
+
+def failing_test(text: str) -> Optional[str]:
+    """Return the first failing test id reported by pytest, if any."""
+    match = FAILED_TEST_RE.search(text)
+    return match.group(1) if match else None
+
+
+@dataclass(slots=True)
+class Interaction:
+    kind: str  # "thought", "tool" or "system"
+    text: str
+    tool: Optional[str] = None
+    tokens: int = 0
+
+    def render(self) -> str:
+        if self.kind == "thought":
+            return f"Agent Thought: {self.text}"
+        if self.kind == "tool":
+            return f"Tool '{self.tool}' Output: {self.text}"
+        return f"System: {self.text}"
+
+
+class InteractionHistory:
+    """Interaction records rendered within a sliding token budget."""
+
+    PIN_LABELS = {"failing_test": "Failing test", "hypothesis": "Current hypothesis"}
+
+    def __init__(
+        self,
+        budget: int = MAX_HISTORY_TOKENS,
+        tool_output_tokens: int = MAX_TOOL_OUTPUT_TOKENS,
+    ) -> None:
+        self.budget = budget
+        self.tool_output_tokens = tool_output_tokens
+        self.records: List[Interaction] = []
+        self.pinned: Dict[str, str] = {}
+        # records[start:] is the window; window_tokens is its running total
+        self.start = 0
+        self.window_tokens = 0
+
+    # -- recording ------------------------------------------------------------
+    def _append(self, record: Interaction) -> Interaction:
+        record.tokens = estimate_tokens(record.render()) + 1  # + newline
+        self.records.append(record)
+        self.window_tokens += record.tokens
+        self._slide()
+        return record
+
+    def _slide(self) -> None:
+        limit = self.budget - self._pinned_tokens()
+        # regain older records if the pinned facts shrank
+        while self.start > 0 and self.window_tokens + self.records[self.start - 1].tokens <= limit:
+            self.start -= 1
+            self.window_tokens += self.records[self.start].tokens
+        # always keep the newest record, even if it alone exceeds the budget
+        while self.window_tokens > limit and self.start < len(self.records) - 1:
+            self.window_tokens -= self.records[self.start].tokens
+            self.start += 1
+
+    def add_thought(self, thought: str) -> Interaction:
+        return self._append(Interaction("thought", thought))
+
+    def add_system(self, message: str) -> Interaction:
+        return self._append(Interaction("system", message))
+
+    def add_tool_output(self, tool: str, output) -> Interaction:
+        """Record a tool result, summarised to the per-output budget."""
+        text = str(output)
+        if tool == "run_tests":
+            # a run without failures clears a stale pin
+            self.pin("failing_test", failing_test(text))
+            text = summarize_test_output(text, self.tool_output_tokens)
+        else:
+            text = truncate_output(text, self.tool_output_tokens)
+        return self._append(Interaction("tool", text, tool=tool))
+
+    def pin(self, key: str, value: Optional[str]) -> None:
+        """Keep ``value`` visible above the window; ``None`` unpins ``key``."""
+        if value:
+            self.pinned[key] = truncate_output(str(value), self.tool_output_tokens)
+        else:
+            self.pinned.pop(key, None)
+        self._slide()
+
+    # -- rendering ------------------------------------------------------------
+    def _pinned_lines(self) -> List[str]:
+        return [f"{self.PIN_LABELS.get(k, k)}: {v}" for k, v in self.pinned.items()]
+
+    def _pinned_tokens(self) -> int:
+        return sum(estimate_tokens(line) + 1 for line in self._pinned_lines())
+
+    @property
+    def omitted(self) -> int:
+        return self.start
+
+    def render(self) -> str:
+        lines = self._pinned_lines()
+        if self.omitted:
+            lines.append(f"[{self.omitted} earlier interactions omitted]")
+        lines.extend(record.render() for record in self.records[self.start:])
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.render()
+
@@ -3,7 +3,10 @@
 
 import json
 import logging
+from functools import lru_cache
+
 import openai  # In a real system, you would use your AI Router or a specific LLM client.
+from .history import InteractionHistory
 from .tools import AVAILABLE_TOOLS
 
 # --- Configuration ---
@@ -13,11 +16,11 @@ MAX_CYCLES = 10
 # openai.api_key = os.environ.get("OPENAI_API_KEY")
 
 
-def build_prompt(task_description: str, history: str) -> str:
-    """Build the dynamic prompt for the LLM based on the RepairAgent framework."""
-    tool_descriptions = "\n".join(AVAILABLE_TOOLS.keys())
-
-    prompt = f"""You are an autonomous program repair agent. Your goal is to fix a bug.
+@lru_cache(maxsize=8)
+def prompt_prefix(task_description: str, tool_names: tuple) -> str:
+    """Return the static part of the prompt; it only changes with the task."""
+    tool_descriptions = "\n".join(tool_names)
+    return f"""You are an autonomous program repair agent. Your goal is to fix a bug.
 You can use the following tools to interact with the codebase:
 {tool_descriptions}
 
@@ -32,13 +35,21 @@ Your thought process should be:
 6. If the fix is correct and all tests pass, call 'goal_accomplished'. Otherwise, refine your hypothesis and repeat.
 
 Interaction History:
-{history}
+"""
 
-Respond with a JSON object containing 'thought' and 'command' fields.
+
+PROMPT_SUFFIX = """
+Respond with a JSON object containing 'thought', 'hypothesis' and 'command' fields.
+'hypothesis' is your current explanation of the bug (it stays visible as history is trimmed).
 'command' must be a JSON object with 'name' and 'args' keys.
-Example: {{"thought": "I need to see the failing test to understand the problem.", "command": {{"name": "run_tests", "args": {{"test_command": "pytest"}}}}}}
+Example: {"thought": "I need to see the failing test to understand the problem.", "hypothesis": "", "command": {"name": "run_tests", "args": {"test_command": "pytest"}}}
 """
-    return prompt
+
+
+def build_prompt(task_description: str, history) -> str:
+    """Build the prompt: cached static prefix, bounded history, fixed suffix."""
+    prefix = prompt_prefix(task_description, tuple(AVAILABLE_TOOLS))
+    return f"{prefix}{history}\n{PROMPT_SUFFIX}"
 
 
 def call_llm(prompt: str):
@@ -67,7 +78,8 @@ def main() -> None:
         "The function add(a, b) in calculator.py is returning a - b instead of a + b. "
         "The test in test_calculator.py is failing."
     )
-    history = "Initial state. The agent has just been activated."
+    history = InteractionHistory()
+    history.add_system("Initial state. The agent has just been activated.")
 
     for i in range(MAX_CYCLES):
         logging.info(f"\n--- Agent Cycle {i+1}/{MAX_CYCLES} ---")
@@ -76,7 +88,7 @@ def main() -> None:
         llm_response = call_llm(prompt)
 
         if not llm_response:
-            history += "\nSystem: Your last response was invalid. Please provide a valid JSON object."
+            history.add_system("Your last response was invalid. Please provide a valid JSON object.")
             continue
 
         thought = llm_response.get("thought", "No thought provided.")
@@ -84,15 +96,17 @@ def main() -> None:
         command_name = command.get("name")
         command_args = command.get("args", {})
 
-        history += f"\nAgent Thought: {thought}"
+        history.add_thought(thought)
+        if llm_response.get("hypothesis"):
+            history.pin("hypothesis", llm_response["hypothesis"])
         logging.info(f"Agent Thought: {thought}")
 
         if command_name in AVAILABLE_TOOLS:
             tool_func = AVAILABLE_TOOLS[command_name]
             try:
                 result = tool_func(**command_args)
-                history += f"\nTool '{command_name}' Output: {result}"
-                logging.info(f"Tool '{command_name}' Output: {result}")
+                record = history.add_tool_output(command_name, result)
+                logging.info(f"Tool '{command_name}' Output: {record.text}")
 
                 if result == "TERMINATE":
                     logging.info("Agent has accomplished the goal. Exiting.")
@@ -100,11 +114,11 @@ def main() -> None:
             except TypeError as e:
                 error_msg = f"Invalid arguments for tool '{command_name}': {e}"
                 logging.error(error_msg)
-                history += f"\nSystem Error: {error_msg}"
+                history.add_system(f"Error: {error_msg}")
         else:
             error_msg = f"Unknown command '{command_name}'."
             logging.error(error_msg)
-            history += f"\nSystem Error: {error_msg}"
+            history.add_system(f"Error: {error_msg}")
     else:
         logging.warning("Max cycles reached. Agent did not accomplish the goal.")
 
@@ -15,7 +15,7 @@ def run_command(command: str) -> str:
         return result.stdout
     except subprocess.CalledProcessError as e:
         logging.error(f"Command failed: {e.stdout} {e.stderr}")
-        return f"ERROR: {e.stderr}"
+        return f"ERROR: {e.stdout}{e.stderr}"
 
 
 def read_file_range(file_path: str, start_line: int, end_line: int) -> str:
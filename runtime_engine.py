@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from git_diff_analyzer import get_last_commit_diff
+from git_diff_analyzer import get_changed_files
 from behavior_modulator import adjust_behavior_based_on_diff
 import runtime_memory
+import snapshot_store
 from json_store import JSONStoreError
-import shutil
 import time
 from pathlib import Path
 
@@ -20,27 +20,36 @@ def _truncate_memory(data: dict) -> dict:
     return data
 
 
-def _rotate_backups(path: Path, max_keep: int = 3) -> None:
-    """Rotate backup files ``runtime_memory.bak.N``."""
-    for i in range(max_keep, 0, -1):
-        src = path.with_suffix(f".bak.{i}")
-        dst = path.with_suffix(f".bak.{i+1}")
-        if src.exists():
-            src.rename(dst)
-    bak = path.with_suffix(".bak.1")
+def _snapshot(path: Path, data: dict | None = None) -> None:
+    """Record ``data`` as a new deduplicated snapshot of ``path``.
+
+    Without ``data`` the current file is recorded, but only when ``path``
+    has no snapshot history yet, so the pre-write state stays restorable.
+    """
     try:
-        shutil.copy(path, bak)
-    except Exception:
-        pass
+        store = snapshot_store.for_target(path)
+        if data is None:
+            if store.latest_version(path) is not None or not path.exists():
+                return
+            data = runtime_memory.RUNTIME_STORE.read()
+        store.record(path, data)
+    except Exception as exc:  # pragma: no cover - backups are best effort
+        print(f"⚠️ Snapshot failed for {path}: {exc}")
 
 
 def safe_write_memory(data: dict, retries: int = 3) -> None:
-    """Attempt to write memory with fallback and backups."""
-    _rotate_backups(runtime_memory.RUNTIME_STORE.path)
+    """Attempt to write memory with fallback and backups.
+
+    Every successful write is kept as a snapshot version restorable through
+    ``self_repair.restore_file``.
+    """
+    path = runtime_memory.RUNTIME_STORE.path
+    _snapshot(path)
     attempt = 0
     while attempt < retries:
         try:
             runtime_memory.RUNTIME_STORE.write(data)
+            _snapshot(path, data)
             return
         except JSONStoreError:
             attempt += 1
@@ -51,11 +60,17 @@ def safe_write_memory(data: dict, retries: int = 3) -> None:
 
 
 def update_runtime_config() -> None:
-    """Apply behavioral adaptations based on the latest git diff."""
-    diff_data = get_last_commit_diff()
+    """Apply behavioral adaptations based on commits since the last update.
+
+    Only the list of changed files matters here, so the cheap name-status
+    diff is used instead of parsing every changed line.
+    """
+    diff_data = get_changed_files()
     if "error" in diff_data:
         print(diff_data["error"])
         return
+    if not diff_data["modified"]:
+        return  # no commits since the last update
     updated_behavior = adjust_behavior_based_on_diff(diff_data)
     try:
         data = runtime_memory.read_memory()
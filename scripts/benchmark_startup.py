@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_startup.py
+
+Measure import time and cold start (first request) of the Sterling apps.
+Each sample runs in a fresh interpreter and also reports whether importing
+created files or started threads, which startup hooks should defer.
+
+Usage: python3 scripts/benchmark_startup.py [--repeat 5] [--max-import-ms 500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# (module, route requested for the cold-start sample, or None)
+TARGETS = [
+    ("uptime_tracker", None),
+    ("addons.sterling_os", None),
+    ("app", "/heartbeat"),
+    ("addons.sterling_os.main", "/sterling/health"),
+]
+
+PROBE = """
+import json, os, sys, threading, time
+sys.path.insert(0, {root!r})
+before = set(os.listdir('.'))
+threads = threading.active_count()
+t0 = time.perf_counter()
+module = __import__({module!r}, fromlist=['_'])
+imported = time.perf_counter() - t0
+result = {{
+    'import_ms': imported * 1000,
+    'new_files': sorted(set(os.listdir('.')) - before),
+    'new_threads': threading.active_count() - threads,
+}}
+if {route!r}:
+    client = module.app.test_client()
+    t1 = time.perf_counter()
+    client.get({route!r})
+    result['first_request_ms'] = (time.perf_counter() - t1) * 1000
+    t2 = time.perf_counter()
+    client.get({route!r})
+    result['warm_request_ms'] = (time.perf_counter() - t2) * 1000
+print(json.dumps(result))
+"""
+
+
+def sample(module: str, route, cwd: str) -> dict:
+    code = PROBE.format(root=REPO_ROOT, module=module, route=route)
+    env = dict(os.environ, HEARTBEAT_INTERVAL="0")
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=cwd, env=env)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--cwd", default=REPO_ROOT, help="directory to run samples in")
+    args = parser.parse_args()
+
+    failed = False
+    report = {}
+    for module, route in TARGETS:
+        runs = [sample(module, route, args.cwd) for _ in range(args.repeat)]
+        row = {
+            "import_ms": round(statistics.median(r["import_ms"] for r in runs), 1),
+            "new_files": sorted({f for r in runs for f in r["new_files"]}),
+            "new_threads": max(r["new_threads"] for r in runs),
+        }
+        if route:
+            row["first_request_ms"] = round(statistics.median(r["first_request_ms"] for r in runs), 1)
+            row["warm_request_ms"] = round(statistics.median(r["warm_request_ms"] for r in runs), 1)
+        report[module] = row
+        side_effects = row["new_files"] or row["new_threads"]
+        too_slow = args.max_import_ms is not None and row["import_ms"] > args.max_import_ms
+        status = "FAIL" if side_effects or too_slow else "ok"
+        failed = failed or status == "FAIL"
+        print(f"{status:4} {module:28} import {row['import_ms']:8.1f} ms", end="")
+        if route:
+            print(f"  first {row['first_request_ms']:8.1f} ms  warm {row['warm_request_ms']:6.1f} ms", end="")
+        if side_effects:
+            print(f"  side effects: files={row['new_files']} threads={row['new_threads']}", end="")
+        print()
+    print(json.dumps(report, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
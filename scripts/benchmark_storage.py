@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_storage.py
+
+Measure how the storage and routing hot paths scale with history size.
+For each size a synthetic runtime_memory.json, router_log.json and memory
+timeline are generated in a scratch directory, then every case is run
+repeatedly and reported as ops/sec and p99 latency.  Cases that append to a
+history (handle_request, log_router_decision) would otherwise grow it with
+every run, so the generated files are restored, untimed, before each run.
+Results can be saved as a JSON baseline and later runs fail when a case
+regresses past --threshold.
+
+Usage: python3 scripts/benchmark_storage.py [--sizes 1000,10000] [--cases handle_request]
+       [--baseline benchmarks/storage_baseline.json] [--save] [--threshold 0.25]
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "storage_baseline.json")
+# files the router opens relative to the working directory
+SANDBOX_FILES = [
+    "runtime_memory.schema.json",
+    "runtime_schema.json",
+    "addons/sterling_os/reflex_intelligence/event_horizon.json",
+    "addons/sterling_os/reflex_intelligence/reflex_index.json",
+    "addons/sterling_os/platinum_dominion/constitution.json",
+]
+HISTORY_FILES = ["runtime_memory.json", "router_log.json", "memory_timeline.json"]
+PRISTINE_DIR = ".pristine"
+AGENTS = ["finance", "home_automation", "security", "daily_briefing", "general"]
+QUERIES = ["show my budget report", "toggle kitchen light", "arm the alarm", "tell me a joke"]
+
+
+def _timestamps(count: int):
+    start = datetime.now(timezone.utc) - timedelta(seconds=count)
+    for i in range(count):
+        yield (start + timedelta(seconds=i)).isoformat()
+
+
+def synthesize(root: Path, size: int) -> None:
+    """Write ``size``-entry histories for the runtime, router and timeline stores."""
+    stamps = list(_timestamps(size))
+    route_logs = [
+        {
+            "timestamp": ts,
+            "query": QUERIES[i % len(QUERIES)],
+            "agent": AGENTS[i % len(AGENTS)],
+            "success": i % 7 != 0,
+            "fallback": i % 7 == 0,
+        }
+        for i, ts in enumerate(stamps)
+    ]
+    (root / "runtime_memory.json").write_text(json.dumps({"route_logs": route_logs}))
+    router_log = [
+        {
+            "timestamp": ts,
+            "query": f"{QUERIES[i % len(QUERIES)]} {i}",
+            "agent": AGENTS[i % len(AGENTS)],
+            "method": "keyword",
+            "success": True,
+        }
+        for i, ts in enumerate(stamps)
+    ]
+    (root / "router_log.json").write_text(json.dumps(router_log))
+    tags = ["phrase", "scene", "task_execute", "scene_error"]
+    timeline = [
+        {"timestamp": ts, "event": f"{tags[i % len(tags)]}:item {i % 500}"}
+        for i, ts in enumerate(stamps)
+    ]
+    (root / "memory_timeline.json").write_text(json.dumps(timeline))
+    pristine = root / PRISTINE_DIR
+    pristine.mkdir(exist_ok=True)
+    for name in HISTORY_FILES:
+        shutil.copy2(root / name, pristine / name)
+
+
+def _signature(path: Path):
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def restore(root: Path) -> None:
+    """Put back any generated history a case has changed since :func:`synthesize`."""
+    pristine = root / PRISTINE_DIR
+    for name in HISTORY_FILES:
+        if _signature(root / name) != _signature(pristine / name):
+            shutil.copy2(pristine / name, root / name)
+
+
+def _setup(root: Path):
+    """Import the modules under test with every store pointed at ``root``."""
+    import cognitive_router
+    import runtime_memory
+    from addons.sterling_os import memory_manager
+
+    runtime_memory.RUNTIME_STORE.path = root / "runtime_memory.json"
+    cognitive_router.ROUTER_LOG_STORE.path = root / "router_log.json"
+    memory_manager.MEMORY_STORE.path = root / "memory_timeline.json"
+    return cognitive_router, runtime_memory, memory_manager
+
+
+def build_cases(root: Path):
+    cognitive_router, runtime_memory, memory_manager = _setup(root)
+    from json_store import JSONStore
+
+    snapshot = {}
+
+    def json_store_write():
+        if "runtime" not in snapshot:
+            snapshot["runtime"] = runtime_memory.RUNTIME_STORE.read()
+        JSONStore(root / "write_target.json").write(snapshot["runtime"])
+
+    return {
+        "json_store_write": json_store_write,
+        "get_timeline": lambda: memory_manager.get_timeline(limit=20, tag="phrase"),
+        "classify_request": lambda: cognitive_router.classify_request("show my budget report"),
+        "log_router_decision": lambda: cognitive_router.log_router_decision(
+            "show my budget report", "finance", "keyword", True
+        ),
+        "handle_request": lambda: cognitive_router.handle_request("show my budget report"),
+    }
+
+
+def measure(func, min_time: float, min_runs: int, max_runs: int, reset=None) -> dict:
+    """Time ``func``; ``reset`` runs untimed before each call to restore its fixture."""
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < max_runs:
+        if reset is not None:
+            reset()
+        t0 = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - t0)
+        if len(durations) >= min_runs and time.perf_counter() - started >= min_time:
+            break
+    durations.sort()
+    p99 = durations[max(0, math.ceil(0.99 * len(durations)) - 1)]
+    return {
+        "runs": len(durations),
+        "ops_per_sec": round(len(durations) / sum(durations), 2),
+        "p99_ms": round(p99 * 1000, 3),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return descriptions of cases that regressed past ``threshold``."""
+    failures = []
+    for key, row in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if row["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            failures.append(f"{key}: {row['ops_per_sec']} ops/s < baseline {base['ops_per_sec']}")
+        if row["p99_ms"] > base["p99_ms"] * (1 + threshold):
+            failures.append(f"{key}: p99 {row['p99_ms']} ms > baseline {base['p99_ms']}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated history sizes")
+    parser.add_argument("--cases", default=None, help="comma-separated case names (default: all)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to run each case")
+    parser.add_argument("--min-runs", type=int, default=3)
+    parser.add_argument("--max-runs", type=int, default=10000)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    wanted = set(args.cases.split(",")) if args.cases else None
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="sterling-bench-") as tmp:
+        root = Path(tmp)
+        for rel in SANDBOX_FILES:
+            src = Path(REPO_ROOT, rel)
+            if src.exists():
+                (root / rel).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy(src, root / rel)
+        os.chdir(root)
+        try:
+            for size in sizes:
+                synthesize(root, size)
+                cases = build_cases(root)
+                for name, func in cases.items():
+                    if wanted and name not in wanted:
+                        continue
+                    row = measure(
+                        func, args.min_time, args.min_runs, args.max_runs,
+                        reset=lambda: restore(root),
+                    )
+                    results[f"{name}@{size}"] = row
+                    print(
+                        f"{name:20} {size:>9}  {row['ops_per_sec']:>12.2f} ops/s"
+                        f"  p99 {row['p99_ms']:>10.3f} ms  ({row['runs']} runs)"
+                    )
+        finally:
+            os.chdir(cwd)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save to record one.")
+        return 0
+    with open(args.baseline) as f:
+        failures = compare(results, json.load(f), args.threshold)
+    for line in failures:
+        print(f"REGRESSION {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+scripts/load_harness.py
+
+Offline end-to-end load test for the Sterling OS add-on.
+Local aiohttp servers stand in for Home Assistant (REST services, states and
+the websocket API) and Ollama (/api/generate), with configurable latency and
+error injection.  The driver replays recorded traffic against /ha-chat,
+/sterling/route and /sterling/scene at a fixed request rate and reports
+throughput and the latency distribution.
+
+Traffic files are JSON lines.  A line with ``path`` (and optional ``method``
+and ``json``) is replayed as-is; any other line contributes its ``message``,
+``query``, ``title`` or ``body`` text, rotated across the three endpoints.
+
+Usage:
+  python3 scripts/load_harness.py run --traffic requests.jsonl --rps 20 --duration 30
+  python3 scripts/load_harness.py drive --target http://localhost:5000 --traffic requests.jsonl
+  python3 scripts/load_harness.py stubs --ha-port 8123 --ollama-port 11434
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from aiohttp import ClientSession, ClientTimeout, WSMsgType, web
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmark_storage import SANDBOX_FILES  # noqa: E402
+
+ENDPOINTS = ["/ha-chat", "/sterling/route", "/sterling/scene"]
+SCENES = {"evening": "scene.evening", "morning": "scene.morning", "movie": "scene.movie"}
+CALLS = web.AppKey("calls", Counter)
+
+
+@dataclass
+class StubConfig:
+    """Latency and failure behaviour shared by the stand-in servers."""
+
+    latency_ms: float = 20.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+
+
+def _injector(cfg: StubConfig):
+    @web.middleware
+    async def inject(request, handler):
+        delay = max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms))
+        await asyncio.sleep(delay / 1000)
+        if random.random() < cfg.error_rate:
+            return web.json_response({"message": "injected failure"}, status=500)
+        return await handler(request)
+
+    return inject
+
+
+# -- Home Assistant stand-in ---------------------------------------------
+def build_ha_app(cfg: StubConfig) -> web.Application:
+    states = {
+        entity: {"entity_id": entity, "state": "scening", "attributes": {}} for entity in SCENES.values()
+    }
+    calls = Counter()
+
+    async def api_root(request):
+        return web.json_response({"message": "API running."})
+
+    async def get_states(request):
+        return web.json_response(list(states.values()))
+
+    async def call_service(request):
+        domain, service = request.match_info["domain"], request.match_info["service"]
+        data = await request.json() if request.can_read_body else {}
+        calls[f"{domain}.{service}"] += 1
+        entity = data.get("entity_id")
+        if entity in states:
+            states[entity]["last_changed"] = time.time()
+        return web.json_response([states[entity]] if entity in states else [])
+
+    async def websocket(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required", "ha_version": "stub"})
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            if payload.get("type") == "auth":
+                await ws.send_json({"type": "auth_ok", "ha_version": "stub"})
+                continue
+            result = list(states.values()) if payload.get("type") == "get_states" else None
+            if payload.get("type") == "call_service":
+                calls[f"{payload.get('domain')}.{payload.get('service')}"] += 1
+            await ws.send_json(
+                {"id": payload.get("id"), "type": "result", "success": True, "result": result}
+            )
+        return ws
+
+    app = web.Application(middlewares=[_injector(cfg)])
+    app[CALLS] = calls
+    app.router.add_get("/api/", api_root)
+    app.router.add_get("/api/states", get_states)
+    app.router.add_post("/api/services/{domain}/{service}", call_service)
+    app.router.add_get("/api/websocket", websocket)
+    return app
+
+
+# -- Ollama stand-in ------------------------------------------------------
+def build_ollama_app(cfg: StubConfig) -> web.Application:
+    async def generate(request):
+        data = await request.json()
+        text = f"stub reply to: {data.get('prompt', '')[:80]}"
+        body = {"model": data.get("model", "stub"), "response": text, "done": True}
+        if not data.get("stream", True):
+            return web.json_response(body)
+        resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await resp.prepare(request)
+        for word in text.split():
+            await resp.write(json.dumps({"response": word + " ", "done": False}).encode() + b"\n")
+        await resp.write(json.dumps({**body, "response": ""}).encode() + b"\n")
+        return resp
+
+    async def tags(request):
+        return web.json_response({"models": [{"name": "llama3:latest"}]})
+
+    app = web.Application(middlewares=[_injector(cfg)])
+    app.router.add_post("/api/generate", generate)
+    app.router.add_get("/api/tags", tags)
+    return app
+
+
+async def start_site(app: web.Application, port: int = 0):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+# -- traffic ----------------------------------------------------------------
+def load_traffic(path: str) -> list:
+    """Return ``(method, path, json)`` tuples from a JSON lines file."""
+    requests = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "path" in record:
+                requests.append((record.get("method", "POST"), record["path"], record.get("json")))
+                continue
+            text = next(
+                (record[k] for k in ("message", "query", "title", "body") if record.get(k)), ""
+            )
+            endpoint = ENDPOINTS[len(requests) % len(ENDPOINTS)]
+            if endpoint == "/ha-chat":
+                payload = {"message": text}
+            elif endpoint == "/sterling/route":
+                payload = {"query": text}
+            else:
+                payload = {"name": random.choice(list(SCENES))}
+            requests.append(("POST", endpoint, payload))
+    return requests
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+async def drive(base_url: str, traffic: list, rps: float, duration: float, concurrency: int) -> dict:
+    """Send ``traffic`` in a loop at ``rps`` for ``duration`` seconds.
+
+    Requests follow a fixed schedule and latency is measured from the
+    scheduled start, so a stalled server shows up as queueing delay instead
+    of silently lowering the offered load.
+    """
+    total = max(1, int(rps * duration))
+    limit = asyncio.Semaphore(concurrency)
+    samples = []
+    start = time.perf_counter()
+
+    async def one(session, i):
+        method, path, payload = traffic[i % len(traffic)]
+        scheduled = start + i / rps
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        async with limit:
+            try:
+                async with session.request(method, base_url + path, json=payload) as resp:
+                    await resp.read()
+                    status = resp.status
+            except Exception as exc:
+                status = type(exc).__name__
+        samples.append((path, status, time.perf_counter() - scheduled))
+
+    timeout = ClientTimeout(total=30)
+    async with ClientSession(timeout=timeout) as session:
+        await asyncio.gather(*(one(session, i) for i in range(total)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    def stats(latencies):
+        ms = [v * 1000 for v in latencies]
+        return {
+            "count": len(ms),
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p90_ms": round(percentile(ms, 90), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+            "max_ms": round(max(ms, default=0.0), 2),
+        }
+
+    by_path = defaultdict(list)
+    for path, _, latency in samples:
+        by_path[path].append(latency)
+    report = stats([s[2] for s in samples])
+    report.update(
+        elapsed_s=round(elapsed, 2),
+        throughput_rps=round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        statuses=dict(Counter(str(s[1]) for s in samples)),
+        endpoints={path: stats(values) for path, values in sorted(by_path.items())},
+    )
+    return report
+
+
+# -- target -----------------------------------------------------------------
+def start_target(ha_url: str, ollama_url: str, workdir: Path):
+    """Serve the add-on app from a thread with every dependency local."""
+    for rel in SANDBOX_FILES:
+        src = Path(REPO_ROOT, rel)
+        if src.exists():
+            (workdir / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(src, workdir / rel)
+    scene_map = workdir / "scene_mapper.json"
+    scene_map.write_text(json.dumps(SCENES))
+    os.environ.update(
+        HOME_ASSISTANT_URL=ha_url,
+        OLLAMA_HOST=ollama_url,
+        SCENE_MAP_PATH=str(scene_map),
+    )
+    os.chdir(workdir)
+
+    from werkzeug.serving import make_server
+    from addons.sterling_os import main, memory_manager
+
+    memory_manager.MEMORY_STORE.path = workdir / "memory_timeline.json"
+    # one access-log line per request would dominate the run
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, main.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['count']} requests in {report['elapsed_s']} s"
+        f" -> {report['throughput_rps']} req/s; statuses {report['statuses']}"
+    )
+    print(f"{'endpoint':20} {'count':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    rows = list(report["endpoints"].items()) + [("all", report)]
+    for name, row in rows:
+        print(
+            f"{name:20} {row['count']:>6} {row['p50_ms']:>9.2f} {row['p90_ms']:>9.2f}"
+            f" {row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}"
+        )
+
+
+async def _serve_stubs(args, cfg: StubConfig) -> None:
+    await start_site(build_ha_app(cfg), args.ha_port)
+    await start_site(build_ollama_app(cfg), args.ollama_port)
+    print(f"Home Assistant stub on :{args.ha_port}, Ollama stub on :{args.ollama_port}")
+    await asyncio.Event().wait()
+
+
+async def _run(args, cfg: StubConfig) -> dict:
+    ha_runner, ha_url = await start_site(build_ha_app(cfg))
+    ollama_runner, ollama_url = await start_site(build_ollama_app(cfg))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="sterling-load-") as tmp:
+        server, target = start_target(ha_url, ollama_url, Path(tmp))
+        try:
+            report = await drive(target, load_traffic(args.traffic), args.rps, args.duration, args.concurrency)
+        finally:
+            server.shutdown()
+            os.chdir(cwd)
+            await ha_runner.cleanup()
+            await ollama_runner.cleanup()
+    report["ha_calls"] = dict(ha_runner.app[CALLS])
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "drive", "stubs"):
+        p = sub.add_parser(name)
+        p.add_argument("--latency-ms", type=float, default=20.0)
+        p.add_argument("--jitter-ms", type=float, default=10.0)
+        p.add_argument("--error-rate", type=float, default=0.0)
+        if name == "stubs":
+            p.add_argument("--ha-port", type=int, default=8123)
+            p.add_argument("--ollama-port", type=int, default=11434)
+            continue
+        p.add_argument("--traffic", default=os.path.join(REPO_ROOT, "requests.jsonl"))
+        p.add_argument("--rps", type=float, default=10.0)
+        p.add_argument("--duration", type=float, default=10.0)
+        p.add_argument("--concurrency", type=int, default=32)
+        p.add_argument("--json", action="store_true", help="print the report as JSON")
+        if name == "drive":
+            p.add_argument("--target", required=True, help="base URL of a running Sterling app")
+    args = parser.parse_args()
+    cfg = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate)
+
+    if args.command == "stubs":
+        try:
+            asyncio.run(_serve_stubs(args, cfg))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    # agents print progress; keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.command == "drive":
+            traffic = load_traffic(args.traffic)
+            report = asyncio.run(drive(args.target, traffic, args.rps, args.duration, args.concurrency))
+        else:
+            report = asyncio.run(_run(args, cfg))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
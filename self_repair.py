@@ -1,39 +1,35 @@
-import json
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-DIAG_LOG = Path("diagnostics_log.json")
+import snapshot_store
+from diagnostics_store import get_store
+
+DIAG_LOG = Path("diagnostics_log.jsonl")
 BACKUP_DIR = Path("backups")
 
 
 def scan_for_errors() -> List[str]:
-    """Return a list of error strings from the diagnostics log."""
-    if not DIAG_LOG.exists():
-        return []
-    try:
-        data = json.loads(DIAG_LOG.read_text())
-    except Exception:
-        return []
-    errors: List[str] = []
-    for entry in data:
-        for risk in entry.get("risks", []):
-            if "error" in risk.lower():
-                errors.append(risk)
-    return errors
-
-
-def restore_file(target: Path) -> bool:
-    """Restore ``target`` from the backups directory if available."""
+    """Return every error string in the retained diagnostics log segments."""
+    return get_store(DIAG_LOG).errors()
+
+
+def restore_file(target: Path, version: Optional[int] = None) -> bool:
+    """Restore ``target`` from the backups directory if available.
+
+    Without ``version`` a plain copy in ``BACKUP_DIR`` wins, otherwise the
+    latest snapshot is used.  ``version`` selects a historical snapshot
+    (``-2`` is the one before the latest).
+    """
     backup = BACKUP_DIR / target.name
-    if backup.exists():
+    if version is None and backup.exists():
         target.write_text(backup.read_text())
         return True
-    return False
+    return snapshot_store.for_target(target).restore(target, version)
 
 
 def self_heal(target: Path) -> bool:
     """Attempt to heal ``target`` based on diagnostics."""
-    if not scan_for_errors():
+    if not get_store(DIAG_LOG).has_errors():
         return False
     return restore_file(target)
 
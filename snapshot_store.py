@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+"""Content-addressed, deduplicated snapshots of JSON documents.
+
+Manifests are written to a temp file and then hard-linked to their
+versioned name, which fails if that name exists.  Concurrent writers can
+therefore never claim the same version, and a crash never leaves a
+truncated manifest behind.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import hashlib
+import json
+import logging
+import os
+import zlib
+
+from json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIRNAME = ".snapshots"
+MAX_VERSIONS = 200
+# versions are pruned in batches so the chunk GC does not run on every write
+PRUNE_BATCH = 20
+# list chunks end where an element's crc32 has these low bits clear, so an
+# insertion or a trimmed head only changes the chunks around it
+BOUNDARY_MASK = 0x0F
+MAX_CHUNK_ITEMS = 64
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _split_list(items: List[Any]) -> Iterable[List[Any]]:
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if (zlib.crc32(_dumps(item)) & BOUNDARY_MASK) == 0 or len(chunk) >= MAX_CHUNK_ITEMS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@dataclass(slots=True)
+class SnapshotStore:
+    """Chunk store plus per-target manifests rooted at ``root``."""
+
+    root: Path
+    max_versions: int = MAX_VERSIONS
+
+    # -- chunks -----------------------------------------------------------
+    def _chunk_path(self, digest: str) -> Path:
+        return self.root / "chunks" / digest[:2] / digest[2:]
+
+    def _put(self, value: Any) -> str:
+        raw = _dumps(value)
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._chunk_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(zlib.compress(raw))
+            os.replace(tmp, path)
+        return digest
+
+    def _get(self, digest: str) -> Any:
+        return json.loads(zlib.decompress(self._chunk_path(digest).read_bytes()))
+
+    def _encode(self, value: Any) -> Dict[str, Any]:
+        if isinstance(value, list):
+            return {"list": [self._put(chunk) for chunk in _split_list(value)]}
+        return {"value": self._put(value)}
+
+    def _decode(self, spec: Dict[str, Any]) -> Any:
+        if "list" in spec:
+            items: List[Any] = []
+            for digest in spec["list"]:
+                items.extend(self._get(digest))
+            return items
+        return self._get(spec["value"])
+
+    # -- manifests --------------------------------------------------------
+    def _manifest_dir(self, target: Path) -> Path:
+        return self.root / "manifests" / Path(target).name
+
+    def _manifests(self, target: Path) -> List[Path]:
+        directory = self._manifest_dir(target)
+        if not directory.exists():
+            return []
+        return sorted(directory.glob("*.json"))
+
+    def record(self, target: Path, document: Any) -> int:
+        """Store ``document`` as a new version of ``target`` and return it.
+
+        Only chunks that are not already stored are written, so the cost of a
+        snapshot is roughly the size of the change since the last one.
+        """
+        if isinstance(document, dict):
+            body = {"kind": "dict", "entries": [[k, self._encode(v)] for k, v in document.items()]}
+        else:
+            body = {"kind": "value", "entries": [[None, self._encode(document)]]}
+        existing = self._manifests(target)
+        version = int(existing[-1].stem) + 1 if existing else 1
+        body["timestamp"] = datetime.now(timezone.utc).isoformat()
+        directory = self._manifest_dir(target)
+        directory.mkdir(parents=True, exist_ok=True)
+        while True:
+            body["version"] = version
+            tmp = directory / f".{version:08d}.{os.getpid()}.tmp"
+            tmp.write_text(json.dumps(body))
+            try:
+                # link() refuses an existing name: another writer took it
+                os.link(tmp, directory / f"{version:08d}.json")
+            except FileExistsError:
+                version += 1
+                continue
+            finally:
+                tmp.unlink(missing_ok=True)
+            break
+        if len(existing) + 1 > self.max_versions + PRUNE_BATCH:
+            self.prune(target)
+        return version
+
+    def latest_version(self, target: Path) -> Optional[int]:
+        manifests = self._manifests(target)
+        return int(manifests[-1].stem) if manifests else None
+
+    def versions(self, target: Path) -> List[Dict[str, Any]]:
+        """Return ``{"version", "timestamp"}`` for every stored version."""
+        result = []
+        for path in self._manifests(target):
+            manifest = json.loads(path.read_text())
+            result.append({"version": manifest["version"], "timestamp": manifest["timestamp"]})
+        return result
+
+    def load(self, target: Path, version: Optional[int] = None) -> Any:
+        """Rebuild a stored version of ``target``.
+
+        ``version`` is a version number, a negative index (``-1`` is the
+        latest, ``-2`` the one before) or ``None`` for the latest.
+        """
+        manifests = self._manifests(target)
+        if not manifests:
+            raise FileNotFoundError(f"No snapshots for {target}")
+        if version is None or version < 0:
+            path = manifests[version if version is not None else -1]
+        else:
+            path = self._manifest_dir(target) / f"{version:08d}.json"
+        manifest = json.loads(path.read_text())
+        if manifest["kind"] == "dict":
+            return {key: self._decode(spec) for key, spec in manifest["entries"]}
+        return self._decode(manifest["entries"][0][1])
+
+    def restore(self, target: Path, version: Optional[int] = None) -> bool:
+        """Write a stored version back to ``target``; ``False`` if missing."""
+        try:
+            document = self.load(target, version)
+        except (FileNotFoundError, IndexError, KeyError, ValueError, zlib.error):
+            logger.exception("Snapshot restore failed for %s", target)
+            return False
+        JSONStore(Path(target)).write(document)
+        return True
+
+    def prune(self, target: Path) -> int:
+        """Drop versions beyond ``max_versions`` and unreferenced chunks."""
+        manifests = self._manifests(target)
+        stale = manifests[: max(0, len(manifests) - self.max_versions)]
+        for path in stale:
+            path.unlink(missing_ok=True)
+        if stale:
+            self.gc()
+        return len(stale)
+
+    def gc(self) -> int:
+        """Delete chunks no manifest refers to and return how many."""
+        live = set()
+        for path in (self.root / "manifests").glob("*/*.json"):
+            for _, spec in json.loads(path.read_text())["entries"]:
+                live.update(spec.get("list", [spec.get("value")]))
+        removed = 0
+        for chunk in (self.root / "chunks").glob("*/*"):
+            if chunk.parent.name + chunk.name not in live:
+                chunk.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def for_target(target: Path) -> SnapshotStore:
+    """Return the snapshot store kept next to ``target``."""
+    return SnapshotStore(Path(target).parent / SNAPSHOT_DIRNAME)
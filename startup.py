@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+"""Deferred process startup and lazy module loading.
+
+Modules register work that must not run at import time (state files,
+subprocesses, background threads) with :func:`on_startup`.
+:func:`run_startup_hooks` runs every hook once per process: at boot from
+``gunicorn.conf.py`` (``post_worker_init``) or an app's ``__main__``, and
+otherwise before the first request as a fallback.  Hooks are keyed by PID, so
+gunicorn workers forked from a preloaded master run them again in the child
+instead of inheriting dead threads.  A hook that itself calls
+:func:`run_startup_hooks` returns straight away instead of deadlocking.
+"""
+
+from importlib import import_module
+from typing import Callable, Iterable, List, Tuple
+import logging
+import os
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+_HOOKS: List[Callable[[], None]] = []
+_LOCK = threading.RLock()
+_STARTED_PID: int | None = None
+# set while this process runs its hooks, so a re-entrant call returns
+_RUNNING = False
+
+
+def on_startup(func: Callable[[], None]) -> Callable[[], None]:
+    """Register ``func`` to run once per process before serving requests."""
+    if func not in _HOOKS:
+        _HOOKS.append(func)
+    return func
+
+
+def run_startup_hooks() -> None:
+    """Run registered hooks unless they already ran in this process."""
+    global _STARTED_PID, _RUNNING
+    pid = os.getpid()
+    if _STARTED_PID == pid:
+        return
+    with _LOCK:
+        if _STARTED_PID == pid or _RUNNING:
+            return
+        _RUNNING = True
+        try:
+            for hook in list(_HOOKS):
+                try:
+                    hook()
+                except Exception:
+                    logger.exception("Startup hook %s failed", getattr(hook, "__name__", hook))
+            _STARTED_PID = pid
+        finally:
+            _RUNNING = False
+
+
+def reset() -> None:
+    """Forget that hooks ran so the next call runs them again."""
+    global _STARTED_PID
+    with _LOCK:
+        _STARTED_PID = None
+
+
+def lazy_submodules(package: str, names: Iterable[str]) -> Tuple[Callable, Callable]:
+    """Return module ``__getattr__``/``__dir__`` that import ``names`` on use.
+
+    Intended for a package ``__init__``::
+
+        __getattr__, __dir__ = lazy_submodules(__name__, __all__)
+    """
+    lazy = frozenset(names)
+
+    def __getattr__(name: str):
+        if name in lazy:
+            return import_module(f"{package}.{name}")
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | lazy)
+
+    return __getattr__, __dir__
@@ -2,8 +2,16 @@
 from __future__ import annotations
 
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Iterable, List
 
+try:
+    from .feed_ingest import FeedState, KeywordMatcher, poll_feeds
+except ImportError:  # pragma: no cover - executed as a script
+    from feed_ingest import FeedState, KeywordMatcher, poll_feeds
+
+STATE_FILE = Path(__file__).resolve().parent / "career_feed_state.json"
+
 CAREER_KEYWORDS: List[str] = [
     "home care",
     "healthcare finance",
@@ -34,30 +42,35 @@ SOURCE_FEEDS: List[str] = [
     "https://www.healthcaredive.com/feeds/news/",
 ]
 
+_MATCHER = KeywordMatcher(CAREER_KEYWORDS)
+
 
-def fetch_articles() -> List[Dict[str, str]]:
-    """Fetch articles from ``SOURCE_FEEDS`` filtering for ``CAREER_KEYWORDS``."""
-    from feedparser import parse
+def fetch_articles(
+    feeds: Iterable[str] | None = None,
+    state_file: Path | None = STATE_FILE,
+) -> List[Dict[str, str]]:
+    """Fetch new articles from ``feeds`` filtering for ``CAREER_KEYWORDS``.
 
+    Feeds are polled concurrently with conditional requests and articles
+    already returned by an earlier run are skipped; both are tracked in
+    ``state_file`` (``None`` disables persistence).
+    """
+    state = FeedState(state_file)
     articles: List[Dict[str, str]] = []
-    for feed in SOURCE_FEEDS:
-        parsed = parse(feed)
-        for entry in getattr(parsed, "entries", []):
-            title = entry.get("title", "")
-            summary = entry.get("summary", "")
-            link = entry.get("link", "")
-            published = entry.get("published", "")
-            content = f"{title} {summary}"
-            if any(k.lower() in content.lower() for k in CAREER_KEYWORDS):
-                articles.append(
-                    {
-                        "title": title,
-                        "summary": summary,
-                        "link": link,
-                        "published": published,
-                        "raw_text": content,
-                    }
-                )
+    for entry in poll_feeds(SOURCE_FEEDS if feeds is None else feeds, state):
+        title = entry.get("title", "")
+        summary = entry.get("summary", "")
+        content = f"{title} {summary}"
+        if _MATCHER.search(content):
+            articles.append(
+                {
+                    "title": title,
+                    "summary": summary,
+                    "link": entry.get("link", ""),
+                    "published": entry.get("published", ""),
+                    "raw_text": content,
+                }
+            )
     return articles
 
 
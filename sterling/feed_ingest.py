@@ -0,0 +1,175 @@
+"""Incremental RSS/Atom ingestion.
+
+Feeds are fetched concurrently with conditional requests: the ``ETag`` and
+``Last-Modified`` validators returned by each feed are kept in a
+:class:`FeedState` file and sent back on the next poll, so an unchanged feed
+costs a ``304 Not Modified`` instead of its full body.  The same file
+remembers a hash of every article link already handed out, so entries that
+stay in a feed across polls (or appear in several feeds) are yielded once.
+
+:class:`KeywordMatcher` compiles a keyword list into one case-insensitive
+alternation, so matching an entry is a single scan of its text rather than
+one lowercase-and-search per keyword.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+MAX_WORKERS = 8
+SEEN_LIMIT = 5000
+
+
+class KeywordMatcher:
+    """Case-insensitive substring matcher over a fixed keyword list."""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords = list(dict.fromkeys(keywords))
+        self._canonical = {k.lower(): k for k in self.keywords}
+        # longest first so overlapping keywords report the most specific one
+        alternatives = sorted(self._canonical, key=len, reverse=True)
+        self._pattern = (
+            re.compile("|".join(map(re.escape, alternatives)), re.IGNORECASE)
+            if alternatives
+            else None
+        )
+
+    def search(self, text: str) -> bool:
+        return self._pattern is not None and self._pattern.search(text) is not None
+
+    def matches(self, text: str) -> List[str]:
+        """Return the keywords found in ``text``, in order of first appearance."""
+        if self._pattern is None:
+            return []
+        found = (self._canonical[m.group(0).lower()] for m in self._pattern.finditer(text))
+        return list(dict.fromkeys(found))
+
+
+def link_hash(entry: Dict[str, Any]) -> str:
+    """Identify an entry by its link (or title and date when it has none)."""
+    key = (entry.get("link") or "").strip() or f"{entry.get('title', '')}\n{entry.get('published', '')}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+class FeedState:
+    """Per-feed validators and seen-article hashes, persisted as JSON."""
+
+    def __init__(self, path: Path | None = None, seen_limit: int = SEEN_LIMIT) -> None:
+        self.path = Path(path) if path else None
+        self.seen_limit = seen_limit
+        self.validators: Dict[str, Dict[str, str]] = {}
+        # dict as an insertion-ordered set; oldest hashes are evicted first
+        self.seen: Dict[str, None] = {}
+        if self.path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        self.validators = dict(data.get("validators", {}))
+        self.seen = dict.fromkeys(data.get("seen", []))
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        data = {"validators": self.validators, "seen": list(self.seen)}
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, self.path)
+
+    def is_new(self, digest: str) -> bool:
+        return digest not in self.seen
+
+    def mark_seen(self, digest: str) -> None:
+        self.seen[digest] = None
+        while len(self.seen) > self.seen_limit:
+            del self.seen[next(iter(self.seen))]
+
+
+@dataclass
+class FeedResult:
+    url: str
+    status: Optional[int] = None
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    validators: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+def fetch_feed(url: str, validators: Dict[str, str] | None = None) -> FeedResult:
+    """Fetch ``url`` conditionally; the result carries the new validators."""
+    from feedparser import parse
+
+    validators = validators or {}
+    try:
+        parsed = parse(url, etag=validators.get("etag"), modified=validators.get("modified"))
+    except Exception as exc:  # network or parser failure: skip this feed
+        return FeedResult(url, error=str(exc))
+    result = FeedResult(url, status=getattr(parsed, "status", None))
+    if result.not_modified:
+        return result
+    result.entries = list(getattr(parsed, "entries", []))
+    if (result.status or 200) >= 400 or (getattr(parsed, "bozo", False) and not result.entries):
+        # keep the old validators; a failed poll must not look like an empty feed
+        result.error = str(getattr(parsed, "bozo_exception", None) or f"HTTP {result.status}")
+        result.entries = []
+        return result
+    fresh = {
+        "etag": getattr(parsed, "etag", None),
+        "modified": getattr(parsed, "modified", None),
+    }
+    result.validators = {k: v for k, v in fresh.items() if v}
+    return result
+
+
+def poll_feeds(
+    feeds: Iterable[str],
+    state: FeedState,
+    max_workers: int = MAX_WORKERS,
+) -> List[Dict[str, Any]]:
+    """Fetch ``feeds`` concurrently and return entries not seen before.
+
+    Validators and seen hashes are updated in ``state`` and saved once the
+    poll completes.  Entries keep feed order, then entry order.
+    """
+    feeds = list(dict.fromkeys(feeds))
+    if not feeds:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(feeds))) as pool:
+        results = list(pool.map(lambda url: fetch_feed(url, state.validators.get(url)), feeds))
+    entries: List[Dict[str, Any]] = []
+    for result in results:
+        if result.error is not None or result.not_modified:
+            continue
+        if result.validators:
+            state.validators[result.url] = result.validators
+        else:
+            state.validators.pop(result.url, None)
+        for entry in result.entries:
+            digest = link_hash(entry)
+            if state.is_new(digest):
+                state.mark_seen(digest)
+                entries.append(entry)
+    state.save()
+    return entries
+
+
+__all__ = [
+    "FeedResult",
+    "FeedState",
+    "KeywordMatcher",
+    "fetch_feed",
+    "link_hash",
+    "poll_feeds",
+]
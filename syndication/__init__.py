@@ -5,7 +5,9 @@ from .syndicator_agent import (
     load_router,
     load_trust,
     predict_next,
+    routing_policy,
     select_model,
+    select_models,
 )
 
 __all__ = [
@@ -13,5 +15,7 @@ __all__ = [
     "load_router",
     "load_trust",
     "predict_next",
+    "routing_policy",
     "select_model",
+    "select_models",
 ]
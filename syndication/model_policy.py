@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+"""Compiled model routing policy.
+
+:class:`ModelPolicy` turns ``model_router.yaml`` and
+``model_trust_registry.json`` into the priority-ordered list of trusted
+models and, for every distinct model cost, the models affordable under that
+ceiling.  Selecting a model is then a bisect over the ceilings plus a scan of
+the (short) precomputed tuple; a ``rank`` callable may pick among the
+candidates instead of taking the first.  :func:`get_policy` keeps one compiled policy
+per pair of files and recompiles it only when either file changes on disk.
+"""
+
+import json
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+MIN_TRUST = 85
+
+# picks one model from the non-empty candidate tuple, given in priority order
+Ranker = Callable[[Tuple[str, ...]], str]
+
+
+@dataclass(frozen=True, slots=True)
+class SelectionContext:
+    """Per-request constraints; ``None`` means the router's own ceiling."""
+
+    max_cost: Optional[float] = None
+    exclude: frozenset = field(default_factory=frozenset)
+
+
+def _read_router(path: Path) -> Dict[str, Any]:
+    try:
+        return yaml.safe_load(path.read_text()) or {}
+    except Exception:
+        return {}
+
+
+def _read_trust(path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text())
+    except Exception:
+        return {}
+
+
+class ModelPolicy:
+    """Eligible-model orderings precomputed per cost ceiling."""
+
+    def __init__(self, router: Dict[str, Any], trust: Dict[str, Dict[str, Any]]) -> None:
+        self.router = router
+        self.trust = trust
+        self.max_cost = float(router.get("cost_threshold", {}).get("max_cost", 0) or 0)
+        trusted: List[Tuple[str, float]] = []
+        for name in router.get("route_policies", {}).get("priority", []) or []:
+            info = trust.get(name, {})
+            if info.get("trust", 0) > MIN_TRUST and info.get("allowed", True) is not False:
+                trusted.append((name, float(info.get("cost", 1))))
+        self.trusted = tuple(name for name, _ in trusted)
+        # ceilings[i] -> models (in priority order) costing at most ceilings[i]
+        self.ceilings: List[float] = sorted({cost for _, cost in trusted})
+        self.orderings: List[Tuple[str, ...]] = [
+            tuple(name for name, cost in trusted if cost <= ceiling) for ceiling in self.ceilings
+        ]
+
+    @classmethod
+    def from_files(cls, router_file: Path, trust_file: Path) -> "ModelPolicy":
+        return cls(_read_router(Path(router_file)), _read_trust(Path(trust_file)))
+
+    def eligible(self, max_cost: float | None = None) -> Tuple[str, ...]:
+        """Trusted models affordable under ``max_cost``, in priority order."""
+        ceiling = self.max_cost if max_cost is None else max_cost
+        i = bisect_right(self.ceilings, ceiling)
+        return self.orderings[i - 1] if i else ()
+
+    def candidates(self, context: SelectionContext | None = None) -> Tuple[str, ...]:
+        """Eligible models for ``context`` minus its exclusions, in priority order."""
+        context = context or SelectionContext()
+        eligible = self.eligible(context.max_cost)
+        if not context.exclude:
+            return eligible
+        return tuple(name for name in eligible if name not in context.exclude)
+
+    def select(self, context: SelectionContext | None = None, rank: Ranker | None = None) -> Optional[str]:
+        """Highest-priority candidate, or the one ``rank`` picks."""
+        candidates = self.candidates(context)
+        if not candidates:
+            return None
+        return rank(candidates) if rank is not None else candidates[0]
+
+    def select_many(
+        self,
+        contexts: Iterable[SelectionContext | None],
+        rank: Ranker | None = None,
+    ) -> List[Optional[str]]:
+        return [self.select(context, rank) for context in contexts]
+
+
+_POLICIES: Dict[Tuple[str, str], Tuple[Any, ModelPolicy]] = {}
+_POLICIES_LOCK = threading.Lock()
+
+
+def _signature(path: Path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_policy(router_file: Path, trust_file: Path) -> ModelPolicy:
+    """Return the compiled policy for these files, recompiling on change."""
+    router_file, trust_file = Path(router_file), Path(trust_file)
+    key = (str(router_file), str(trust_file))
+    signature = (_signature(router_file), _signature(trust_file))
+    with _POLICIES_LOCK:
+        cached = _POLICIES.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        policy = ModelPolicy.from_files(router_file, trust_file)
+        _POLICIES[key] = (signature, policy)
+        return policy
+
+
+__all__ = ["MIN_TRUST", "ModelPolicy", "SelectionContext", "get_policy"]
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+"""Markov next-scene predictor learned from scene trace events.
+
+Transition counts ``previous scene -> next scene`` are learned online.  Each
+row also exists per context when the predictor is conditioned on time:
+``hour`` (``h07``), ``weekday`` (``d0`` is Monday) or ``hour_weekday``
+(``d0h07``).  A prediction uses the contextual row once it has
+``min_support`` observations and backs off to the unconditioned row
+otherwise.  Consecutive events further apart than ``session_gap`` seconds are
+not linked.
+
+The scene trace is a JSON array that writers rewrite in full, but appending
+leaves the bytes before the closing bracket untouched.  :meth:`sync_trace`
+therefore remembers the byte offset just past the last element it learned
+(and the bytes leading up to it) and parses only what follows; if those
+bytes changed the trace was rewritten and is parsed from the start.  A
+predictor loaded from a model file saves itself back after learning, so a
+new process resumes from the saved tables and offset instead of replaying
+the trace.
+
+Every row keeps its successors ordered by count.  An increment moves the
+scene to the front of its equal-count block with a single swap, so the order
+never needs re-sorting and a top-k query is a slice of the first ``k``
+entries.  The tables serialise compactly as ``[[scene, count], ...]`` lists
+in that order.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+MODEL_FILE = BASE_DIR / "scene_transitions.json"
+TRACE_FILE = BASE_DIR.parent / "addons" / "sterling_os" / "scene_trace.json"
+
+CONDITIONS = (None, "hour", "weekday", "hour_weekday")
+SESSION_GAP = 30 * 60
+MIN_SUPPORT = 3
+ANY = "*"
+# bytes before the trace offset compared to detect a rewritten trace
+TRACE_PROBE = 64
+
+_DECODER = json.JSONDecoder()
+
+
+def _scan_elements(text: str, pos: int) -> Tuple[List, int]:
+    """Decode array elements in ``text`` from ``pos``; return them and the end.
+
+    Stops at the closing bracket or at an incomplete trailing element.
+    """
+    elements: List = []
+    end = pos
+    length = len(text)
+    while True:
+        while pos < length and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= length or text[pos] == "]":
+            return elements, end
+        try:
+            element, pos = _DECODER.raw_decode(text, pos)
+        except ValueError:
+            return elements, end
+        elements.append(element)
+        end = pos
+
+
+def _array_start(text: str) -> Optional[int]:
+    """Index just past the ``[`` opening the trace (a list or ``{"executions": [...]}``)."""
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return len(text) - len(stripped) + 1
+    key = text.find('"executions"')
+    if key < 0:
+        return None
+    bracket = text.find("[", key)
+    return bracket + 1 if bracket >= 0 else None
+
+
+def _when(value) -> datetime:
+    """Coerce ``value`` to an aware datetime; naive times are taken as UTC."""
+    if value is None:
+        return datetime.now(timezone.utc)
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return datetime.now(timezone.utc)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class _Row:
+    """Successor counts kept in descending order."""
+
+    __slots__ = ("order", "counts", "pos", "total")
+
+    def __init__(self, pairs: Iterable[Tuple[str, int]] = ()) -> None:
+        self.order: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self.pos: Dict[str, int] = {}
+        self.total = 0
+        for scene, count in sorted(pairs, key=lambda p: -p[1]):
+            self.pos[scene] = len(self.order)
+            self.order.append(scene)
+            self.counts[scene] = count
+            self.total += count
+
+    def add(self, scene: str) -> None:
+        self.total += 1
+        if scene not in self.counts:
+            self.pos[scene] = len(self.order)
+            self.order.append(scene)
+            self.counts[scene] = 0
+        count = self.counts[scene] = self.counts[scene] + 1
+        i = j = self.pos[scene]
+        # swap with the first scene that still has the old count
+        while j > 0 and self.counts[self.order[j - 1]] < count:
+            j -= 1
+        if j != i:
+            other = self.order[j]
+            self.order[i], self.order[j] = other, scene
+            self.pos[other], self.pos[scene] = i, j
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        return [(scene, self.counts[scene] / self.total) for scene in self.order[:k]]
+
+    def pairs(self) -> List[List]:
+        return [[scene, self.counts[scene]] for scene in self.order]
+
+
+class ScenePredictor:
+    """Online first-order Markov model over scene executions."""
+
+    def __init__(
+        self,
+        condition: str | None = None,
+        session_gap: float = SESSION_GAP,
+        min_support: int = MIN_SUPPORT,
+    ) -> None:
+        if condition not in CONDITIONS:
+            raise ValueError(f"condition must be one of {CONDITIONS}")
+        self.condition = condition
+        self.session_gap = session_gap
+        self.min_support = min_support
+        self.rows: Dict[Tuple[str, str], _Row] = {}
+        self.last: Optional[Tuple[str, datetime]] = None
+        self.cursor = 0
+        # byte offset past the last learned trace element, and the bytes before it
+        self.trace_offset = 0
+        self.trace_probe = b""
+        self.path: Optional[Path] = None
+        self._trace_signature = None
+        self._lock = threading.RLock()
+
+    def context(self, when: datetime) -> str:
+        if self.condition == "hour":
+            return f"h{when.hour:02d}"
+        if self.condition == "weekday":
+            return f"d{when.weekday()}"
+        if self.condition == "hour_weekday":
+            return f"d{when.weekday()}h{when.hour:02d}"
+        return ANY
+
+    # -- learning -----------------------------------------------------------
+    def observe(self, scene: str, when=None) -> None:
+        """Record that ``scene`` ran at ``when`` (default: now)."""
+        when = _when(when)
+        with self._lock:
+            if self.last is not None:
+                prev, at = self.last
+                gap = (when - at).total_seconds()
+                if 0 <= gap <= self.session_gap:
+                    for ctx in {ANY, self.context(when)}:
+                        self.rows.setdefault((ctx, prev), _Row()).add(scene)
+            self.last = (scene, when)
+
+    def train(self, events: Iterable[Dict]) -> int:
+        """Observe trace events (``{"scene", "timestamp"}``); return how many."""
+        seen = 0
+        for event in events:
+            scene = event.get("scene")
+            if scene:
+                self.observe(scene, event.get("timestamp"))
+                seen += 1
+        return seen
+
+    def sync_trace(self, path: Path | None = None) -> int:
+        """Learn from trace entries appended since the last sync."""
+        path = Path(path or TRACE_FILE)
+        try:
+            stat = path.stat()
+        except OSError:
+            return 0
+        signature = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature == self._trace_signature:
+                return 0
+            with open(path, "rb") as f:
+                events = self._read_appended(f, stat.st_size)
+            if events is None:
+                events = self._read_rewritten(path)
+            learned = self.train(events)
+            self.cursor += len(events)
+            self._trace_signature = signature
+            if learned and self.path is not None:
+                self.save(self.path)
+        return learned
+
+    def _read_appended(self, f, size: int) -> Optional[List]:
+        """Elements after ``trace_offset``, or ``None`` if the trace was rewritten."""
+        probe = self.trace_probe
+        if not self.trace_offset or size < self.trace_offset:
+            return None
+        f.seek(self.trace_offset - len(probe))
+        if f.read(len(probe)) != probe:
+            return None
+        tail = f.read().decode("utf-8", errors="replace")
+        events, end = _scan_elements(tail, 0)
+        self._advance(f, self.trace_offset + len(tail[:end].encode()))
+        return events
+
+    def _read_rewritten(self, path: Path) -> List:
+        """Parse the whole trace; return the elements not learned yet."""
+        raw = path.read_bytes()
+        text = raw.decode("utf-8", errors="replace")
+        start = _array_start(text)
+        if start is None:
+            return []
+        events, end = _scan_elements(text, start)
+        offset = len(text[:end].encode())
+        self.trace_offset = offset
+        self.trace_probe = raw[max(0, offset - TRACE_PROBE):offset]
+        if len(events) < self.cursor:
+            # the trace was reset; keep what was learned and start over
+            self.cursor = 0
+        # ``cursor`` elements were learned before; the caller adds the rest
+        return events[self.cursor:]
+
+    def _advance(self, f, offset: int) -> None:
+        if offset == self.trace_offset:
+            return
+        f.seek(max(0, offset - TRACE_PROBE))
+        self.trace_probe = f.read(offset - max(0, offset - TRACE_PROBE))
+        self.trace_offset = offset
+
+    # -- prediction ---------------------------------------------------------
+    def predict(self, k: int = 3, scene: str | None = None, when=None) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(scene, probability)`` pairs, most likely first.
+
+        ``scene`` defaults to the last observed scene.
+        """
+        if scene is None:
+            if self.last is None:
+                return []
+            scene = self.last[0]
+        row = self.rows.get((self.context(_when(when)), scene))
+        if row is None or row.total < self.min_support:
+            row = self.rows.get((ANY, scene), row)
+        return row.top(k) if row is not None else []
+
+    # -- persistence ----------------------------------------------------------
+    def to_dict(self) -> Dict:
+        return {
+            "condition": self.condition,
+            "session_gap": self.session_gap,
+            "min_support": self.min_support,
+            "last": [self.last[0], self.last[1].isoformat()] if self.last else None,
+            "cursor": self.cursor,
+            "trace_offset": self.trace_offset,
+            "trace_probe": self.trace_probe.hex(),
+            "rows": {f"{ctx}\t{prev}": row.pairs() for (ctx, prev), row in self.rows.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScenePredictor":
+        predictor = cls(data.get("condition"), data.get("session_gap", SESSION_GAP), data.get("min_support", MIN_SUPPORT))
+        for key, pairs in data.get("rows", {}).items():
+            ctx, prev = key.split("\t", 1)
+            predictor.rows[(ctx, prev)] = _Row(pairs)
+        if data.get("last"):
+            predictor.last = (data["last"][0], _when(data["last"][1]))
+        predictor.cursor = data.get("cursor", 0)
+        predictor.trace_offset = data.get("trace_offset", 0)
+        predictor.trace_probe = bytes.fromhex(data.get("trace_probe", ""))
+        return predictor
+
+    def save(self, path: Path | None = None) -> None:
+        path = Path(path or MODEL_FILE)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with self._lock:
+            tmp.write_text(json.dumps(self.to_dict(), separators=(",", ":")))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path | None = None, condition: str | None = None) -> "ScenePredictor":
+        """Load the model at ``path``; :meth:`sync_trace` saves back to it."""
+        path = Path(path or MODEL_FILE)
+        try:
+            predictor = cls.from_dict(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            predictor = cls(condition)
+        predictor.path = path
+        return predictor
+
+
+_PREDICTOR: Optional[ScenePredictor] = None
+_PREDICTOR_LOCK = threading.Lock()
+
+
+def get_predictor() -> ScenePredictor:
+    """Return the process-wide predictor, loaded from ``MODEL_FILE``."""
+    global _PREDICTOR
+    with _PREDICTOR_LOCK:
+        if _PREDICTOR is None:
+            _PREDICTOR = ScenePredictor.load()
+        return _PREDICTOR
+
+
+__all__ = ["CONDITIONS", "ScenePredictor", "get_predictor"]
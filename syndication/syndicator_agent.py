@@ -4,13 +4,29 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, List
 import yaml
 
+try:
+    from concord import concord_agent
+except ImportError:  # pragma: no cover - repo root not on sys.path
+    concord_agent = None
+
+try:
+    from .model_policy import ModelPolicy, SelectionContext, get_policy
+    from .scene_predictor import get_predictor
+except ImportError:  # pragma: no cover - loaded outside the package
+    from syndication.model_policy import ModelPolicy, SelectionContext, get_policy
+    from syndication.scene_predictor import get_predictor
+
 BASE_DIR = Path(__file__).resolve().parent
 CLUSTER_FILE = BASE_DIR / "scene_clusters.json"
 ROUTER_FILE = BASE_DIR / "model_router.yaml"
 TRUST_FILE = BASE_DIR / "model_trust_registry.json"
+# grades a model needs before Concord results override the priority order
+MIN_GRADES = 5
+# win rate a graded model needs to displace a head it has never met
+MIN_WIN_RATE = 0.5
 
 
 def load_clusters() -> List[Dict[str, Any]]:
@@ -40,26 +56,99 @@ def load_trust() -> Dict[str, Dict[str, Any]]:
     return {}
 
 
+def predict_top(k: int = 3) -> List[str]:
+    """Most likely next scenes from the learned transition model."""
+    predictor = get_predictor()
+    predictor.sync_trace()
+    return [scene for scene, _ in predictor.predict(k)]
+
+
 def predict_next() -> str | None:
+    """Learned next scene, falling back to the first static cluster."""
+    top = predict_top(1)
+    if top:
+        return top[0]
     clusters = load_clusters()
     if clusters:
         return clusters[0].get("predicted_next")
     return None
 
 
-def select_model() -> str | None:
-    router = load_router()
-    trust = load_trust()
-    for name in router.get("route_policies", {}).get("priority", []):
-        info = trust.get(name, {})
-        if info.get("trust", 0) > 85 and info.get("cost", 1) <= router.get("cost_threshold", {}).get("max_cost", 0):
-            return name
-    return None
+def prefetch(k: int = 3) -> Dict[str, str]:
+    """Resolve entity ids for the ``k`` likeliest next scenes before they are asked for."""
+    from addons.sterling_os import scene_executor
+
+    return scene_executor.prewarm(predict_top(k))
+
+
+def live_grades() -> Dict[str, Dict[str, Any]]:
+    """Concord leaderboard rows for models with at least ``MIN_GRADES`` grades."""
+    if concord_agent is None:
+        return {}
+    return {row["model"]: row for row in concord_agent.leaderboard(MIN_GRADES)}
+
+
+def _outperforms(challenger: str, head: str, graded: Dict[str, Dict[str, Any]]) -> bool:
+    """Whether ``challenger``'s grades justify skipping the priority ``head``."""
+    if concord_agent is not None:
+        wins, losses = concord_agent.head_to_head(challenger, head)
+        if wins or losses:
+            return wins > losses
+    return graded[challenger]["win_rate"] >= MIN_WIN_RATE
+
+
+def routing_policy() -> ModelPolicy:
+    """Compiled routing policy, recompiled when the router or trust file changes."""
+    return get_policy(ROUTER_FILE, TRUST_FILE)
+
+
+def _context(context) -> SelectionContext:
+    if context is None or isinstance(context, SelectionContext):
+        return context or SelectionContext()
+    return SelectionContext(context.get("max_cost"), frozenset(context.get("exclude", ())))
+
+
+def _grade_ranker(graded: Dict[str, Dict[str, Any]]):
+    """Rank candidates by live grades; see :func:`select_models`."""
+
+    def rank(candidates):
+        head = candidates[0]
+        ranked = [name for name in candidates[1:] if name in graded and _outperforms(name, head, graded)]
+        if not ranked:
+            return head
+        # max() keeps the first of equals, i.e. router priority breaks ties
+        return max(ranked, key=lambda n: (graded[n]["win_rate"], graded[n]["mean"]))
+
+    return rank
+
+
+def select_models(contexts: Iterable[SelectionContext | Dict[str, Any] | None]) -> List[str | None]:
+    """Select a model for each context (``max_cost`` / ``exclude``) in one pass.
+
+    The router priority picks a default among trusted models within the
+    cost ceiling.  A model with at least ``MIN_GRADES`` Concord grades
+    replaces it only if it outperforms that default: it won more of their
+    head-to-head prompts or, when they never met, it wins at least
+    ``MIN_WIN_RATE`` of its prompts.  The best such challenger by win rate
+    (then mean score) is chosen.
+    """
+    rank = _grade_ranker(live_grades())
+    return routing_policy().select_many((_context(c) for c in contexts), rank)
+
+
+def select_model(context: SelectionContext | Dict[str, Any] | None = None) -> str | None:
+    """Pick a trusted model within the cost ceiling; see :func:`select_models`."""
+    return select_models([context])[0]
 
 __all__ = [
     "load_clusters",
     "load_router",
     "load_trust",
+    "live_grades",
     "predict_next",
+    "predict_top",
+    "prefetch",
+    "routing_policy",
     "select_model",
+    "select_models",
 ]
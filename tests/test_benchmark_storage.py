@@ -0,0 +1,39 @@
+import importlib.util
+import json
+import os
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+spec = importlib.util.spec_from_file_location('benchmark_storage', os.path.join(ROOT, 'scripts', 'benchmark_storage.py'))
+bench = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench)
+
+
+def test_synthesize_sizes(tmp_path):
+    bench.synthesize(tmp_path, 50)
+    assert len(json.loads((tmp_path / 'runtime_memory.json').read_text())['route_logs']) == 50
+    assert len(json.loads((tmp_path / 'router_log.json').read_text())) == 50
+    assert len(json.loads((tmp_path / 'memory_timeline.json').read_text())) == 50
+
+
+def test_measure_and_compare():
+    row = bench.measure(lambda: None, min_time=0, min_runs=5, max_runs=5)
+    assert row['runs'] == 5 and row['ops_per_sec'] > 0
+    baseline = {'case@10': {'ops_per_sec': 100.0, 'p99_ms': 1.0}}
+    assert bench.compare({'case@10': {'ops_per_sec': 90.0, 'p99_ms': 1.1}}, baseline, 0.25) == []
+    failures = bench.compare({'case@10': {'ops_per_sec': 50.0, 'p99_ms': 2.0}}, baseline, 0.25)
+    assert len(failures) == 2
+
+
+def test_restore_keeps_history_size_fixed(tmp_path):
+    bench.synthesize(tmp_path, 20)
+    log = tmp_path / 'router_log.json'
+
+    def append():
+        entries = json.loads(log.read_text())
+        entries.append({'query': 'x'})
+        log.write_text(json.dumps(entries))
+        sizes.append(len(entries))
+
+    sizes = []
+    bench.measure(append, min_time=0, min_runs=3, max_runs=3, reset=lambda: bench.restore(tmp_path))
+    assert sizes == [21, 21, 21]
@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+import zlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import build_info
+
+SHA = 'a' * 40
+
+
+def _fake_repo(tmp_path, head='ref: refs/heads/feature\n'):
+    git = tmp_path / '.git'
+    (git / 'refs' / 'heads').mkdir(parents=True)
+    (git / 'HEAD').write_text(head)
+    body = b'tree ' + b'b' * 40 + b'\ncommitter Dev <dev@example.com> 1700000000 -0400\n\nmsg\n'
+    obj = git / 'objects' / SHA[:2] / SHA[2:]
+    obj.parent.mkdir(parents=True)
+    obj.write_bytes(zlib.compress(b'commit %d\x00' % len(body) + body))
+    return git
+
+
+def test_reads_loose_ref_and_commit_date(tmp_path, monkeypatch):
+    monkeypatch.delenv('DOCKER_IMAGE', raising=False)
+    git = _fake_repo(tmp_path)
+    (git / 'refs' / 'heads' / 'feature').write_text(SHA + '\n')
+    info = build_info.load_build_info(tmp_path, tmp_path / 'missing.json')
+    assert info.commit == SHA
+    assert info.branch == 'feature'
+    assert info.commit_date == '2023-11-14T18:13:20-04:00'
+    assert info.image_id == 'unknown'
+
+
+def test_packed_refs_and_manifest_fallback(tmp_path, monkeypatch):
+    monkeypatch.setenv('DOCKER_IMAGE', 'sha256:img')
+    git = _fake_repo(tmp_path, head='ref: refs/heads/main\n')
+    other = 'c' * 40
+    (git / 'packed-refs').write_text(f'# pack-refs with: peeled\n{other} refs/heads/main\n')
+    manifest = tmp_path / 'metadata.json'
+    manifest.write_text(json.dumps({'commit_date': '2025-01-01T00:00:00+00:00'}))
+    info = build_info.load_build_info(tmp_path, manifest)
+    assert info.commit == other and info.branch == 'main'
+    # object is not loose, so the manifest supplies the date
+    assert info.commit_date == '2025-01-01T00:00:00+00:00'
+    assert info.image_id == 'sha256:img'
+
+
+def test_no_git_uses_manifest(tmp_path):
+    manifest = tmp_path / 'metadata.json'
+    manifest.write_text(json.dumps({'commit': SHA, 'branch': 'release'}))
+    info = build_info.load_build_info(tmp_path, manifest)
+    assert (info.commit, info.branch) == (SHA, 'release')
+
+
+def test_get_build_info_is_cached(monkeypatch):
+    calls = []
+    build_info.reset()
+    monkeypatch.setattr(build_info, 'load_build_info', lambda: calls.append(1) or 'info')
+    assert build_info.get_build_info() == build_info.get_build_info() == 'info'
+    assert calls == [1]
+    build_info.reset()
@@ -1,5 +1,7 @@
 import os
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from types import SimpleNamespace
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -10,6 +12,7 @@ from sterling.career_signal_fire import (
     fetch_articles,
     score_article,
 )
+from sterling.feed_ingest import KeywordMatcher
 
 
 def test_score_article():
@@ -31,8 +34,8 @@ def test_score_article():
     assert "Medicaid" in keywords
 
 
-def test_fetch_articles(monkeypatch):
-    def fake_parse(url):
+def test_fetch_articles(monkeypatch, tmp_path):
+    def fake_parse(url, **_validators):
         return SimpleNamespace(
             entries=[
                 {
@@ -45,7 +48,7 @@ def test_fetch_articles(monkeypatch):
         )
 
     monkeypatch.setitem(sys.modules, "feedparser", SimpleNamespace(parse=fake_parse))
-    articles = fetch_articles()
+    articles = fetch_articles(state_file=tmp_path / "state.json")
     assert articles
     assert any(
         k.lower() in articles[0]["raw_text"].lower() for k in CAREER_KEYWORDS
@@ -71,3 +74,76 @@ def test_dispatch_alert(capsys):
 
     assert "exec" in logs
     assert any("High-impact" in m for m in logs)
+
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Local</title>
+<item><title>Medicaid rate cut</title><link>http://local/{feed}/1</link>
+<description>home care agencies</description></item>
+<item><title>Weather</title><link>http://local/{feed}/2</link>
+<description>sunny</description></item>
+<item><title>Shared CMS story</title><link>http://local/shared</link>
+<description>syndicated</description></item>
+</channel></rss>"""
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        etag = f'"{self.path}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.requests.append((self.path, 304))
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = RSS.format(feed=self.path.strip("/")).encode()
+        self.requests.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+def test_fetch_articles_conditional_and_deduped(tmp_path):
+    _FeedHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        feeds = [f"{base}/a", f"{base}/b", f"{base}/c"]
+        state = tmp_path / "state.json"
+
+        first = fetch_articles(feeds, state_file=state)
+        links = sorted(a["link"] for a in first)
+        assert links == [
+            "http://local/a/1",
+            "http://local/b/1",
+            "http://local/c/1",
+            "http://local/shared",
+        ]
+
+        second = fetch_articles(feeds, state_file=state)
+        assert second == []
+        assert sorted(_FeedHandler.requests) == sorted(
+            [(f"/{f}", 200) for f in "abc"] + [(f"/{f}", 304) for f in "abc"]
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_keyword_matcher():
+    matcher = KeywordMatcher(CAREER_KEYWORDS)
+    assert matcher.search("New MEDICAID guidance")
+    assert not matcher.search("Local sports roundup")
+    assert matcher.matches("Medicare Advantage and home care, plus medicaid") == [
+        "Medicare Advantage",
+        "home care",
+        "Medicaid",
+    ]
@@ -16,3 +16,49 @@ def test_record_grade(tmp_path, monkeypatch):
     assert winner == 'a'
     data = json.loads(grade_file.read_text())
     assert data and data[0]['winner'] == 'a'
+
+
+def test_leaderboard_aggregates(tmp_path, monkeypatch):
+    grade_file = tmp_path / 'grade.json'
+    grade_file.write_text(json.dumps([{'prompt_id': 'old', 'responses': {'a': 50, 'b': 70}, 'winner': 'b'}]))
+    monkeypatch.setattr(concord, 'GRADEBOOK_FILE', grade_file)
+    concord.record_grade('p1', {'a': 90, 'b': 80, 'c': 60})
+    concord.record_grade('p2', {'a': 70, 'c': 75})
+
+    board = {row['model']: row for row in concord.leaderboard()}
+    assert board['a']['grades'] == 3 and board['a']['wins'] == 1
+    assert board['a']['mean'] == 70
+    assert board['a']['variance'] == 400
+    assert board['c']['wins'] == 1
+    assert [row['model'] for row in concord.leaderboard(min_grades=2)] == ['b', 'c', 'a']
+
+    book = concord.get_gradebook(grade_file)
+    assert book.head_to_head('a', 'b') == (1, 1)
+    assert book.head_to_head('c', 'a') == (1, 1)
+    assert [e['prompt_id'] for e in json.loads(grade_file.read_text())] == ['old', 'p1', 'p2']
+
+    # an external rewrite is picked up
+    grade_file.write_text('[]')
+    assert concord.leaderboard() == []
+
+
+def test_grade_appended_by_another_writer_is_folded(tmp_path, monkeypatch):
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from concord import grading
+
+    grade_file = tmp_path / 'grade.json'
+    book = grading.Gradebook(grade_file)
+    book.record('p0', {'a': 1, 'b': 2})
+    real_append = grading.append_array
+
+    def racing_append(path, entries):
+        # another process appends after refresh() but before our append
+        real_append(path, [{'prompt_id': 'other', 'responses': {'a': 9, 'b': 1}, 'winner': 'a'}])
+        return real_append(path, entries)
+
+    monkeypatch.setattr(grading, 'append_array', racing_append)
+    book.record('p1', {'a': 5, 'b': 3})
+    stats = {row['model']: row['wins'] for row in book.leaderboard()}
+    assert stats == {'a': 2, 'b': 1}
+    assert book.stats['a'].grades == 3
@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from diagnostics_store import DiagnosticsStore, category, get_store
+
+
+def test_counters_and_rings(tmp_path):
+    store = DiagnosticsStore(tmp_path / "diag.json", ring_size=2)
+    store.append(["low_weight:a"])
+    store.append(["Error: config corrupted", "low_weight:b"])
+    store.append(["error: timeout"])
+    assert store.counters() == {
+        "risks": {"low_weight": 2, "error": 2},
+        "errors": {"error": 2},
+    }
+    assert store.error_count() == 2
+    assert store.error_count("ERROR") == 2
+    assert len(store.recent()) == 2
+    assert store.recent(1)[0]["risks"] == ["error: timeout"]
+    assert store.recent_errors() == ["Error: config corrupted", "error: timeout"]
+
+
+def test_errors_is_not_capped_by_the_ring(tmp_path):
+    path = tmp_path / "diag.jsonl"
+    store = DiagnosticsStore(path, segment_bytes=200, max_segments=4, ring_size=2)
+    for i in range(5):
+        store.append([f"Error: {i}", "low_weight:x"])
+    assert store.segment_path(1).exists()
+    assert store.recent_errors() == ["Error: 3", "Error: 4"]
+    assert store.errors() == [f"Error: {i}" for i in range(5)]
+    assert len(store.errors()) == store.error_count()
+
+
+def test_follows_appends_from_another_writer(tmp_path):
+    path = tmp_path / "diag.json"
+    reader = DiagnosticsStore(path)
+    writer = DiagnosticsStore(path)
+    assert not reader.has_errors()
+    writer.append(["disk error"])
+    assert reader.has_errors()
+    # a half-written line is left until it is complete
+    with open(path, "a") as f:
+        f.write('{"risks": ["second error"]')
+    assert reader.error_count() == 1
+    with open(path, "a") as f:
+        f.write("}\n")
+    assert reader.error_count() == 2
+
+
+def test_rotation_bounds_disk_and_counters(tmp_path):
+    path = tmp_path / "diag.json"
+    writer = DiagnosticsStore(path, segment_bytes=200, max_segments=2)
+    reader = DiagnosticsStore(path, segment_bytes=200, max_segments=2)
+    writer.append(["fatal error"])
+    assert reader.has_errors()
+    for i in range(30):
+        writer.append([f"low_weight:agent{i}"])
+        reader.refresh()
+    assert not (tmp_path / "diag.json.3").exists()
+    assert (tmp_path / "diag.json.2").exists()
+    # the segment holding the error has been rotated out
+    assert not writer.has_errors()
+    assert not reader.has_errors()
+    fresh = DiagnosticsStore(path, segment_bytes=200, max_segments=2)
+    assert fresh.counters() == reader.counters()
+
+
+def test_legacy_array_is_migrated(tmp_path):
+    path = tmp_path / "diag.json"
+    path.write_text(json.dumps([{"timestamp": "t", "risks": ["Error: bad"]}], indent=2))
+    store = get_store(path)
+    assert store.recent_errors() == ["Error: bad"]
+    assert json.loads(path.read_text().splitlines()[0])["risks"] == ["Error: bad"]
+    assert get_store(str(path)) is store
+
+
+def test_category():
+    assert category("Low_Weight:a") == "low_weight"
+    assert category("high_scene_anomalies") == "high_scene_anomalies"
+
+
+def test_renamed_log_imports_legacy_json(tmp_path):
+    legacy = tmp_path / 'diagnostics_log.json'
+    legacy.write_text('[{"risks": ["Error: disk full"]}]')
+    store = DiagnosticsStore(tmp_path / 'diagnostics_log.jsonl')
+    assert store.recent_errors() == ['Error: disk full']
+    assert not legacy.exists()
+    assert (tmp_path / 'diagnostics_log.jsonl').read_text().startswith('{')
@@ -17,3 +17,70 @@ def test_evaluate_selects_best_agent(tmp_path, monkeypatch):
         "low",
     )
     assert result["approved_agent"] == "agent_a"
+
+
+def test_precedent_cache_and_batched_ledger(tmp_path, monkeypatch):
+    import json
+    from ethics import ethics_engine
+
+    ledger_file = tmp_path / "ledger.json"
+    monkeypatch.setattr(ethics_engine, "PRECEDENT_FILE", ledger_file)
+    engine = EthicsEngine()
+    monkeypatch.setattr(engine, "constitution", {"hierarchy": {"agent_a": 100, "agent_b": 50}})
+    calls = []
+    real = engine._remember
+    monkeypatch.setattr(engine, "_remember", lambda k, r: calls.append(k) or real(k, r))
+
+    request = ("lights_on", {"agent_a": "do", "agent_b": "do"}, {"agent_a": 0.4, "agent_b": 0.9}, "low")
+    first = engine.evaluate(*request)
+    assert first == {"command": "lights_on", "approved_agent": "agent_b", "risk": "low"}
+    # same trust bucket: served from the precedent cache, nothing re-scored
+    again = engine.evaluate(request[0], request[1], {"agent_a": 0.41, "agent_b": 0.91}, "low")
+    assert again == first and len(calls) == 1
+    assert not ethics_engine._journal_path(ledger_file).exists()
+
+    results = engine.evaluate_many([
+        request,
+        ("lock_door", {"agent_a": "do"}, {"agent_a": 0.5}, "high"),
+    ])
+    assert [r["approved_agent"] for r in results] == ["agent_b", "agent_a"]
+    journal = ethics_engine._journal_path(ledger_file).read_text().splitlines()
+    assert [json.loads(l)["command"] for l in journal] == ["lights_on", "lock_door"]
+
+    # a new engine warms its cache from the ledger
+    fresh = EthicsEngine()
+    monkeypatch.setattr(fresh, "constitution", engine.constitution)
+    assert fresh.precedent["lock_door"]["approved_agent"] == "agent_a"
+    assert len(fresh._cache) == 2
+    assert fresh.evaluate(*request) == first
+
+
+def test_journal_compacts_into_snapshot(tmp_path, monkeypatch):
+    import json
+    from ethics import ethics_engine
+
+    ledger_file = tmp_path / "ledger.json"
+    monkeypatch.setattr(ethics_engine, "PRECEDENT_FILE", ledger_file)
+    monkeypatch.setattr(ethics_engine, "COMPACT_EVERY", 3)
+    engine = EthicsEngine()
+    engine.evaluate_many([(f"cmd{i}", {"a": "x"}, {"a": 1.0}, "low") for i in range(2)])
+    assert not ledger_file.exists()
+    engine.evaluate_many([("cmd2", {"a": "x"}, {"a": 1.0}, "low")])
+    assert sorted(json.loads(ledger_file.read_text())) == ["cmd0", "cmd1", "cmd2"]
+    assert not ethics_engine._journal_path(ledger_file).exists()
+
+
+def test_cached_ruling_matches_fresh_evaluation(tmp_path, monkeypatch):
+    from ethics import ethics_engine
+
+    monkeypatch.setattr(ethics_engine, "PRECEDENT_FILE", tmp_path / "ledger.json")
+    engine = EthicsEngine()
+    monkeypatch.setattr(engine, "constitution", {})
+    proposals = {"a": "do", "b": "do"}
+    first = engine.evaluate("c", proposals, {"a": 0.84, "b": 0.81}, "low")
+    # both agents stay in the 0.80 bucket but swap which trust is higher
+    swapped = engine.evaluate("c", proposals, {"a": 0.81, "b": 0.84}, "low")
+    engine.clear_cache()
+    fresh = engine.evaluate("c", proposals, {"a": 0.81, "b": 0.84}, "low")
+    assert first == swapped == fresh
+    assert fresh["approved_agent"] == "a"
@@ -1,5 +1,6 @@
 import importlib.util
 import os
+import subprocess
 import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -9,12 +10,72 @@ git_diff_analyzer = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(git_diff_analyzer)
 
 
-def test_parse_git_diff(monkeypatch):
+def test_parse_git_diff(tmp_path, monkeypatch):
     sample = '+++ b/app.py\n+print("hi")\n-removed'
-    def fake_check_output(cmd, stderr=None):
-        return sample.encode()
-    monkeypatch.setattr(git_diff_analyzer.subprocess, 'check_output', fake_check_output)
+    calls = []
+
+    def fake_lines(args):
+        calls.append(args[0])
+        if args[0] == 'rev-parse':
+            return iter(['a' * 40, 'b' * 40])
+        return iter(sample.splitlines())
+
+    monkeypatch.setattr(git_diff_analyzer, '_git_lines', fake_lines)
+    monkeypatch.setattr(git_diff_analyzer, 'LOG_DIR', str(tmp_path))
+    git_diff_analyzer.clear_cache()
     result = git_diff_analyzer.get_last_commit_diff()
     assert 'modified' in result
     assert 'app.py' in result['modified']
+    # the same commit pair is served from the cache
+    assert git_diff_analyzer.get_last_commit_diff() is result
+    assert calls == ['rev-parse', 'diff', 'rev-parse']
+
+
+def _git(repo, *args):
+    subprocess.check_call(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args], cwd=repo,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def test_changed_files_since_last_analyzed(tmp_path, monkeypatch):
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    _git(repo, 'init', '-q')
+    (repo / 'app.py').write_text('a\n')
+    (repo / 'old name.txt').write_text('x\n' * 20)
+    _git(repo, 'add', '-A')
+    _git(repo, 'commit', '-qm', 'one')
+    monkeypatch.chdir(repo)
+    git_diff_analyzer.clear_cache()
+    first = git_diff_analyzer.get_changed_files()
+    assert first['files'] == {'app.py': 'A', 'old name.txt': 'A'}
+
+    (repo / 'app.py').write_text('b\n')
+    _git(repo, 'commit', '-qam', 'two')
+    _git(repo, 'mv', 'old name.txt', 'tests_new.txt')
+    _git(repo, 'commit', '-qm', 'three')
+    second = git_diff_analyzer.get_changed_files()
+    # both commits since the last analyzed HEAD are covered
+    assert second['files'] == {'app.py': 'M', 'tests_new.txt': 'R'}
+    assert second['base'] == first['head']
+    # nothing new since the last call: no files, not the same changes again
+    unchanged = git_diff_analyzer.get_changed_files()
+    assert unchanged['files'] == {} and unchanged['base'] == unchanged['head'] == second['head']
+    assert git_diff_analyzer.get_changed_files('HEAD~1', 'HEAD')['modified'] == ['tests_new.txt']
+    assert 'error' in git_diff_analyzer.get_changed_files('no-such-ref')
+
 
+def test_git_stream_survives_large_stderr(tmp_path, monkeypatch):
+    # a stderr flood bigger than a pipe buffer used to deadlock the reader
+    script = tmp_path / 'git'
+    script.write_text('#!/bin/sh\nhead -c 200000 /dev/zero >&2\necho out\nexit 3\n')
+    script.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    chunks = []
+    try:
+        for chunk in git_diff_analyzer._git_stream(['status']):
+            chunks.append(chunk)
+    except subprocess.CalledProcessError as exc:
+        assert exc.returncode == 3 and len(exc.output) == 200000
+    else:
+        raise AssertionError('non-zero exit was not raised')
+    assert b''.join(chunks) == b'out\n'
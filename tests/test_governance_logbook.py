@@ -0,0 +1,71 @@
+import gzip
+import json
+import os
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from platinum.logbook import Logbook
+
+
+def _record(i):
+    return {'timestamp': f'2025-07-{i + 1:02d}T00:00:00+00:00', 'action': 'escalation', 'scene': f's{i}', 'tags': ['a', 'b']}
+
+
+def test_append_keeps_yaml_list(tmp_path):
+    path = tmp_path / 'log.yaml'
+    book = Logbook(path)
+    for i in range(3):
+        book.append(_record(i))
+    data = yaml.safe_load(path.read_text())
+    assert [r['scene'] for r in data] == ['s0', 's1', 's2']
+    assert [r['scene'] for r in book] == ['s0', 's1', 's2']
+    assert len(book) == 3
+
+
+def test_between_uses_index(tmp_path):
+    path = tmp_path / 'log.yaml'
+    book = Logbook(path)
+    for i in range(10):
+        book.append(_record(i))
+    found = list(book.between('2025-07-03', '2025-07-05T23:59:59'))
+    assert [r['scene'] for r in found] == ['s2', 's3', 's4']
+    assert list(book.between('2026-01-01')) == []
+    assert len(book.index_path.read_text().splitlines()) == 10
+
+
+def test_legacy_file_is_indexed(tmp_path):
+    path = tmp_path / 'log.yaml'
+    path.write_text(yaml.safe_dump([_record(0), _record(1)]))
+    book = Logbook(path)
+    book.append(_record(2))
+    assert [r['scene'] for r in book.between('2025-07-02')] == ['s1', 's2']
+
+    flow = tmp_path / 'flow.yaml'
+    flow.write_text(yaml.safe_dump([]))
+    other = Logbook(flow)
+    other.append(_record(0))
+    assert yaml.safe_load(flow.read_text())[0]['scene'] == 's0'
+
+
+def test_compaction_archives_old_records(tmp_path):
+    path = tmp_path / 'log.yaml'
+    book = Logbook(path, compact_bytes=2000)
+    for i in range(28):
+        book.append(_record(i))
+    assert path.stat().st_size <= 2000
+    archived = [json.loads(l) for l in gzip.decompress(book.archive_path.read_bytes()).splitlines()]
+    live = yaml.safe_load(path.read_text())
+    assert [r['scene'] for r in archived + live] == [f's{i}' for i in range(28)]
+    assert [r['scene'] for r in book.iter_records(archived=True)] == [f's{i}' for i in range(28)]
+    assert [r['scene'] for r in book.between('2025-07-28')] == ['s27']
+    # ranges reaching into the archive are answered from the matching members
+    assert [r['scene'] for r in book.between('2025-07-10', '2025-07-12T23:59:59')] == ['s9', 's10', 's11']
+    assert [r['scene'] for r in book.between('2025-07-10', '2025-07-11T23:59:59', archived=False)] == []
+    assert book.archive_index_path.read_text().count('\n') >= 1
+    assert [r['scene'] for r in book.between()] == [f's{i}' for i in range(28)]
+
+    assert book.compact(before='2025-07-28') == len(live) - 1
+    assert [r['scene'] for r in book] == ['s27']
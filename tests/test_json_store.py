@@ -3,7 +3,7 @@ import os
 import shutil
 from pathlib import Path
 import pytest
-from json_store import JSONStore, JSONStoreError
+from json_store import JSONStore, JSONStoreError, append_array
 
 
 def test_read_missing(tmp_path):
@@ -134,3 +134,36 @@ def test_fsync_failure(tmp_path, monkeypatch):
     with pytest.raises(JSONStoreError):
         store.write({"y": 1})
     assert not file.exists()
+
+
+def _append_worker(path, worker):
+    for i in range(20):
+        append_array(path, [{"worker": worker, "i": i}])
+
+
+def test_append_array_serialises_processes(tmp_path):
+    import multiprocessing
+
+    path = tmp_path / "log.json"
+    path.write_text("[]")
+    procs = [multiprocessing.Process(target=_append_worker, args=(path, w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    entries = json.loads(path.read_text())
+    assert sorted((e["worker"], e["i"]) for e in entries) == [(w, i) for w in range(4) for i in range(20)]
+
+
+def test_append_array_cuts_off_torn_append(tmp_path):
+    path = tmp_path / "log.json"
+    before, after = append_array(path, [{"a": 1}])
+    assert before is None and after is not None
+    intact = path.read_bytes()
+    cut = intact.rstrip().rindex(b"}") + 1
+    # a writer died after recording its offset and writing half an entry
+    path.write_bytes(intact[:cut] + b',\n  {"b": ')
+    (tmp_path / "log.json.lock").write_text(str(cut))
+    before, after = append_array(path, [{"c": 3}])
+    assert json.loads(path.read_text()) == [{"a": 1}, {"c": 3}]
+    assert before != after
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import pytest
+
+from threads import timeline_guard
+from threads.lease_lock import LeaseError, LeaseLockManager
+
+
+def test_cas_owner_expiry_and_tokens(tmp_path):
+    locks = LeaseLockManager(tmp_path / 'locks.db')
+    first = locks.try_acquire('home', 'a', ttl=0.05)
+    assert first.token == 1
+    assert locks.try_acquire('home', 'b') is None
+    assert locks.try_acquire('home', 'a', ttl=0.05).token == 1  # re-entrant extend
+    assert locks.release('home', 'b') is False
+    time.sleep(0.06)
+    assert locks.holder('home') is None
+    assert locks.renew('home', 'a') is None
+    taken = locks.try_acquire('home', 'b')
+    assert taken.owner == 'b' and taken.token == 2
+    assert locks.renew('home', 'b', ttl=60).expires_at > taken.expires_at
+    with pytest.raises(LeaseError):
+        with locks.lease('home', 'c'):
+            pass
+    assert locks.release('home', 'b')
+    with locks.lease('home', 'c') as lease:
+        assert locks.holder('home').owner == 'c' == lease.owner
+    assert locks.held() == []
+
+
+def test_purge_drops_only_expired_prefixed_leases(tmp_path):
+    locks = LeaseLockManager(tmp_path / 'locks.db')
+    locks.try_acquire('sweep@1', 'a', ttl=0.01)
+    locks.try_acquire('sweep@2', 'a', ttl=60)
+    locks.try_acquire('home', 'a', ttl=0.01)
+    time.sleep(0.02)
+    assert locks.purge('sweep@') == 1
+    assert locks.holder('sweep@2') is not None
+    # an expired lease outside the prefix keeps its row and its token
+    assert locks.try_acquire('home', 'b').token == 2
+
+
+def test_async_waiters_are_fifo(tmp_path):
+    locks = LeaseLockManager(tmp_path / 'locks.db')
+    order = []
+
+    async def worker(owner):
+        async with locks.hold('scene', owner, ttl=5):
+            order.append(owner)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        first = locks.try_acquire('scene', 'holder')
+        tasks = [asyncio.create_task(worker(name)) for name in ('w1', 'w2', 'w3')]
+        await asyncio.sleep(0.02)
+        assert order == []
+        locks.release('scene', first.owner)
+        await asyncio.gather(*tasks)
+        locks.try_acquire('scene', 'holder')
+        with pytest.raises(LeaseError):
+            await locks.acquire('scene', 'late', timeout=0.05)
+
+    asyncio.run(scenario())
+    assert order == ['w1', 'w2', 'w3']
+
+
+def test_exclusion_across_processes(tmp_path):
+    db = tmp_path / 'locks.db'
+    LeaseLockManager(db).try_acquire('garage', 'parent', ttl=60)
+    code = (
+        f"import sys; sys.path.insert(0, {ROOT!r})\n"
+        "from threads.lease_lock import LeaseLockManager\n"
+        f"print(LeaseLockManager({str(db)!r}).try_acquire('garage', 'child'))"
+    )
+    out = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+    assert out == 'None'
+
+
+def test_guard_persists_only_on_change(tmp_path, monkeypatch):
+    registry = tmp_path / 'reg.json'
+    registry.write_text('{"home": {"locked": true}}')
+    monkeypatch.setattr(timeline_guard, 'REGISTRY_FILE', registry)
+    # a stale flag without a live lease is reported unlocked, read-only
+    mtime = registry.stat().st_mtime_ns
+    assert timeline_guard.is_locked('home') is False
+    assert registry.stat().st_mtime_ns == mtime
+    # writers correct it
+    assert timeline_guard.unlock_thread('home', force=True)
+    assert '"locked": false' in registry.read_text()
+    mtime = registry.stat().st_mtime_ns
+    assert timeline_guard.unlock_thread('home', force=True)
+    assert registry.stat().st_mtime_ns == mtime
+    assert timeline_guard.lock_thread('home', owner='me')
+    assert not timeline_guard.lock_thread('home', owner='you')
+    assert not timeline_guard.unlock_thread('home', owner='you')
+    assert timeline_guard.unlock_thread('home', owner='you', force=True)
+    assert timeline_guard.lock_thread('missing') is False
+
+
+def test_default_owner_unlocks_from_another_thread(tmp_path, monkeypatch):
+    import threading
+
+    registry = tmp_path / 'reg.json'
+    registry.write_text('{"home": {"locked": false}}')
+    monkeypatch.setattr(timeline_guard, 'REGISTRY_FILE', registry)
+    assert timeline_guard.lock_thread('home')
+    released = []
+    worker = threading.Thread(target=lambda: released.append(timeline_guard.unlock_thread('home')))
+    worker.start()
+    worker.join()
+    assert released == [True] and not timeline_guard.is_locked('home')
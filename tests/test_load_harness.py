@@ -0,0 +1,58 @@
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+spec = importlib.util.spec_from_file_location('load_harness', os.path.join(ROOT, 'scripts', 'load_harness.py'))
+harness = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(harness)
+
+
+def test_load_traffic_rotates_endpoints(tmp_path):
+    path = tmp_path / 'traffic.jsonl'
+    lines = [
+        {'title': 'turn on the lights'},
+        {'body': 'show my budget'},
+        {'message': 'movie time'},
+        {'path': '/sterling/health', 'method': 'GET'},
+    ]
+    path.write_text('\n'.join(json.dumps(line) for line in lines))
+    traffic = harness.load_traffic(str(path))
+    assert [t[1] for t in traffic] == ['/ha-chat', '/sterling/route', '/sterling/scene', '/sterling/health']
+    assert traffic[0][2] == {'message': 'turn on the lights'}
+    assert traffic[3] == ('GET', '/sterling/health', None)
+
+
+def test_stubs_serve_and_inject_errors():
+    async def scenario():
+        cfg = harness.StubConfig(latency_ms=0, jitter_ms=0)
+        ha_runner, ha_url = await harness.start_site(harness.build_ha_app(cfg))
+        llm_runner, llm_url = await harness.start_site(harness.build_ollama_app(cfg))
+        try:
+            traffic = [('POST', '/api/services/scene/turn_on', {'entity_id': 'scene.movie'})]
+            report = await harness.drive(ha_url, traffic, rps=200, duration=0.05, concurrency=4)
+            async with harness.ClientSession() as session:
+                async with session.post(llm_url + '/api/generate', json={'prompt': 'hi', 'stream': False}) as resp:
+                    reply = await resp.json()
+                async with session.ws_connect(ha_url + '/api/websocket') as ws:
+                    assert (await ws.receive_json())['type'] == 'auth_required'
+                    await ws.send_json({'type': 'auth', 'access_token': 'x'})
+                    assert (await ws.receive_json())['type'] == 'auth_ok'
+                    await ws.send_json({'id': 1, 'type': 'get_states'})
+                    states = await ws.receive_json()
+            cfg.error_rate = 1.0
+            failing = await harness.drive(ha_url, traffic, rps=100, duration=0.02, concurrency=2)
+        finally:
+            await ha_runner.cleanup()
+            await llm_runner.cleanup()
+        return report, reply, states, failing, ha_runner.app[harness.CALLS]
+
+    report, reply, states, failing, calls = asyncio.run(scenario())
+    assert report['statuses'] == {'200': report['count']}
+    assert calls['scene.turn_on'] == report['count']
+    assert reply['response'] == 'stub reply to: hi'
+    assert states['success'] and len(states['result']) == len(harness.SCENES)
+    assert set(failing['statuses']) == {'500'}
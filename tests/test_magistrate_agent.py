@@ -4,16 +4,59 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from magistrate import review_scene
+from magistrate import magistrate_agent, review_scene
 
 
 def test_review_scene(tmp_path, monkeypatch):
     log = tmp_path / "log.json"
     log.write_text(json.dumps({"scene_id": "a"}))
     ledger = tmp_path / "ledger.yaml"
-    monkeypatch.setitem(review_scene.__globals__, "SCENE_LOG", log)
-    monkeypatch.setitem(review_scene.__globals__, "VERDICT_LEDGER", ledger)
+    monkeypatch.setattr(magistrate_agent, "SCENE_LOG", log)
+    monkeypatch.setattr(magistrate_agent, "VERDICT_LEDGER", ledger)
 
     verdict = review_scene("a")
     assert verdict["ruling"] == "UPHELD"
     assert ledger.exists()
+
+
+def test_review_scenes_batch(tmp_path, monkeypatch):
+    import yaml
+    from magistrate import record_reasoning, review_scenes
+
+    log = tmp_path / "log.json"
+    log.write_text(json.dumps([{"scene_id": "a"}, {"scene_id": "b"}], indent=2))
+    ledger = tmp_path / "ledger.yaml"
+    ledger.write_text("- scene_id: old\n  ruling: OVERRULED\n")
+    monkeypatch.setattr(magistrate_agent, "SCENE_LOG", log)
+    monkeypatch.setattr(magistrate_agent, "VERDICT_LEDGER", ledger)
+
+    verdicts = review_scenes(["a", "c", "b"])
+    assert [v["ruling"] for v in verdicts] == ["UPHELD", "NOT_FOUND", "UPHELD"]
+
+    record_reasoning({"scene_id": "c", "steps": ["x"]})
+    assert [e["scene_id"] for e in json.loads(log.read_text())] == ["a", "b", "c"]
+    assert review_scenes(["c"])[0]["ruling"] == "UPHELD"
+
+    rulings = yaml.safe_load(ledger.read_text())
+    assert [(r["scene_id"], r["ruling"]) for r in rulings] == [
+        ("old", "OVERRULED"), ("a", "UPHELD"), ("c", "NOT_FOUND"), ("b", "UPHELD"), ("c", "UPHELD"),
+    ]
+    assert all("timestamp" in r for r in rulings[1:])
+
+
+def test_scene_appended_by_another_writer_is_indexed(tmp_path, monkeypatch):
+    from magistrate import scene_index
+
+    log = tmp_path / "log.json"
+    index = scene_index.SceneIndex(log)
+    index.add({"scene_id": "a"})
+    real_append = scene_index.append_array
+
+    def racing_append(path, entries):
+        # another process appends after refresh() but before our append
+        real_append(path, [{"scene_id": "other"}])
+        return real_append(path, entries)
+
+    monkeypatch.setattr(scene_index, "append_array", racing_append)
+    index.add({"scene_id": "b"})
+    assert index.get_many(["a", "other", "b"]) == [{"scene_id": "a"}, {"scene_id": "other"}, {"scene_id": "b"}]
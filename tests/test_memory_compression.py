@@ -11,3 +11,8 @@ spec.loader.exec_module(memory)
 def test_compress_logs():
     result = memory.compress_logs(['start', 'middle', 'end'])
     assert result.startswith('start') and result.endswith('end')
+
+
+def test_compress_logs_counts_middle_by_tag():
+    result = memory.compress_logs(['start', 'scene:a', 'scene:b', 'phrase:x', 'end'])
+    assert result == 'start ... [3 more: scene x2, phrase x1] ... end'
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from addons.sterling_os import memory_engine, memory_index, memory_logger, persona_memory_store
+
+
+def _entry(topic, summary=''):
+    return {'timestamp': '2024-01-01T00:00:00', 'topic': topic, 'summary': summary}
+
+
+def test_search_ranks_and_prunes():
+    index = memory_index.TrigramIndex([
+        _entry('quarterly budget review', 'finance numbers'),
+        _entry('garage door schedule', 'close at night'),
+        _entry('budget forecast', 'annual plan'),
+    ])
+    results = index.search('quarterly budget review', k=2)
+    assert [e['topic'] for _, e in results] == ['quarterly budget review']
+    assert all(score >= 0.5 for score, _ in results)
+    assert index.search('zzqx', k=3) == []
+
+
+def test_cache_invalidated_on_store_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(persona_memory_store, 'MEMORY_DIR', tmp_path)
+    memory_index.invalidate()
+    store = persona_memory_store.get_store('professional')
+    store.append(_entry('board meeting agenda'))
+    first = memory_index.get_index('professional')
+    assert memory_index.get_index('professional') is first
+    # a write from another process shows up as a changed segment
+    with open(store.segments()[-1], 'a') as f:
+        f.write(json.dumps(_entry('vendor contract')) + '\n')
+    rebuilt = memory_index.get_index('professional')
+    assert rebuilt is not first and len(rebuilt) == 2
+
+
+def test_log_memory_entry_updates_cached_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(persona_memory_store, 'MEMORY_DIR', tmp_path)
+    memory_index.invalidate()
+    assert memory_engine.adaptive_memory_match('exec_summary pipeline', 'personal') == []
+    index = memory_index.get_index('personal')
+    memory_logger.log_memory_entry('exec_summary pipeline', 'all green', 'personal')
+    assert memory_index.get_index('personal') is index
+    refs = memory_engine.adaptive_memory_match('exec_summary pipeline', 'personal')
+    assert refs[0]['summary'] == 'all green'
+    memory_index.invalidate()
+
+
+def test_compaction_drops_cached_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(persona_memory_store, 'MEMORY_DIR', tmp_path)
+    store = persona_memory_store.PersonaMemoryStore('home', tmp_path, segment_size=2, max_segments=2)
+    monkeypatch.setattr(persona_memory_store, '_STORES', {(tmp_path, 'home'): store})
+    memory_index.invalidate()
+    memory_logger.log_memory_entry('garden watering', 'zone 1', 'home')
+    index = memory_index.get_index('home')
+    for i in range(5):
+        memory_logger.log_memory_entry(f'garden watering {i}', 'zone 2', 'home')
+    assert list(store.rollups())
+    rebuilt = memory_index.get_index('home')
+    assert rebuilt is not index
+    # folded raw entries are gone; the index holds exactly what the store does
+    assert len(rebuilt) == len(list(store.iter_entries()))
+    assert any(e.get('rollup') for _, e in rebuilt.search('garden watering', k=10, threshold=0.1))
+    memory_index.invalidate()
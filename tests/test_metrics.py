@@ -0,0 +1,81 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import metrics
+from json_store import JSONStore
+
+
+def test_counter_and_histogram_render():
+    registry = metrics.Registry()
+    hits = registry.counter('demo_total', 'Demo hits.', ['agent'])
+    latency = registry.histogram('demo_seconds', 'Demo latency.', buckets=[0.1, 1])
+    hits.inc(agent='finance')
+    hits.inc(2, agent='finance')
+    latency.observe(0.05)
+    latency.observe(0.1)
+    latency.observe(3)
+    text = registry.render()
+    assert '# TYPE demo_total counter' in text
+    assert 'demo_total{agent="finance"} 3.0' in text
+    assert 'demo_seconds_bucket{le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert 'demo_seconds_count 3' in text
+    with pytest.raises(ValueError):
+        hits.inc(agent='x', extra='y')
+    with pytest.raises(ValueError):
+        registry.gauge('demo_total', 'clash')
+
+
+def test_multiprocess_snapshots_merge(tmp_path, monkeypatch):
+    registry = metrics.Registry(str(tmp_path))
+    requests = registry.counter('req_total', 'Requests.')
+    workers = registry.gauge('busy', 'Busy workers.', mode='max')
+    requests.inc(4)
+    workers.set(2)
+    snapshot = (
+        '{"req_total": {"kind": "counter", "help": "Requests.", "labels": [], "samples": [[[], 6.0]]},'
+        ' "busy": {"kind": "gauge", "help": "Busy workers.", "labels": [], "mode": "max", "samples": [[[], 5.0]]}}'
+    )
+    # another live worker's flushed snapshot (the parent stands in for it)
+    (tmp_path / f'{os.getppid()}.json').write_text(snapshot)
+    # and one left behind by a worker that has exited
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    (tmp_path / f'{dead.pid}.json').write_text(snapshot)
+    text = registry.render()
+    assert 'req_total 10.0' in text
+    assert 'busy 5.0' in text
+    assert not (tmp_path / f'{dead.pid}.json').exists()
+    registry.flush()
+    assert (tmp_path / f'{os.getpid()}.json').exists()
+
+
+def test_json_store_write_is_timed(tmp_path):
+    store = JSONStore(tmp_path / 'timed.json')
+    before = metrics.REGISTRY.get('sterling_json_store_write_seconds').count(store='timed.json')
+    store.write({'a': 1})
+    assert metrics.REGISTRY.get('sterling_json_store_write_seconds').count(store='timed.json') == before + 1
+
+
+def test_metrics_endpoint_counts_routes():
+    spec = importlib.util.spec_from_file_location(
+        'addons.sterling_os.main', os.path.join(ROOT, 'addons', 'sterling_os', 'main.py')
+    )
+    main = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(main)
+    with main.app.test_client() as cl:
+        cl.get('/sterling/health')
+        res = cl.get('/metrics')
+    assert res.status_code == 200
+    assert res.content_type.startswith('text/plain')
+    body = res.get_data(as_text=True)
+    assert 'sterling_http_requests_total{method="GET",route="/sterling/health",status="200"}' in body
+    assert 'sterling_http_request_duration_seconds_bucket{method="GET",route="/sterling/health",le="+Inf"}' in body
@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from addons.sterling_os import persona_memory_store
+from addons.sterling_os.persona_memory_store import PersonaMemoryStore
+
+
+def _entry(i):
+    return {'timestamp': f'2024-01-01T00:00:{i:02d}', 'topic': f'topic {i % 3}', 'summary': f'summary {i}'}
+
+
+def test_append_rolls_segments_and_compacts(tmp_path):
+    store = PersonaMemoryStore('personal', tmp_path, segment_size=4, max_segments=2, hot_size=5)
+    for i in range(13):
+        store.append(_entry(i))
+    assert len(store.segments()) == 2
+    rollups = list(store.rollups())
+    assert sum(r['count'] for r in rollups) == 8
+    assert rollups[0]['start'] == _entry(0)['timestamp']
+    assert rollups[0]['top_topics'][0] == ['topic 0', 2]
+    raw = [e for e in store.iter_entries(include_rollups=False)]
+    assert [e['summary'] for e in raw] == [f'summary {i}' for i in range(8, 13)]
+    assert [e['summary'] for e in store.recent(2)] == ['summary 11', 'summary 12']
+
+
+def test_reopen_restores_hot_tail_and_active_segment(tmp_path):
+    store = PersonaMemoryStore('professional', tmp_path, segment_size=3)
+    for i in range(4):
+        store.append(_entry(i))
+    reopened = PersonaMemoryStore('professional', tmp_path, segment_size=3)
+    reopened.append(_entry(4))
+    assert len(reopened.segments()) == 2
+    assert [e['summary'] for e in reopened.recent()] == [f'summary {i}' for i in range(5)]
+
+
+def test_imports_legacy_json(tmp_path):
+    legacy = persona_memory_store.legacy_path('personal', tmp_path)
+    legacy.write_text(json.dumps([_entry(0), _entry(1)]))
+    store = PersonaMemoryStore('personal', tmp_path)
+    assert [e['summary'] for e in store.iter_entries()] == ['summary 0', 'summary 1']
@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from repair_agent.history import (
+    InteractionHistory,
+    estimate_tokens,
+    failing_test,
+    summarize_test_output,
+)
+
+PYTEST_OUTPUT = "\n".join(
+    ["test_calculator.py F" + "." * 40]
+    + [f"    noise line {i} " + "x" * 60 for i in range(200)]
+    + [
+        "E       assert -1 == 3",
+        "test_calculator.py:5: AssertionError",
+        "FAILED test_calculator.py::test_add - assert -1 == 3",
+        "1 failed, 40 passed in 0.12s",
+    ]
+)
+
+
+def test_large_test_output_is_summarised_and_failing_test_pinned():
+    history = InteractionHistory(tool_output_tokens=100)
+    record = history.add_tool_output("run_tests", PYTEST_OUTPUT)
+
+    assert failing_test(PYTEST_OUTPUT) == "test_calculator.py::test_add"
+    assert history.pinned["failing_test"] == "test_calculator.py::test_add"
+    assert "noise line" not in record.text
+    assert "E       assert -1 == 3" in record.text
+    assert "1 failed, 40 passed" in record.text
+    assert estimate_tokens(summarize_test_output(PYTEST_OUTPUT, 100)) <= 110
+
+
+def test_window_stays_within_budget_and_keeps_pins():
+    history = InteractionHistory(budget=200, tool_output_tokens=50)
+    history.pin("hypothesis", "add() subtracts")
+    for i in range(100):
+        history.add_thought(f"step {i} " + "y" * 80)
+        history.add_tool_output("read_file_range", "z" * 1000)
+
+    rendered = history.render()
+    assert estimate_tokens(rendered) <= 200 + 20  # budget plus the omission marker
+    assert rendered.startswith("Current hypothesis: add() subtracts")
+    assert "earlier interactions omitted" in rendered
+    assert "step 99" in rendered and "step 0 " not in rendered
+    assert len(history.records) == 200
+
+    history.pin("hypothesis", None)
+    assert "Current hypothesis" not in history.render()
+
+
+def test_prompt_prefix_is_cached():
+    import pytest
+
+    pytest.importorskip("openai")
+    from repair_agent import main
+
+    main.prompt_prefix.cache_clear()
+    history = InteractionHistory()
+    history.add_system("Initial state.")
+    first = main.build_prompt("task", history)
+    second = main.build_prompt("task", history)
+    assert first == second
+    assert "System: Initial state." in first
+    assert main.prompt_prefix.cache_info().hits == 1
+
+
+def test_passing_run_clears_failing_test_pin():
+    history = InteractionHistory()
+    history.add_tool_output("run_tests", "FAILED tests/test_calc.py::test_add - assert 1 == 2")
+    assert history.render().startswith("Failing test: tests/test_calc.py::test_add")
+    history.add_tool_output("run_tests", "5 passed in 0.10s")
+    assert "failing_test" not in history.pinned
+    assert "Failing test" not in history.render()
@@ -17,9 +17,22 @@ spec.loader.exec_module(git_diff_analyzer)
 def test_update_runtime_config(tmp_path, monkeypatch):
     runtime_file = tmp_path / 'runtime_memory.json'
     monkeypatch.setattr(runtime_engine.runtime_memory.RUNTIME_STORE, 'path', runtime_file)
-    monkeypatch.setattr(git_diff_analyzer, 'get_last_commit_diff', lambda: {'modified': ['app.py']})
-    monkeypatch.setattr(runtime_engine, 'get_last_commit_diff', git_diff_analyzer.get_last_commit_diff)
+    monkeypatch.setattr(git_diff_analyzer, 'get_changed_files', lambda: {'modified': ['app.py']})
+    monkeypatch.setattr(runtime_engine, 'get_changed_files', git_diff_analyzer.get_changed_files)
     runtime_engine.update_runtime_config()
     data = json.loads(runtime_file.read_text())
     assert data['monitor_frequency_sec'] == 10
 
+
+
+def test_safe_write_memory_keeps_restorable_versions(tmp_path, monkeypatch):
+    runtime_file = tmp_path / 'runtime_memory.json'
+    runtime_file.write_text(json.dumps({'monitor_frequency_sec': 30}))
+    monkeypatch.setattr(runtime_engine.runtime_memory.RUNTIME_STORE, 'path', runtime_file)
+    runtime_engine.safe_write_memory({'monitor_frequency_sec': 10})
+    runtime_engine.safe_write_memory({'monitor_frequency_sec': 5})
+    import self_repair
+    assert self_repair.restore_file(runtime_file, version=1)
+    assert json.loads(runtime_file.read_text()) == {'monitor_frequency_sec': 30}
+    assert self_repair.restore_file(runtime_file, version=-2)
+    assert json.loads(runtime_file.read_text()) == {'monitor_frequency_sec': 10}
@@ -28,3 +28,70 @@ def test_update_delta(tmp_path, monkeypatch):
     assert delta['lights']['current'] == 'on'
     assert delta['lights']['expected'] == 'off'
     assert delta_log.exists()
+
+
+def test_nested_incremental_feed(tmp_path, monkeypatch):
+    current = tmp_path / 'current.json'
+    expected = tmp_path / 'expected.json'
+    feed = tmp_path / 'delta_log.jsonl'
+    monkeypatch.setattr(scene_delta_tracker, 'CURRENT_STATE_FILE', current)
+    monkeypatch.setattr(scene_delta_tracker, 'EXPECTED_MODEL_FILE', expected)
+    monkeypatch.setattr(scene_delta_tracker, 'DELTA_LOG_FILE', feed)
+
+    expected.write_text(json.dumps({
+        'light.kitchen': {'state': 'on', 'attributes': {'brightness': 200, 'color': 'warm'}},
+        'lock.door': {'state': 'locked'},
+    }))
+    current.write_text(json.dumps({
+        'light.kitchen': {'state': 'on', 'attributes': {'brightness': 120, 'color': 'warm', 'extra': 1}},
+        'lock.door': {'state': 'locked'},
+    }))
+    delta = scene_delta_tracker.update_delta()
+    assert delta == {'light.kitchen.attributes.brightness': {'current': 120, 'expected': 200}}
+
+    # nothing changed on disk: no work and no new feed records
+    assert scene_delta_tracker.update_delta() == {}
+    records, offset = scene_delta_tracker.read_feed()
+    assert [r['seq'] for r in records] == [1]
+
+    current.write_text(json.dumps({
+        'light.kitchen': {'state': 'on', 'attributes': {'brightness': 200, 'color': 'warm'}},
+        'lock.door': {'state': 'unlocked'},
+    }))
+    delta = scene_delta_tracker.update_delta()
+    assert delta == {'lock.door.state': {'current': 'unlocked', 'expected': 'locked'}}
+    assert scene_delta_tracker.current_drift() == delta
+
+    new, offset = scene_delta_tracker.read_feed(offset)
+    assert {(r['key'], r.get('resolved', False)) for r in new} == {
+        ('light.kitchen.attributes.brightness', True),
+        ('lock.door.state', False),
+    }
+    assert scene_delta_tracker.read_feed(offset) == ([], offset)
+
+
+def test_suggestions_follow_feed(tmp_path, monkeypatch):
+    spec_s = importlib.util.spec_from_file_location(
+        'sterling_suggestions',
+        os.path.join(os.path.dirname(__file__), '..', 'addons', 'sterling_os', 'sterling_suggestions.py')
+    )
+    sterling_suggestions = importlib.util.module_from_spec(spec_s)
+    spec_s.loader.exec_module(sterling_suggestions)
+
+    current = tmp_path / 'current.json'
+    expected = tmp_path / 'expected.json'
+    monkeypatch.setattr(scene_delta_tracker, 'CURRENT_STATE_FILE', current)
+    monkeypatch.setattr(scene_delta_tracker, 'EXPECTED_MODEL_FILE', expected)
+    monkeypatch.setattr(scene_delta_tracker, 'DELTA_LOG_FILE', tmp_path / 'feed.jsonl')
+    monkeypatch.setattr(sterling_suggestions, 'scene_delta_tracker', scene_delta_tracker)
+
+    expected.write_text(json.dumps({'fan': {'speed': 'low'}}))
+    current.write_text(json.dumps({'fan': {'speed': 'high'}}))
+    scene_delta_tracker.update_delta()
+    suggestions, offset = sterling_suggestions.suggest_from_feed()
+    assert suggestions == ['Adjust fan.speed from high to low?']
+    assert sterling_suggestions.suggest_from_feed(offset) == ([], offset)
+
+    assert sterling_suggestions.suggest_from_deltas([{'lights': {'current': 'on', 'expected': 'off'}}]) == [
+        'Adjust lights from on to off?'
+    ]
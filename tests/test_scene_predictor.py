@@ -0,0 +1,99 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from syndication.scene_predictor import ScenePredictor
+
+spec = importlib.util.spec_from_file_location('benchmark_prediction', os.path.join(ROOT, 'scripts', 'benchmark_prediction.py'))
+bench = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench)
+
+
+def _events(*pairs):
+    return [{'scene': scene, 'timestamp': f'2025-01-06T{ts}:00+00:00'} for scene, ts in pairs]
+
+
+def test_top_k_tracks_counts():
+    p = ScenePredictor()
+    p.train(_events(('a', '07:00'), ('b', '07:01'), ('a', '07:02'), ('c', '07:03'),
+                    ('a', '07:04'), ('c', '07:05'), ('a', '07:06'), ('d', '07:07')))
+    assert [s for s, _ in p.predict(2, scene='a')] == ['c', 'b']
+    assert p.predict(1, scene='a')[0][1] == 0.5
+    assert p.predict(3, scene='unknown') == []
+    # defaults to the last observed scene
+    assert p.predict(3) == []
+    p.observe('a', '2025-01-06T07:08:00+00:00')
+    assert p.predict(1)[0][0] == 'c'
+
+
+def test_session_gap_breaks_chains():
+    p = ScenePredictor(session_gap=600)
+    p.train(_events(('a', '07:00'), ('b', '09:00')))
+    assert p.predict(3, scene='a') == []
+
+
+def test_hour_condition_backs_off():
+    p = ScenePredictor('hour', min_support=2)
+    p.train(_events(('door', '07:00'), ('leave', '07:01'), ('door', '07:30'), ('leave', '07:31'),
+                    ('door', '18:00'), ('lights', '18:01'), ('door', '18:30'), ('lights', '18:31'),
+                    ('door', '18:50'), ('lights', '18:51')))
+    assert p.predict(1, scene='door', when='2025-01-07T07:10:00+00:00')[0][0] == 'leave'
+    assert p.predict(1, scene='door', when='2025-01-07T18:10:00+00:00')[0][0] == 'lights'
+    # no support at 12:00: fall back to the unconditioned row
+    assert p.predict(1, scene='door', when='2025-01-07T12:00:00+00:00')[0][0] == 'lights'
+
+
+def test_persistence_and_trace_sync(tmp_path):
+    trace = tmp_path / 'trace.json'
+    trace.write_text(json.dumps(_events(('a', '07:00'), ('b', '07:01'))))
+    p = ScenePredictor()
+    assert p.sync_trace(trace) == 2
+    assert p.sync_trace(trace) == 0
+    trace.write_text(json.dumps({'executions': _events(('a', '07:00'), ('b', '07:01'), ('a', '07:02'), ('c', '07:03'))}))
+    assert p.sync_trace(trace) == 2
+
+    model = tmp_path / 'model.json'
+    p.save(model)
+    q = ScenePredictor.load(model)
+    assert q.predict(2, scene='a') == p.predict(2, scene='a')
+    assert q.cursor == 4 and q.last[0] == 'c'
+
+
+def test_replay_benchmark():
+    events = bench.synthesize_trace(10)
+    result = bench.replay(events, ScenePredictor(), 3)
+    assert result['events'] == len(events)
+    assert 0 < result['hit_at_1'] <= result['hit_at_3'] <= 1
+
+
+def test_trace_followed_by_offset_and_model_saved(tmp_path, monkeypatch):
+    from syndication import scene_predictor
+
+    trace = tmp_path / 'trace.json'
+    events = _events(('a', '07:00'), ('b', '07:01'))
+    trace.write_text(json.dumps(events, indent=2))
+    model = tmp_path / 'model.json'
+    p = ScenePredictor.load(model)
+    assert p.sync_trace(trace) == 2
+    assert json.loads(model.read_text())['cursor'] == 2
+
+    # an append rewrites the array but keeps its prefix: only the tail is parsed
+    events += _events(('a', '07:02'), ('c', '07:03'))
+    trace.write_text(json.dumps(events, indent=2))
+    decoded = []
+    real = scene_predictor._DECODER.raw_decode
+    monkeypatch.setattr(scene_predictor._DECODER, 'raw_decode', lambda s, i: decoded.append(i) or real(s, i))
+    monkeypatch.setattr(p, '_read_rewritten', lambda path: pytest.fail('full reparse'))
+    assert p.sync_trace(trace) == 2
+    assert len(decoded) == 2
+
+    # a new process resumes from the saved model without replaying the trace
+    q = ScenePredictor.load(model)
+    assert q.cursor == 4 and q.sync_trace(trace) == 0
+    assert q.predict(2, scene='a') == p.predict(2, scene='a')
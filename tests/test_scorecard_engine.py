@@ -0,0 +1,49 @@
+import importlib.util
+import json
+import os
+
+spec = importlib.util.spec_from_file_location(
+    'scorecard_engine',
+    os.path.join(os.path.dirname(__file__), '..', 'addons', 'sterling_os', 'scorecard_engine.py')
+)
+scorecard_engine = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scorecard_engine)
+
+
+def test_bit_ring_wraps_and_counts_failures():
+    ring = scorecard_engine.BitRing(4)
+    for outcome in [False, False, True, True, True, False]:
+        ring.push(outcome)
+    assert ring.is_full()
+    assert ring.to_list() == [True, True, True, False]
+    assert ring.failures() == 1
+
+
+def test_class_windows(tmp_path):
+    engine = scorecard_engine.ScorecardEngine(
+        default_window=10,
+        class_windows={'executive': 3},
+        classify=lambda a: 'executive' if a == 'codex' else None,
+    )
+    for _ in range(3):
+        engine.record('codex', False)
+        engine.record('gemini', False)
+    assert engine.is_full('codex') and engine.failures('codex') == 3
+    assert not engine.is_full('gemini')
+    engine.set_class_window('executive', 2)
+    assert engine.history('codex') == [False, False]
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = tmp_path / 'card.json'
+    engine = scorecard_engine.ScorecardEngine(default_window=3, snapshot_interval=3600)
+    engine.ensure_loaded(path)
+    engine.record('a', True)
+    engine.record('a', False)
+    assert engine.maybe_snapshot(path) is False
+    assert not path.exists()
+    engine.flush(path)
+    assert json.loads(path.read_text()) == {'a': [True, False]}
+    restored = scorecard_engine.ScorecardEngine(default_window=3)
+    restored.load(path)
+    assert restored.history('a') == [True, False]
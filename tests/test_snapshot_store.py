@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import self_repair
+import snapshot_store
+from snapshot_store import SnapshotStore
+
+
+def _chunk_count(root):
+    return sum(1 for _ in (root / 'chunks').glob('*/*'))
+
+
+def test_record_dedupes_unchanged_chunks(tmp_path):
+    store = SnapshotStore(tmp_path / 'snap')
+    target = tmp_path / 'runtime_memory.json'
+    doc = {'mode': 'normal', 'agent_trace': [{'n': i} for i in range(500)]}
+    store.record(target, doc)
+    before = _chunk_count(store.root)
+    doc['agent_trace'] = doc['agent_trace'][1:] + [{'n': 500}]
+    store.record(target, doc)
+    # trimming the head and appending only rewrites the edge chunks
+    assert _chunk_count(store.root) - before <= 3
+    assert store.load(target, 1)['agent_trace'][0] == {'n': 0}
+    assert store.load(target) == doc
+    assert [v['version'] for v in store.versions(target)] == [1, 2]
+
+
+def test_prune_collects_unreferenced_chunks(tmp_path):
+    store = SnapshotStore(tmp_path / 'snap', max_versions=2)
+    target = tmp_path / 'doc.json'
+    for i in range(2 + snapshot_store.PRUNE_BATCH + 1):
+        store.record(target, {'value': i})
+    assert len(store.versions(target)) == 2
+    assert _chunk_count(store.root) == 2
+    assert store.load(target, -2) == {'value': 2 + snapshot_store.PRUNE_BATCH - 1}
+
+
+def test_restore_file_uses_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(self_repair, 'BACKUP_DIR', tmp_path / 'backups')
+    target = tmp_path / 'runtime_memory.json'
+    store = snapshot_store.for_target(target)
+    store.record(target, {'version': 'one'})
+    store.record(target, {'version': 'two'})
+    target.write_text('corrupted')
+    assert self_repair.restore_file(target)
+    assert json.loads(target.read_text()) == {'version': 'two'}
+    assert self_repair.restore_file(target, version=1)
+    assert json.loads(target.read_text()) == {'version': 'one'}
+    assert not self_repair.restore_file(tmp_path / 'missing.json')
+
+
+def test_concurrent_writer_gets_the_next_version(tmp_path, monkeypatch):
+    store = SnapshotStore(tmp_path / 'snap')
+    target = tmp_path / 'runtime_memory.json'
+    assert store.record(target, {'v': 1}) == 1
+    stale = store._manifests(target)
+    # another writer records version 2 after we listed the manifests
+    assert store.record(target, {'v': 2}) == 2
+    monkeypatch.setattr(SnapshotStore, '_manifests', lambda self, t: stale)
+    assert store.record(target, {'v': 3}) == 3
+    monkeypatch.undo()
+    assert [store.load(target, v) for v in (1, 2, 3)] == [{'v': 1}, {'v': 2}, {'v': 3}]
+    assert sorted(p.name for p in store._manifest_dir(target).iterdir()) == [
+        '00000001.json', '00000002.json', '00000003.json',
+    ]
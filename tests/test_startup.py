@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import startup
+
+
+def test_hooks_run_once_per_process(monkeypatch):
+    calls = []
+    monkeypatch.setattr(startup, '_HOOKS', [])
+    startup.reset()
+    hook = startup.on_startup(lambda: calls.append(os.getpid()))
+    startup.on_startup(hook)
+    startup.run_startup_hooks()
+    startup.run_startup_hooks()
+    assert calls == [os.getpid()]
+    # a forked worker has a different pid and runs the hooks again
+    monkeypatch.setattr(startup, '_STARTED_PID', -1)
+    startup.run_startup_hooks()
+    assert len(calls) == 2
+    startup.reset()
+
+
+def test_reentrant_hook_does_not_deadlock(monkeypatch):
+    calls = []
+    monkeypatch.setattr(startup, '_HOOKS', [])
+    startup.reset()
+
+    @startup.on_startup
+    def nested():
+        calls.append('nested')
+        startup.run_startup_hooks()
+
+    startup.run_startup_hooks()
+    assert calls == ['nested']
+    startup.reset()
+
+
+def test_gunicorn_config_runs_hooks_at_worker_boot(monkeypatch):
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', os.path.join(ROOT, 'gunicorn.conf.py'))
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+    calls = []
+    monkeypatch.setattr(startup, '_HOOKS', [])
+    startup.reset()
+    startup.on_startup(lambda: calls.append('boot'))
+    conf.post_worker_init(worker=None)
+    assert calls == ['boot']
+    startup.reset()
+
+
+def test_imports_are_side_effect_free(tmp_path):
+    code = (
+        "import sys, threading; sys.path.insert(0, %r)\n"
+        "import uptime_tracker, app, addons.sterling_os as pkg\n"
+        "loaded = [m for m in sys.modules if m.startswith('addons.sterling_os.')]\n"
+        "assert uptime_tracker._state['time_started'] is None\n"
+        "assert threading.active_count() == 1, threading.enumerate()\n"
+        "assert 'addons.sterling_os.scene_executor' not in loaded, loaded\n"
+        "assert pkg.scorecard_engine.DEFAULT_WINDOW == 10\n"
+    ) % ROOT
+    subprocess.run([sys.executable, '-c', code], cwd=tmp_path, check=True)
+    assert list(tmp_path.iterdir()) == []
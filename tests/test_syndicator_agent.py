@@ -30,3 +30,104 @@ def test_select_model(tmp_path, monkeypatch):
     monkeypatch.setattr(mod, 'ROUTER_FILE', router)
     monkeypatch.setattr(mod, 'TRUST_FILE', trust)
     assert mod.select_model() == 'm1'
+
+
+def test_select_model_uses_live_grades(tmp_path, monkeypatch):
+    mod = load_module()
+    router = tmp_path / 'router.yaml'
+    router.write_text('route_policies:\n  priority: [m1, m2, m3]\ncost_threshold:\n  max_cost: 0.0')
+    trust = tmp_path / 'trust.json'
+    trust.write_text(json.dumps({m: {'trust': 90, 'cost': 0.0} for m in ('m1', 'm2', 'm3')}))
+    monkeypatch.setattr(mod, 'ROUTER_FILE', router)
+    monkeypatch.setattr(mod, 'TRUST_FILE', trust)
+    monkeypatch.setattr(mod.concord_agent, 'GRADEBOOK_FILE', tmp_path / 'grades.json')
+    monkeypatch.setattr(mod, 'MIN_GRADES', 2)
+
+    assert mod.select_model() == 'm1'
+    mod.concord_agent.record_grade('p1', {'m1': 60, 'm2': 90, 'm3': 95})
+    # one grade is not enough to override the router priority
+    assert mod.select_model() == 'm1'
+    mod.concord_agent.record_grade('p2', {'m1': 60, 'm2': 90})
+    assert mod.select_model() == 'm2'
+
+
+def test_graded_loser_does_not_override_priority(tmp_path, monkeypatch):
+    mod = load_module()
+    router = tmp_path / 'router.yaml'
+    router.write_text('route_policies:\n  priority: [m1, m2]\ncost_threshold:\n  max_cost: 0.0')
+    trust = tmp_path / 'trust.json'
+    trust.write_text(json.dumps({m: {'trust': 90, 'cost': 0.0} for m in ('m1', 'm2')}))
+    monkeypatch.setattr(mod, 'ROUTER_FILE', router)
+    monkeypatch.setattr(mod, 'TRUST_FILE', trust)
+    monkeypatch.setattr(mod.concord_agent, 'GRADEBOOK_FILE', tmp_path / 'grades.json')
+
+    # m2 is graded but always loses to a model outside the router
+    for i in range(5):
+        mod.concord_agent.record_grade(f'p{i}', {'m2': 10, 'outsider': 90})
+    assert mod.live_grades()['m2']['win_rate'] == 0.0
+    assert mod.select_model() == 'm1'
+
+
+def test_predict_next_prefers_learned_transitions(tmp_path, monkeypatch):
+    mod = load_module()
+    from syndication.scene_predictor import ScenePredictor
+
+    trace = tmp_path / 'trace.json'
+    trace.write_text(json.dumps([
+        {'scene': 'wake', 'timestamp': '2025-01-06T07:00:00'},
+        {'scene': 'coffee', 'timestamp': '2025-01-06T07:01:00'},
+        {'scene': 'wake', 'timestamp': '2025-01-07T07:00:00'},
+    ]))
+    predictor = ScenePredictor()
+    monkeypatch.setattr(mod, 'get_predictor', lambda: predictor)
+    monkeypatch.setattr('syndication.scene_predictor.TRACE_FILE', trace)
+    assert mod.predict_next() == 'coffee'
+    assert mod.predict_top(3) == ['coffee']
+
+
+def test_policy_compiled_once_and_reloaded_on_change(tmp_path, monkeypatch):
+    mod = load_module()
+    from syndication import model_policy
+
+    router = tmp_path / 'router.yaml'
+    router.write_text('route_policies:\n  priority: [paid, free, cheap, shaky]\ncost_threshold:\n  max_cost: 0.0')
+    trust = tmp_path / 'trust.json'
+    trust.write_text(json.dumps({
+        'paid': {'trust': 99, 'cost': 0.06},
+        'free': {'trust': 90, 'cost': 0.0},
+        'cheap': {'trust': 95, 'cost': 0.01},
+        'shaky': {'trust': 50, 'cost': 0.0},
+    }))
+    monkeypatch.setattr(mod, 'ROUTER_FILE', router)
+    monkeypatch.setattr(mod, 'TRUST_FILE', trust)
+    monkeypatch.setattr(mod, 'live_grades', lambda: {})
+    parses = []
+    real_load = model_policy.yaml.safe_load
+    monkeypatch.setattr(model_policy.yaml, 'safe_load', lambda text: parses.append(1) or real_load(text))
+
+    assert mod.select_model() == 'free'
+    assert mod.select_models([
+        None,
+        {'max_cost': 0.05},
+        {'max_cost': 1.0},
+        {'max_cost': 1.0, 'exclude': ['paid', 'free']},
+        model_policy.SelectionContext(max_cost=-1),
+    ]) == ['free', 'free', 'paid', 'cheap', None]
+    assert mod.routing_policy().eligible(0.01) == ('free', 'cheap')
+    assert len(parses) == 1
+
+    trust.write_text(json.dumps({'free': {'trust': 90, 'cost': 0.0, 'allowed': False}}))
+    assert mod.select_model() is None
+    assert len(parses) == 2
+
+
+def test_model_policy_select_with_ranker():
+    from syndication.model_policy import ModelPolicy, SelectionContext
+
+    policy = ModelPolicy(
+        {'route_policies': {'priority': ['a', 'b', 'c']}, 'cost_threshold': {'max_cost': 1}},
+        {m: {'trust': 90, 'cost': 0} for m in 'abc'},
+    )
+    assert policy.select() == 'a'
+    assert policy.select(SelectionContext(exclude=frozenset({'a'}))) == 'b'
+    assert policy.select_many([None, SelectionContext(exclude=frozenset('abc'))], rank=lambda c: c[-1]) == ['c', None]
@@ -0,0 +1,166 @@
+import os
+import sys
+import threading
+import time
+import types
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import pytest
+
+from threads import predictive_scheduler, timeline_guard
+from threads.predictive_scheduler import CronSchedule, ThreadScheduler
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    path = tmp_path / 'reg.json'
+    path.write_text(
+        '{"finance": {"locked": false, "every": 60, "deadline": 5},'
+        ' "home": {"locked": false, "cron": "*/15 7-9 * * 1-5"},'
+        ' "manual": {"locked": false}}'
+    )
+    monkeypatch.setattr(predictive_scheduler, 'REGISTRY_FILE', path)
+    monkeypatch.setattr(timeline_guard, 'REGISTRY_FILE', path)
+    return path
+
+
+def test_cron_next_after():
+    cron = CronSchedule('*/15 7-9 * * 1-5')
+    # Saturday 2025-07-12 10:00 -> Monday 07:00
+    assert cron.next_after(_ts(2025, 7, 12, 10, 0)) == _ts(2025, 7, 14, 7, 0)
+    assert cron.next_after(_ts(2025, 7, 14, 7, 0)) == _ts(2025, 7, 14, 7, 15)
+    assert CronSchedule('0 0 29 2 *').next_after(_ts(2025, 3, 1)) == _ts(2028, 2, 29)
+    # day-of-month and weekday restrictions are OR'ed
+    assert CronSchedule('0 12 1 * 0').next_after(_ts(2025, 7, 2)) == _ts(2025, 7, 6, 12)
+    with pytest.raises(ValueError):
+        CronSchedule('61 * * * *')
+
+
+def test_runs_due_threads_and_rolls_back(registry, monkeypatch):
+    rolled = []
+    monkeypatch.setattr(predictive_scheduler.rollback_engine, 'rollback_thread', rolled.append)
+    now = [_ts(2025, 7, 14, 6, 59)]
+    ran = []
+
+    def runner(name):
+        ran.append(name)
+        if name == 'home':
+            raise RuntimeError('scene failed')
+
+    sched = ThreadScheduler(runner, max_workers=2, clock=lambda: now[0])
+    assert sched.reload() == 2
+    for f in sched.run_pending():
+        f.result()
+    assert ran == ['finance']
+    now[0] = _ts(2025, 7, 14, 7, 0)
+    for f in sched.run_pending():
+        f.result()
+    assert sorted(ran) == ['finance', 'finance', 'home']
+    assert rolled == ['home']
+    assert sched.jobs['home'].last_status == 'failed'
+    assert sched.jobs['home'].next_run == _ts(2025, 7, 14, 7, 15)
+    assert sched.jobs['finance'].avg_duration is not None
+    assert 'avg_duration_ms' in registry.read_text()
+    assert not timeline_guard.is_locked('finance')
+
+
+def test_locked_and_missed_runs_are_skipped(registry):
+    now = [1000.0]
+    ran = []
+    sched = ThreadScheduler(ran.append, clock=lambda: now[0])
+    sched.add('finance', every=60, deadline=5)
+    timeline_guard.lock_thread('finance', owner='someone-else')
+    for f in sched.run_pending():
+        f.result()
+    assert ran == [] and sched.jobs['finance'].last_status == 'locked'
+    timeline_guard.unlock_thread('finance', force=True)
+    # two intervals later the slot at 1060 is past its deadline
+    now[0] = 1130.0
+    sched.run_pending()
+    assert sched.jobs['finance'].last_status == 'missed'
+    assert sched.jobs['finance'].next_run == 1180.0
+
+
+def test_daemon_fires_without_polling(registry):
+    fired = threading.Event()
+    sched = ThreadScheduler(lambda name: fired.set())
+    sched.start()
+    try:
+        sched.add('manual', every=3600, start=time.time() + 0.05)
+        assert fired.wait(2)
+    finally:
+        sched.stop()
+
+
+def test_rejects_non_positive_interval(registry):
+    sched = ThreadScheduler(lambda name: None)
+    with pytest.raises(ValueError):
+        sched.add('finance', every=0)
+    registry.write_text('{"bad": {"every": -5}, "finance": {"every": 60}}')
+    assert sched.reload() == 1
+    assert list(sched.jobs) == ['finance']
+
+
+def test_default_runner_dispatches_registry_target(registry, monkeypatch):
+    calls = []
+    monkeypatch.setattr(predictive_scheduler, 'load_registry', lambda: {
+        'sweep': {'every': 60, 'target': 'sweep_jobs:run', 'args': {'obj': [1]}},
+        'idle': {'every': 60},
+    })
+    target = types.SimpleNamespace(run=lambda obj: calls.append(obj) or 'ok')
+    monkeypatch.setitem(sys.modules, 'sweep_jobs', target)
+    assert predictive_scheduler.dispatch_thread('sweep') == 'ok'
+    assert calls == [[1]]
+    with pytest.raises(LookupError):
+        predictive_scheduler.dispatch_thread('idle')
+    assert ThreadScheduler().runner is predictive_scheduler.dispatch_thread
+
+
+def test_start_scheduler_is_process_wide(registry, monkeypatch):
+    monkeypatch.setattr(predictive_scheduler, '_SCHEDULER', None)
+    sched = predictive_scheduler.start_scheduler()
+    try:
+        assert predictive_scheduler.start_scheduler() is sched
+        assert sorted(sched.jobs) == ['finance', 'home']
+        assert sched._dispatcher.is_alive()
+    finally:
+        sched.stop()
+
+
+def test_slot_runs_once_across_schedulers(registry):
+    ran = []
+    first = ThreadScheduler(lambda name: ran.append('first'), clock=lambda: 1000.0, owner='w1')
+    second = ThreadScheduler(lambda name: ran.append('second'), clock=lambda: 1010.0, owner='w2')
+    first.add('finance', every=60)
+    second.add('finance', every=60)
+    for sched in (first, second):
+        for f in sched.run_pending():
+            f.result()
+    # both started inside interval 16 (960-1020), so only the first runs it
+    assert ran == ['first']
+    assert second.jobs['finance'].last_status == 'claimed'
+    for f in second.run_pending(1070.0):
+        f.result()
+    assert ran == ['first', 'second']
+
+
+def test_lease_renewed_during_long_run(registry, monkeypatch):
+    monkeypatch.setattr(predictive_scheduler, 'MIN_LEASE_TTL', 0.3)
+    renewed = []
+    real_renew = timeline_guard.renew_thread
+    monkeypatch.setattr(
+        timeline_guard, 'renew_thread',
+        lambda name, owner=None, ttl=0: renewed.append(name) or real_renew(name, owner, ttl),
+    )
+    sched = ThreadScheduler(lambda name: time.sleep(0.5), clock=lambda: 1000.0)
+    sched.add('finance', every=60)
+    for f in sched.run_pending():
+        assert f.result() == 'ok'
+    assert renewed and set(renewed) == {'finance'}
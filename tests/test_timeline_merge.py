@@ -0,0 +1,41 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omni import timeline_merge
+from omni.timeline_orchestrator import fuse_timelines
+
+
+def _iso(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def test_merge_mixed_timestamp_types_lazily():
+    ha = [{'src': 'ha', 'timestamp': 10}, {'src': 'ha', 'timestamp': 40_000}]
+    scenes = [{'src': 'scene', 'timestamp': _iso(20)}, {'src': 'scene', 'timestamp': '1970-01-01T00:00:50Z'}]
+    agents = ({'src': 'agent', 'timestamp': ms} for ms in (30_000_000_000_000, 45_000_000_000_000))
+    merged = timeline_merge.merge(ha, scenes, agents)
+    assert next(merged)['src'] == 'ha'
+    rest = [(e['src'], timeline_merge.event_time(e)) for e in merged]
+    assert [t for _, t in rest] == sorted(t for _, t in rest)
+    assert rest[-1][0] == 'agent'
+
+
+def test_tail_and_head_are_stable():
+    events = [{'n': i, 'timestamp': ts} for i, ts in enumerate([5, 1, 5, 3, 5])]
+    assert [e['n'] for e in timeline_merge.tail(events, 2)] == [2, 4]
+    assert [e['n'] for e in timeline_merge.tail(events, 10)] == [1, 3, 0, 2, 4]
+    assert [e['n'] for e in timeline_merge.head(events, 2)] == [1, 3]
+    assert timeline_merge.tail(events, 0) == []
+
+
+def test_latest_across_sources_and_fuse_unsorted():
+    a = [{'timestamp': t} for t in (1, 4, 7)]
+    b = [{'timestamp': t} for t in (2, 5, 8)]
+    assert [e['timestamp'] for e in timeline_merge.latest(a, b, n=3)] == [5, 7, 8]
+    unsorted = [{'timestamp': 9}, {'timestamp': 3}, {'no_ts': True}]
+    fused = fuse_timelines(a, unsorted, 'not a list')
+    assert fused[0] == {'no_ts': True}
+    assert [e['timestamp'] for e in fused[1:]] == [1, 3, 4, 7, 9]
@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from addons.sterling_os import memory_manager, timeline_orchestrator, timeline_rollups
+
+
+NOW = datetime(2025, 7, 20, 12, 30, tzinfo=timezone.utc)
+
+
+def _events():
+    return [
+        {'timestamp': (NOW - timedelta(days=3)).isoformat(), 'event': 'phrase:lights on|intent:home'},
+        {'timestamp': (NOW - timedelta(days=3)).isoformat(), 'event': 'scene:evening'},
+        {'timestamp': (NOW - timedelta(minutes=5)).isoformat(), 'event': 'phrase:lights on'},
+        {'timestamp': (NOW - timedelta(minutes=4)).isoformat(), 'event': 'scene_error:evening'},
+        {'timestamp': (NOW - timedelta(minutes=3)).isoformat(), 'action': 'reflex_recovery', 'result': 'success'},
+    ]
+
+
+def test_fold_is_incremental_and_expires_fine_rows(tmp_path):
+    rollups = timeline_rollups.TimelineRollups(tmp_path / 'rollups.json')
+    events = _events()
+    assert rollups.fold(events[:2], now=NOW) == 2
+    assert rollups.fold(events, now=NOW) == 3
+    assert rollups.fold(events, now=NOW) == 0
+    assert [r['count'] for r in rollups.rows('day')] == [2, 3]
+    assert len(rollups.rows('minute')) == 3
+    assert len(rollups.rows('hour')) == 2
+
+
+def test_query_aggregates(tmp_path):
+    rollups = timeline_rollups.TimelineRollups(tmp_path / 'rollups.json')
+    rollups.fold(_events(), now=NOW)
+    agg = rollups.query(since=NOW - timedelta(days=30), now=NOW)
+    assert agg['level'] == 'day' and agg['count'] == 5
+    assert agg['types']['phrase'] == 2 and agg['types']['reflex_recovery'] == 1
+    assert agg['phrases'] == {'lights on': 2}
+    assert agg['scenes'] == {'evening': {'ok': 1, 'fail': 1}}
+    assert timeline_rollups.scene_success_rate(agg) == 0.5
+    recent = rollups.query(since=NOW - timedelta(minutes=30), now=NOW)
+    assert recent['level'] == 'minute' and recent['count'] == 3
+
+
+def test_prune_keeps_history_in_rollups(tmp_path, monkeypatch):
+    now = datetime.now(timezone.utc)
+    data = [
+        {'timestamp': (now - timedelta(days=2)).isoformat(), 'event': 'scene:morning'},
+        {'timestamp': now.isoformat(), 'event': 'phrase:good night'},
+    ]
+    file = tmp_path / 'memory.json'
+    file.write_text(json.dumps(data))
+    monkeypatch.setattr(memory_manager.MEMORY_STORE, 'path', file)
+    remaining = timeline_orchestrator.prune_older_than(1)
+    assert [e['event'] for e in remaining] == ['phrase:good night']
+    assert timeline_orchestrator.history(7)['count'] == 2
+    summary = timeline_orchestrator.timeline_summary(days=7)
+    assert summary.startswith('2 events in 7d') and 'scene success 100%' in summary
+
+
+def test_fold_keeps_events_sharing_the_cursor_timestamp(tmp_path):
+    rollups = timeline_rollups.TimelineRollups(tmp_path / 'rollups.json')
+    stamp = (NOW - timedelta(minutes=1)).isoformat()
+    events = [{'timestamp': stamp, 'event': 'scene:a'}]
+    assert rollups.fold(events, now=NOW) == 1
+    events.append({'timestamp': stamp, 'event': 'scene:b'})
+    assert rollups.fold(events, now=NOW) == 1
+    assert rollups.fold(events, now=NOW) == 0
+    assert rollups.rows('day')[0]['scenes'] == {'a': {'ok': 1, 'fail': 0}, 'b': {'ok': 1, 'fail': 0}}
+
+
+def test_history_reads_rollups_folded_on_write(tmp_path, monkeypatch):
+    file = tmp_path / 'memory.json'
+    file.write_text('[]')
+    monkeypatch.setattr(memory_manager.MEMORY_STORE, 'path', file)
+    memory_manager.add_event('scene:morning')
+    memory_manager.add_event('phrase:good morning')
+    monkeypatch.setattr(memory_manager, 'load_memory', lambda: (_ for _ in ()).throw(AssertionError('raw read')))
+    agg = timeline_orchestrator.history(1)
+    assert agg['count'] == 2 and agg['types'] == {'scene': 1, 'phrase': 1}
+
+
+def test_folds_are_flushed_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeline_rollups, 'FLUSH_EVENTS', 3)
+    monkeypatch.setattr(timeline_rollups, 'FLUSH_INTERVAL', 3600)
+    path = tmp_path / 'rollups.json'
+    rollups = timeline_rollups.TimelineRollups(path)
+    events = _events()
+    rollups.fold(events[:2], now=NOW)
+    assert not path.exists()
+    assert rollups.query(since=NOW - timedelta(days=30), now=NOW)['count'] == 2
+    rollups.fold(events, now=NOW)
+    assert json.loads(path.read_text())['cursor'] == events[-1]['timestamp']
+    rollups.fold(events + [{'timestamp': NOW.isoformat(), 'event': 'scene:late'}], now=NOW)
+    on_disk = timeline_rollups.TimelineRollups(path)
+    assert on_disk.query(since=NOW - timedelta(days=30), now=NOW)['count'] == 5
+    rollups.flush()
+    assert on_disk.query(since=NOW - timedelta(days=30), now=NOW)['count'] == 6
+
+
+def test_summary_without_days_reads_rollups(tmp_path, monkeypatch):
+    file = tmp_path / 'memory.json'
+    file.write_text('[]')
+    monkeypatch.setattr(memory_manager.MEMORY_STORE, 'path', file)
+    memory_manager.add_event('scene:morning')
+    memory_manager.add_event('phrase:good morning')
+    monkeypatch.setattr(memory_manager, 'load_memory', lambda: (_ for _ in ()).throw(AssertionError('raw read')))
+    summary = timeline_orchestrator.timeline_summary(limit=1)
+    assert summary.startswith('phrase:good morning at ')
+    monkeypatch.undo()
+    monkeypatch.setattr(memory_manager.MEMORY_STORE, 'path', file)
+    memory_manager.reset_memory()
+    assert timeline_orchestrator.timeline_summary() == ''
@@ -0,0 +1,96 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import tracing
+
+spec = importlib.util.spec_from_file_location('addons.sterling_os.main', os.path.join(ROOT, 'addons', 'sterling_os', 'main.py'))
+main = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(main)
+
+
+@pytest.fixture(autouse=True)
+def _clean_buffer():
+    tracing.clear()
+    yield
+    tracing.clear()
+
+
+def test_spans_nest_and_record():
+    @tracing.traced()
+    def work():
+        with tracing.span('inner'):
+            pass
+
+    with tracing.trace('job') as root:
+        work()
+        with pytest.raises(KeyError):
+            with tracing.span('broken'):
+                raise KeyError('x')
+    assert [name for name, _ in root.walk()] == ['work', 'work.inner', 'broken']
+    assert root.children[1].error == 'KeyError'
+    recent = tracing.recent_traces()
+    assert recent[0]['name'] == 'job'
+    assert recent[0]['children'][0]['children'][0]['name'] == 'inner'
+
+
+def test_span_is_noop_without_trace():
+    with tracing.span('orphan') as s:
+        assert s is None
+    assert tracing.current_span() is None
+    assert tracing.recent_traces() == []
+
+
+def test_ring_buffer_is_bounded(monkeypatch):
+    from collections import deque
+    monkeypatch.setattr(tracing, '_TRACES', deque(maxlen=3))
+    for i in range(5):
+        with tracing.trace(f't{i}'):
+            with tracing.span('stage'):
+                pass
+    assert [t['name'] for t in tracing.recent_traces()] == ['t4', 't3', 't2']
+
+
+def test_timing_header_is_opt_in(tmp_path, monkeypatch):
+    mem_file = tmp_path / 'runtime_memory.json'
+    mem_file.write_text('{}')
+    router = main._cognitive_router()
+    monkeypatch.setattr(router.RUNTIME_STORE, 'path', mem_file)
+    monkeypatch.setattr(router.ROUTER_LOG_STORE, 'path', tmp_path / 'router_log.json')
+    with main.app.test_client() as cl:
+        plain = cl.post('/sterling/route', json={'query': 'show my budget'})
+        assert tracing.TIMING_HEADER not in plain.headers
+        timed = cl.post(
+            '/sterling/route', json={'query': 'show my budget'}, headers={tracing.TIMING_HEADER: '1'}
+        )
+        header = timed.headers[tracing.TIMING_HEADER]
+        traces = cl.get('/sterling/traces?limit=1').get_json()
+    assert header.startswith('total;dur=')
+    for stage in ('handle_request.governance', 'handle_request.reflect'):
+        assert f'{stage};dur=' in header
+    # ':' is not allowed in a metric name; the original goes in desc
+    assert 'handle_request.handler_finance;desc="handle_request.handler:finance";dur=' in header
+    assert traces[0]['name'] == 'POST /sterling/route'
+
+
+def test_failed_request_is_recorded():
+    from flask import Flask
+
+    app = Flask('failing')
+    tracing.init_app(app)
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('broken view')
+
+    with app.test_client() as cl:
+        assert cl.get('/boom').status_code == 500
+    recent = tracing.recent_traces()
+    assert recent[0]['name'] == 'GET /boom'
+    assert recent[0]['error'] == 'RuntimeError'
+    assert tracing.current_span() is None
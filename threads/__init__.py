@@ -1,12 +1,21 @@
-from .timeline_guard import lock_thread, unlock_thread, is_locked
-from .predictive_scheduler import reprioritize, load_registry
+from .timeline_guard import acquire_thread, lock_thread, renew_thread, unlock_thread, is_locked
+from .lease_lock import Lease, LeaseError, LeaseLockManager
+from .predictive_scheduler import ThreadScheduler, dispatch_thread, load_registry, reprioritize, start_scheduler
 from .rollback_engine import rollback_thread
 
 __all__ = [
+    "acquire_thread",
     "lock_thread",
+    "renew_thread",
     "unlock_thread",
     "is_locked",
     "reprioritize",
     "load_registry",
+    "ThreadScheduler",
+    "dispatch_thread",
+    "start_scheduler",
     "rollback_thread",
+    "Lease",
+    "LeaseError",
+    "LeaseLockManager",
 ]
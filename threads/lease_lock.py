@@ -0,0 +1,294 @@
+"""Lease-based locks for sovereign scene threads.
+
+Leases live in a small SQLite database so acquisition is a single atomic
+compare-and-set shared by every worker process: a lease is granted when the
+name is free, its previous lease expired, or the caller already owns it.
+Each grant carries an owner id, an expiry (wall clock, so it is comparable
+across processes) and a fencing ``token`` that increases on every new grant.
+A crashed holder simply stops renewing and its lease lapses after ``ttl``.
+
+Within a process, :meth:`LeaseLockManager.acquire` queues async waiters in
+FIFO order and wakes the next one on release; holders in other processes are
+noticed by polling with backoff bounded by the current lease's expiry.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional
+
+DEFAULT_TTL = 30.0
+MAX_POLL = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    token INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class LeaseError(Exception):
+    """Raised when a lease cannot be acquired."""
+
+
+@dataclass(frozen=True, slots=True)
+class Lease:
+    name: str
+    owner: str
+    token: int
+    expires_at: float
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.time())
+
+
+def default_owner() -> str:
+    """Owner id unique to this host and process.
+
+    Any thread of the process may release a lease taken with the default
+    owner; pass ``owner`` explicitly to tell holders in one process apart.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseLockManager:
+    """Atomic, expiring, owner-tagged locks stored in ``path``."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+        self._waiters: Dict[str, Deque[list]] = {}
+        self._waiters_lock = threading.Lock()
+
+    # -- storage ----------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    # -- primitives -------------------------------------------------------
+    def try_acquire(self, name: str, owner: str | None = None, ttl: float = DEFAULT_TTL) -> Optional[Lease]:
+        """Grant ``name`` to ``owner`` without waiting; ``None`` if held.
+
+        Re-acquiring a lease you already own extends it and keeps its token.
+        """
+        owner = owner or default_owner()
+        now = time.time()
+        conn = self._conn()
+        with _transaction(conn):
+            conn.execute(
+                "INSERT INTO leases (name, owner, token, expires_at) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(name) DO UPDATE SET "
+                "token = CASE WHEN leases.owner = excluded.owner THEN leases.token ELSE leases.token + 1 END, "
+                "owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (name, owner, now + ttl, now),
+            )
+            row = conn.execute(
+                "SELECT owner, token, expires_at FROM leases WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None or row[0] != owner:
+            return None
+        return Lease(name, owner, row[1], row[2])
+
+    def renew(self, name: str, owner: str | None = None, ttl: float = DEFAULT_TTL) -> Optional[Lease]:
+        """Extend a live lease held by ``owner``; ``None`` if it was lost."""
+        owner = owner or default_owner()
+        now = time.time()
+        conn = self._conn()
+        with _transaction(conn):
+            cur = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE name = ? AND owner = ? AND expires_at > ?",
+                (now + ttl, name, owner, now),
+            )
+            if not cur.rowcount:
+                return None
+            token = conn.execute("SELECT token FROM leases WHERE name = ?", (name,)).fetchone()[0]
+        return Lease(name, owner, token, now + ttl)
+
+    def release(self, name: str, owner: str | None = None, force: bool = False) -> bool:
+        """Drop the lease if ``owner`` holds it (or unconditionally with ``force``)."""
+        conn = self._conn()
+        if force:
+            cur = conn.execute("DELETE FROM leases WHERE name = ?", (name,))
+        else:
+            cur = conn.execute(
+                "DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner or default_owner())
+            )
+        released = bool(cur.rowcount)
+        if released:
+            self._wake(name)
+        return released
+
+    def purge(self, prefix: str) -> int:
+        """Delete expired leases whose name starts with ``prefix``.
+
+        Only for one-shot names (such as scheduler slots) that are never
+        reused; dropping a reusable lease would restart its fencing tokens.
+        """
+        cur = self._conn().execute(
+            "DELETE FROM leases WHERE substr(name, 1, ?) = ? AND expires_at <= ?",
+            (len(prefix), prefix, time.time()),
+        )
+        return cur.rowcount
+
+    def holder(self, name: str) -> Optional[Lease]:
+        """Return the live lease on ``name``, if any."""
+        row = self._conn().execute(
+            "SELECT owner, token, expires_at FROM leases WHERE name = ? AND expires_at > ?",
+            (name, time.time()),
+        ).fetchone()
+        return Lease(name, row[0], row[1], row[2]) if row else None
+
+    def held(self) -> List[Lease]:
+        rows = self._conn().execute(
+            "SELECT name, owner, token, expires_at FROM leases WHERE expires_at > ? ORDER BY name",
+            (time.time(),),
+        ).fetchall()
+        return [Lease(*row) for row in rows]
+
+    # -- waiting ----------------------------------------------------------
+    def _wake(self, name: str) -> None:
+        with self._waiters_lock:
+            queue = self._waiters.get(name)
+            if not queue:
+                return
+            loop, future = queue[0]
+        loop.call_soon_threadsafe(_resolve, future)
+
+    async def acquire(
+        self,
+        name: str,
+        owner: str | None = None,
+        ttl: float = DEFAULT_TTL,
+        timeout: float | None = None,
+    ) -> Lease:
+        """Wait for ``name`` in FIFO order with other local waiters.
+
+        Raises :class:`LeaseError` if ``timeout`` seconds pass first.
+        """
+        owner = owner or default_owner()
+        lease = None
+        with self._waiters_lock:
+            queue = self._waiters.setdefault(name, deque())
+            if not queue:
+                lease = self.try_acquire(name, owner, ttl)
+        if lease is not None:
+            return lease
+        loop = asyncio.get_running_loop()
+        entry = [loop, loop.create_future()]
+        with self._waiters_lock:
+            queue.append(entry)
+        deadline = None if timeout is None else loop.time() + timeout
+        poll = 0.01
+        try:
+            while True:
+                if queue[0] is entry:
+                    lease = self.try_acquire(name, owner, ttl)
+                    if lease is not None:
+                        return lease
+                wait = poll
+                current = self.holder(name)
+                if current is not None:
+                    wait = min(wait, max(current.remaining, 0.001))
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise LeaseError(f"Timed out waiting for lease on {name!r}")
+                    wait = min(wait, remaining)
+                try:
+                    await asyncio.wait_for(asyncio.shield(entry[1]), wait)
+                except asyncio.TimeoutError:
+                    poll = min(poll * 2, MAX_POLL)
+                else:
+                    poll = 0.01
+                if entry[1].done():
+                    entry[1] = loop.create_future()
+        finally:
+            with self._waiters_lock:
+                queue.remove(entry)
+                if not queue:
+                    self._waiters.pop(name, None)
+            # let the next local waiter try straight away
+            self._wake(name)
+
+    @contextmanager
+    def lease(self, name: str, owner: str | None = None, ttl: float = DEFAULT_TTL) -> Iterator[Lease]:
+        """Hold ``name`` for the block or raise :class:`LeaseError` if busy."""
+        lease = self.try_acquire(name, owner, ttl)
+        if lease is None:
+            raise LeaseError(f"Lease on {name!r} is held by another owner")
+        try:
+            yield lease
+        finally:
+            self.release(name, lease.owner)
+
+    @asynccontextmanager
+    async def hold(self, name: str, owner: str | None = None, ttl: float = DEFAULT_TTL, timeout: float | None = None):
+        """Wait for ``name`` and keep renewing it until the block exits."""
+        lease = await self.acquire(name, owner, ttl, timeout)
+
+        async def keep_alive() -> None:
+            while True:
+                await asyncio.sleep(ttl / 3)
+                if self.renew(name, lease.owner, ttl) is None:
+                    return
+
+        renewer = asyncio.create_task(keep_alive())
+        try:
+            yield lease
+        finally:
+            renewer.cancel()
+            self.release(name, lease.owner)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _transaction:
+    """``BEGIN IMMEDIATE`` … ``COMMIT`` so the CAS and its read-back are atomic."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+_MANAGERS: Dict[Path, LeaseLockManager] = {}
+
+
+def get_manager(path: Path) -> LeaseLockManager:
+    """Return the shared manager for the database at ``path``."""
+    path = Path(path)
+    manager = _MANAGERS.get(path)
+    if manager is None:
+        manager = _MANAGERS.setdefault(path, LeaseLockManager(path))
+    return manager
+
+
+__all__ = ["DEFAULT_TTL", "Lease", "LeaseError", "LeaseLockManager", "default_owner", "get_manager"]
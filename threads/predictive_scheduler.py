@@ -1,12 +1,66 @@
-"""Predictive scheduler for thread reprioritization."""
+"""Predictive scheduler for thread reprioritization and execution.
+
+:func:`reprioritize` orders registered threads for display.
+:class:`ThreadScheduler` actually runs them.  Thread definitions come from
+``thread_registry.json``; an entry may carry any of:
+
+* ``"every"``: an interval in seconds;
+* ``"cron"``: a five-field cron expression (minute hour day month weekday);
+* ``"deadline"``: seconds after the scheduled time by which a run must
+  finish; a run that cannot start in time is recorded as ``missed``;
+* ``"target"``: ``"module:function"`` to call, with keyword ``"args"``; or
+* ``"command"``: a request dispatched through ``cognitive_router``.
+
+:func:`dispatch_thread` runs an entry's ``target`` or ``command`` and is the
+default runner.  :func:`start_scheduler` builds the process-wide scheduler
+from the registry and starts it; the Sterling OS add-on calls it from a
+:mod:`startup` hook.
+
+Definitions are loaded once into a heap keyed by next run time.  A dispatcher
+thread sleeps until the earliest entry is due rather than polling the file;
+call :meth:`ThreadScheduler.reload` after editing the registry.  Due threads
+are ordered earliest-deadline first, then by their observed average
+duration (shortest first), and run on a bounded worker pool.
+
+Every worker process runs its own scheduler, so a run first claims its slot
+(thread name plus scheduled minute, or interval number counted from the
+epoch) as a one-shot lease; a slot already claimed elsewhere is skipped as
+``claimed``.  The run then holds the thread's :mod:`timeline_guard` lease,
+renewed while it executes, so a thread locked by another caller is skipped.
+A failed run is handed to :func:`rollback_engine.rollback_thread`.
+"""
 from __future__ import annotations
 
+import heapq
+import itertools
 import json
+import logging
+import math
+import os
+import threading
+import time
+from importlib import import_module
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional, Set
+
+try:
+    from . import rollback_engine, timeline_guard
+    from .lease_lock import default_owner
+except ImportError:  # pragma: no cover - loaded outside the package
+    from threads import rollback_engine, timeline_guard
+    from threads.lease_lock import default_owner
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent
 REGISTRY_FILE = BASE_DIR / "thread_registry.json"
+# weight of the newest run in the moving average of run durations
+DURATION_ALPHA = 0.3
+# shortest thread lease a run takes; it is renewed every third of its ttl
+MIN_LEASE_TTL = 30.0
 
 
 def load_registry() -> Dict[str, Dict]:
@@ -18,11 +72,397 @@ def load_registry() -> Dict[str, Dict]:
     return {}
 
 
+def dispatch_thread(name: str) -> Any:
+    """Run registry thread ``name`` through its ``target`` or ``command``."""
+    entry = load_registry().get(name)
+    if entry is None:
+        raise KeyError(f"Unknown thread {name!r}")
+    target = entry.get("target")
+    if target:
+        module_name, _, attr = target.partition(":")
+        return getattr(import_module(module_name), attr)(**entry.get("args", {}))
+    command = entry.get("command")
+    if command:
+        import cognitive_router
+
+        return cognitive_router.handle_request(command, origin=f"thread:{name}")
+    raise LookupError(f"Thread {name!r} has no 'target' or 'command' to run")
+
+
 def reprioritize() -> List[str]:
     data = load_registry()
-    # simple sort by locked status then last executed (older first)
+    # sort by locked status then last executed (older first); observed run
+    # time breaks ties so quick threads go first
     threads = list(data.items())
-    threads.sort(key=lambda item: (item[1].get("locked", False), item[1].get("last_executed", "")))
+    threads.sort(
+        key=lambda item: (
+            item[1].get("locked", False),
+            item[1].get("last_executed", ""),
+            item[1].get("avg_duration_ms", 0.0),
+        )
+    )
     return [name for name, _ in threads]
 
-__all__ = ["load_registry", "reprioritize", "REGISTRY_FILE"]
+
+# -- cron -------------------------------------------------------------------
+def _parse_field(spec: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part in ("*", ""):
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Cron field {spec!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """Standard five-field cron expression evaluated in UTC."""
+
+    expression: str
+    minutes: frozenset = field(init=False)
+    hours: frozenset = field(init=False)
+    days: frozenset = field(init=False)
+    months: frozenset = field(init=False)
+    weekdays: frozenset = field(init=False)
+    any_day: bool = field(init=False)
+    any_weekday: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        parts = self.expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expected 5 cron fields, got {self.expression!r}")
+        set_ = object.__setattr__
+        set_(self, "minutes", frozenset(_parse_field(parts[0], 0, 59)))
+        set_(self, "hours", frozenset(_parse_field(parts[1], 0, 23)))
+        set_(self, "days", frozenset(_parse_field(parts[2], 1, 31)))
+        set_(self, "months", frozenset(_parse_field(parts[3], 1, 12)))
+        # 0 and 7 are both Sunday
+        set_(self, "weekdays", frozenset(d % 7 for d in _parse_field(parts[4], 0, 7)))
+        set_(self, "any_day", parts[2] == "*")
+        set_(self, "any_weekday", parts[4] == "*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        # cron semantics: restricted day-of-month and weekday are OR'ed
+        return day_ok or weekday_ok
+
+    def next_after(self, after: float) -> float:
+        """Return the first matching minute strictly after epoch ``after``."""
+        moment = datetime.fromtimestamp(after, timezone.utc).replace(second=0, microsecond=0)
+        moment += timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+
+# -- scheduler ----------------------------------------------------------------
+@dataclass
+class Job:
+    name: str
+    every: Optional[float] = None
+    cron: Optional[CronSchedule] = None
+    deadline: Optional[float] = None
+    next_run: float = 0.0
+    avg_duration: Optional[float] = None
+    runs: int = 0
+    failures: int = 0
+    last_status: Optional[str] = None
+
+    def following(self, now: float) -> float:
+        """Next run after ``now``; missed interval slots are skipped."""
+        if self.cron is not None:
+            return self.cron.next_after(now)
+        slots = math.floor((now - self.next_run) / self.every) + 1
+        return self.next_run + max(1, slots) * self.every
+
+    def priority(self) -> tuple:
+        deadline_at = self.next_run + self.deadline if self.deadline is not None else math.inf
+        return (deadline_at, self.avg_duration or 0.0)
+
+
+class ThreadScheduler:
+    """Run registered threads on interval or cron schedules."""
+
+    def __init__(
+        self,
+        runner: Callable[[str], Any] | None = None,
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.time,
+        owner: str | None = None,
+    ) -> None:
+        self.runner = runner or dispatch_thread
+        self.max_workers = max_workers
+        self.clock = clock
+        self.owner = owner or f"{default_owner()}:scheduler"
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._running = False
+        self._active: Set[str] = set()
+
+    # -- definitions ------------------------------------------------------
+    def add(
+        self,
+        name: str,
+        every: float | None = None,
+        cron: str | None = None,
+        deadline: float | None = None,
+        start: float | None = None,
+    ) -> Job:
+        if (every is None) == (cron is None):
+            raise ValueError("Give exactly one of 'every' or 'cron'")
+        if every is not None and not every > 0:
+            raise ValueError(f"'every' must be a positive number of seconds, got {every!r}")
+        job = Job(name, every=every, cron=CronSchedule(cron) if cron else None, deadline=deadline)
+        previous = self.jobs.get(name)
+        if previous is not None:
+            job.avg_duration, job.runs, job.failures = previous.avg_duration, previous.runs, previous.failures
+        now = self.clock() if start is None else start
+        job.next_run = job.cron.next_after(now) if job.cron is not None else now
+        with self._cond:
+            self.jobs[name] = job
+            heapq.heappush(self._heap, (job.next_run, next(self._seq), name))
+            self._cond.notify()
+        return job
+
+    def reload(self) -> int:
+        """(Re)load schedulable threads from the registry; return how many."""
+        count = 0
+        for name, entry in load_registry().items():
+            every, cron = entry.get("every"), entry.get("cron")
+            if every is None and cron is None:
+                continue
+            try:
+                job = self.add(name, every=every, cron=cron, deadline=entry.get("deadline"))
+            except (TypeError, ValueError) as exc:
+                logger.warning("Skipping thread %s: %s", name, exc)
+                continue
+            if job.avg_duration is None and entry.get("avg_duration_ms") is not None:
+                job.avg_duration = entry["avg_duration_ms"] / 1000
+            count += 1
+        return count
+
+    # -- dispatch ---------------------------------------------------------
+    def _due(self, now: float) -> List[Job]:
+        ready = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                due, _, name = heapq.heappop(self._heap)
+                job = self.jobs.get(name)
+                # stale heap entries left by ``add`` replacing a job
+                if job is None or job.next_run != due:
+                    continue
+                ready.append(job)
+        ready.sort(key=Job.priority)
+        return ready
+
+    def _reschedule(self, job: Job, now: float) -> None:
+        following = job.following(now)
+        job.next_run = following
+        with self._cond:
+            heapq.heappush(self._heap, (following, next(self._seq), job.name))
+            self._cond.notify()
+
+    def run_pending(self, now: float | None = None) -> List[Future]:
+        """Dispatch every due job; return futures for the runs started."""
+        now = self.clock() if now is None else now
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="sterling-thread")
+        futures = []
+        for job in self._due(now):
+            scheduled = job.next_run
+            self._reschedule(job, now)
+            if job.deadline is not None and self.clock() > scheduled + job.deadline:
+                self._finish(job, "missed", None)
+                continue
+            if job.name in self._active:
+                self._finish(job, "overlap", None)
+                continue
+            self._slots.acquire()
+            self._active.add(job.name)
+            futures.append(self._pool.submit(self._execute, job, scheduled))
+        return futures
+
+    def _claim_slot(self, job: Job, scheduled: float, ttl: float) -> bool:
+        """Claim this run's slot so other schedulers skip it."""
+        if job.every is not None:
+            # counted from the epoch so schedulers started at different
+            # times agree on which interval a run belongs to
+            slot, period = math.floor(scheduled / job.every), job.every
+        else:
+            slot, period = int(scheduled), 60.0
+        manager = timeline_guard.lock_manager()
+        manager.purge(f"{job.name}@")
+        lease = manager.try_acquire(f"{job.name}@{slot}", self.owner, ttl=max(ttl, 2 * period))
+        return lease is not None
+
+    def _run_leased(self, job: Job, ttl: float) -> None:
+        """Call the runner, renewing the thread lease until it returns."""
+        done = threading.Event()
+
+        def keep_alive() -> None:
+            while not done.wait(ttl / 3):
+                if not timeline_guard.renew_thread(job.name, owner=self.owner, ttl=ttl):
+                    logger.warning("Lost the lease on thread %s mid-run", job.name)
+                    return
+
+        renewer = threading.Thread(target=keep_alive, name=f"sterling-lease-{job.name}", daemon=True)
+        renewer.start()
+        try:
+            self.runner(job.name)
+        finally:
+            done.set()
+            renewer.join()
+
+    def _execute(self, job: Job, scheduled: float) -> str:
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            ttl = max(MIN_LEASE_TTL, job.deadline or 0.0, 3 * (job.avg_duration or 0.0))
+            if not self._claim_slot(job, scheduled, ttl):
+                status = "claimed"
+                return status
+            if timeline_guard.acquire_thread(job.name, owner=self.owner, ttl=ttl) is None:
+                status = "locked"
+                return status
+            try:
+                self._run_leased(job, ttl)
+            except Exception:
+                status = "failed"
+                logger.exception("Thread %s failed; rolling back", job.name)
+                rollback_engine.rollback_thread(job.name)
+            finally:
+                timeline_guard.unlock_thread(job.name, owner=self.owner)
+            if status == "ok" and job.deadline is not None and self.clock() > scheduled + job.deadline:
+                status = "late"
+            return status
+        finally:
+            elapsed = None if status in ("claimed", "locked") else time.perf_counter() - started
+            self._finish(job, status, elapsed)
+            self._active.discard(job.name)
+            self._slots.release()
+
+    def _finish(self, job: Job, status: str, elapsed: Optional[float]) -> None:
+        job.last_status = status
+        if status == "failed":
+            job.failures += 1
+        if elapsed is None:
+            return
+        job.runs += 1
+        job.avg_duration = (
+            elapsed if job.avg_duration is None
+            else DURATION_ALPHA * elapsed + (1 - DURATION_ALPHA) * job.avg_duration
+        )
+        timeline_guard.update_thread(
+            job.name,
+            last_executed=datetime.now(timezone.utc).isoformat(),
+            avg_duration_ms=round(job.avg_duration * 1000, 3),
+            last_status=status,
+        )
+
+    # -- daemon -----------------------------------------------------------
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    timeout = self._heap[0][0] - self.clock() if self._heap else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Scheduler sweep failed")
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._dispatcher = threading.Thread(target=self._loop, name="sterling-scheduler", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self, wait: bool = True) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._dispatcher is not None and wait:
+            self._dispatcher.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": job.name,
+                "next_run": datetime.fromtimestamp(job.next_run, timezone.utc).isoformat(),
+                "avg_duration_ms": round(job.avg_duration * 1000, 3) if job.avg_duration else None,
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_status": job.last_status,
+            }
+            for job in sorted(self.jobs.values(), key=lambda j: j.next_run)
+        ]
+
+
+_SCHEDULER: Optional[ThreadScheduler] = None
+_SCHEDULER_PID: Optional[int] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def start_scheduler() -> ThreadScheduler:
+    """Load the registry into the process-wide scheduler and start it.
+
+    A forked child gets a scheduler of its own; the parent's dispatcher
+    thread does not survive the fork.
+    """
+    global _SCHEDULER, _SCHEDULER_PID
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None or _SCHEDULER_PID != os.getpid():
+            _SCHEDULER, _SCHEDULER_PID = ThreadScheduler(), os.getpid()
+            count = _SCHEDULER.reload()
+            logger.info("Thread scheduler started with %d scheduled threads", count)
+        _SCHEDULER.start()
+        return _SCHEDULER
+
+
+__all__ = [
+    "load_registry",
+    "reprioritize",
+    "REGISTRY_FILE",
+    "CronSchedule",
+    "ThreadScheduler",
+    "dispatch_thread",
+    "start_scheduler",
+]
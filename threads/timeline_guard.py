@@ -1,47 +1,137 @@
-"""Thread lock management for sovereign scenes."""
+"""Thread lock management for sovereign scenes.
+
+Thread metadata lives in ``thread_registry.json`` and is cached in memory;
+the file is re-read only when it changes on disk and rewritten only when a
+lock writer flips a thread's ``locked`` flag.  Exclusion itself comes from
+leases in ``thread_locks.db`` (see :mod:`threads.lease_lock`), so locks have
+an owner, expire when a holder dies and are atomic across worker processes.
+"""
 from __future__ import annotations
 
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+
+try:
+    from .lease_lock import DEFAULT_TTL, Lease, LeaseLockManager, get_manager
+except ImportError:  # pragma: no cover - loaded outside the package
+    from threads.lease_lock import DEFAULT_TTL, Lease, LeaseLockManager, get_manager
 
 BASE_DIR = Path(__file__).resolve().parent
 REGISTRY_FILE = BASE_DIR / "thread_registry.json"
+LOCK_DB_NAME = "thread_locks.db"
+
+_cache: Dict[str, object] = {"path": None, "signature": None, "data": {}}
+_cache_lock = threading.RLock()
+
+
+def _signature(path: Path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
 
 def _load() -> Dict[str, Dict]:
-    if REGISTRY_FILE.exists():
-        try:
-            return json.loads(REGISTRY_FILE.read_text())
-        except Exception:
-            return {}
-    return {}
+    path = REGISTRY_FILE
+    signature = _signature(path)
+    with _cache_lock:
+        if _cache["path"] == path and _cache["signature"] == signature:
+            return _cache["data"]
+        data: Dict[str, Dict] = {}
+        if signature is not None:
+            try:
+                data = json.loads(path.read_text())
+            except Exception:
+                data = {}
+        _cache.update(path=path, signature=signature, data=data)
+        return data
 
 
 def _save(data: Dict[str, Dict]) -> None:
-    REGISTRY_FILE.write_text(json.dumps(data, indent=2))
+    # replace atomically so concurrent readers never see a partial file
+    tmp = REGISTRY_FILE.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, REGISTRY_FILE)
+    with _cache_lock:
+        _cache.update(path=REGISTRY_FILE, signature=_signature(REGISTRY_FILE), data=data)
+
+
+def _set_flag(name: str, locked: bool) -> None:
+    with _cache_lock:
+        data = _load()
+        entry = data.get(name)
+        if entry is not None and bool(entry.get("locked")) != locked:
+            entry["locked"] = locked
+            _save(data)
+
 
+def update_thread(name: str, **fields) -> bool:
+    """Merge ``fields`` into a registered thread, writing only on change."""
+    with _cache_lock:
+        data = _load()
+        entry = data.get(name)
+        if entry is None:
+            return False
+        changed = {k: v for k, v in fields.items() if entry.get(k) != v}
+        if changed:
+            entry.update(changed)
+            _save(data)
+    return True
 
-def lock_thread(name: str) -> bool:
-    data = _load()
-    if name in data:
-        data[name]["locked"] = True
-        _save(data)
-        return True
-    return False
 
+def lock_manager() -> LeaseLockManager:
+    """Return the lease manager stored next to the registry."""
+    return get_manager(REGISTRY_FILE.with_name(LOCK_DB_NAME))
 
-def unlock_thread(name: str) -> bool:
-    data = _load()
-    if name in data:
-        data[name]["locked"] = False
-        _save(data)
-        return True
-    return False
+
+def acquire_thread(name: str, owner: str | None = None, ttl: float = DEFAULT_TTL) -> Optional[Lease]:
+    """Try to lease a registered thread; ``None`` if unknown or held."""
+    if name not in _load():
+        return None
+    lease = lock_manager().try_acquire(name, owner, ttl)
+    if lease is not None:
+        _set_flag(name, True)
+    return lease
+
+
+def lock_thread(name: str, owner: str | None = None, ttl: float = DEFAULT_TTL) -> bool:
+    return acquire_thread(name, owner, ttl) is not None
+
+
+def renew_thread(name: str, owner: str | None = None, ttl: float = DEFAULT_TTL) -> bool:
+    return lock_manager().renew(name, owner, ttl) is not None
+
+
+def unlock_thread(name: str, owner: str | None = None, force: bool = False) -> bool:
+    """Release ``name``; only its owner may unless ``force`` is set."""
+    if name not in _load():
+        return False
+    manager = lock_manager()
+    if not manager.release(name, owner, force=force) and manager.holder(name) is not None:
+        return False
+    _set_flag(name, False)
+    return True
 
 
 def is_locked(name: str) -> bool:
-    data = _load()
-    return bool(data.get(name, {}).get("locked"))
+    """Return whether a live lease is held; the registry flag is not consulted.
+
+    This is a read-only query.  A flag left stale by a lapsed lease is
+    corrected by the next :func:`acquire_thread` or :func:`unlock_thread`.
+    """
+    return lock_manager().holder(name) is not None
 
-__all__ = ["lock_thread", "unlock_thread", "is_locked", "REGISTRY_FILE"]
+__all__ = [
+    "acquire_thread",
+    "lock_thread",
+    "renew_thread",
+    "unlock_thread",
+    "update_thread",
+    "is_locked",
+    "lock_manager",
+    "REGISTRY_FILE",
+]
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+"""Lightweight per-request latency tracing.
+
+A trace is a tree of :class:`Span` objects timed with the monotonic
+``perf_counter`` clock.  :func:`init_app` opens a trace around every Flask
+request; code inside the request marks its stages with the :func:`span`
+context manager or the :func:`traced` decorator.  Outside a trace both are
+no-ops, so instrumented modules cost nothing when called from scripts or
+tests.
+
+Finished traces that contain stages, failed or were slow are kept in a ring
+buffer readable through :func:`recent_traces` and ``GET /sterling/traces``.
+A request's trace is closed in ``teardown_request``, so requests whose view
+raised are recorded too.  Clients opt in to a per-request breakdown by
+sending ``X-Sterling-Timing: 1`` (or the server sets ``STERLING_TIMING=1``);
+the response then carries an ``X-Sterling-Timing`` header in
+``Server-Timing`` syntax.  Stage names that are not valid metric tokens
+(``handler:general``) are sent with ``_`` in place of the offending
+characters and the original name as the metric's ``desc``.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import functools
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TIMING_HEADER = "X-Sterling-Timing"
+TRACE_BUFFER = int(os.getenv("STERLING_TRACE_BUFFER", "200"))
+SLOW_REQUEST_MS = float(os.getenv("STERLING_SLOW_MS", "1000"))
+
+_current: ContextVar[Optional["Span"]] = ContextVar("sterling_span", default=None)
+_TRACES: Deque["Trace"] = deque(maxlen=TRACE_BUFFER)
+_LOCK = threading.Lock()
+# characters outside an RFC 7230 token, which Server-Timing metric names must be
+_NON_TOKEN = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]")
+
+
+@dataclass(slots=True)
+class Span:
+    """One timed stage; ``children`` are the stages nested inside it."""
+
+    name: str
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    children: List["Span"] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def walk(self, prefix: str = "") -> Iterator[Tuple[str, "Span"]]:
+        """Yield ``(dotted_name, span)`` for every descendant, depth first."""
+        for child in self.children:
+            name = f"{prefix}{child.name}"
+            yield name, child
+            yield from child.walk(f"{name}.")
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"name": self.name, "ms": round(self.duration_ms, 3)}
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [c.as_dict() for c in self.children]
+        return data
+
+
+@dataclass(slots=True)
+class Trace:
+    """A finished request trace."""
+
+    name: str
+    root: Span
+    timestamp: str
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+    def stages(self) -> List[Tuple[str, float]]:
+        return [(name, s.duration_ms) for name, s in self.root.walk()]
+
+    def header_value(self) -> str:
+        parts = [f"total;dur={self.duration_ms:.2f}"]
+        parts += [_timing_metric(name, ms) for name, ms in self.stages()]
+        return ", ".join(parts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = self.root.as_dict()
+        data.update(name=self.name, timestamp=self.timestamp)
+        return data
+
+
+def _timing_metric(name: str, ms: float) -> str:
+    token = _NON_TOKEN.sub("_", name)
+    if token == name:
+        return f"{token};dur={ms:.2f}"
+    desc = name.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{token};desc="{desc}";dur={ms:.2f}'
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as a child of the current span.
+
+    Yields ``None`` without timing anything when no trace is active.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name)
+    parent.children.append(child)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = type(exc).__name__
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current.reset(token)
+
+
+def traced(name: str | None = None) -> Callable[[Callable], Callable]:
+    """Decorator form of :func:`span`; defaults to the function name."""
+
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _record(trace: Trace) -> None:
+    slow = trace.duration_ms >= SLOW_REQUEST_MS
+    if slow:
+        stages = ", ".join(f"{n}={ms:.1f}ms" for n, ms in trace.stages()) or "no stages"
+        logger.warning("Slow request %s took %.1f ms (%s)", trace.name, trace.duration_ms, stages)
+    if trace.root.children or trace.root.error or slow:
+        with _LOCK:
+            _TRACES.append(trace)
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Span]:
+    """Open a root span, recording the finished trace in the ring buffer."""
+    root = Span(name)
+    token = _current.set(root)
+    try:
+        yield root
+    finally:
+        root.end = time.perf_counter()
+        _current.reset(token)
+        _record(Trace(name, root, datetime.now(timezone.utc).isoformat()))
+
+
+def recent_traces(limit: int | None = None) -> List[Dict[str, Any]]:
+    """Return the most recent traces, newest first."""
+    with _LOCK:
+        traces = list(_TRACES)
+    traces.reverse()
+    return [t.as_dict() for t in traces[:limit]]
+
+
+def clear() -> None:
+    with _LOCK:
+        _TRACES.clear()
+
+
+# -- Flask integration ----------------------------------------------------
+def _timing_requested(request) -> bool:
+    if os.getenv("STERLING_TIMING") == "1":
+        return True
+    return request.headers.get(TIMING_HEADER, "").lower() in {"1", "true", "yes", "on"}
+
+
+def _begin_request() -> None:
+    from flask import g, request
+
+    root = Span(f"{request.method} {request.path}")
+    g._sterling_trace = (root, _current.set(root))
+
+
+def _timing_header(response):
+    from flask import g, request
+
+    state = g.get("_sterling_trace")
+    if state is not None and _timing_requested(request):
+        root = state[0]
+        response.headers[TIMING_HEADER] = Trace(root.name, root, "").header_value()
+    return response
+
+
+def _finish_request(exc: BaseException | None = None) -> None:
+    from flask import g
+
+    state = g.pop("_sterling_trace", None)
+    if state is None:
+        return
+    root, token = state
+    root.end = time.perf_counter()
+    if exc is not None:
+        root.error = type(exc).__name__
+    try:
+        _current.reset(token)
+    except ValueError:  # reset from a different context; just detach
+        _current.set(None)
+    _record(Trace(root.name, root, datetime.now(timezone.utc).isoformat()))
+
+
+def _traces_view():
+    from flask import jsonify, request
+
+    limit = request.args.get("limit", type=int)
+    return jsonify(recent_traces(limit))
+
+
+def init_app(app) -> None:
+    """Trace every request of ``app`` and expose ``GET /sterling/traces``."""
+    app.before_request(_begin_request)
+    app.after_request(_timing_header)
+    app.teardown_request(_finish_request)
+    app.add_url_rule("/sterling/traces", "sterling_traces", _traces_view, methods=["GET"])
+
+
+__all__ = [
+    "Span",
+    "Trace",
+    "TIMING_HEADER",
+    "clear",
+    "current_span",
+    "init_app",
+    "recent_traces",
+    "span",
+    "trace",
+    "traced",
+]
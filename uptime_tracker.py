@@ -5,8 +5,10 @@ import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from build_info import get_build_info
+from startup import on_startup
+
 LOG_DIR = Path('logs')
-LOG_DIR.mkdir(exist_ok=True)
 STATE_FILE = LOG_DIR / 'uptime.json'
 HEARTBEAT_FILE = LOG_DIR / 'heartbeat.json'
 
@@ -17,11 +19,7 @@ _state = {
 }
 
 def _current_commit():
-    import subprocess
-    try:
-        return subprocess.check_output(['git', 'rev-parse', 'HEAD']).decode().strip()
-    except Exception:
-        return 'unknown'
+    return get_build_info().commit
 
 def record_start():
     now = datetime.now(timezone.utc).isoformat()
@@ -35,6 +33,7 @@ def record_start():
             'time_restarted': None,
         }
     data['last_commit_hash'] = _current_commit()
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
     STATE_FILE.write_text(json.dumps(data))
     _state.update(data)
 
@@ -68,6 +67,7 @@ def heartbeat(verbose=False):
 
 def log_heartbeat():
     data = heartbeat()
+    HEARTBEAT_FILE.parent.mkdir(parents=True, exist_ok=True)
     HEARTBEAT_FILE.write_text(json.dumps(data))
     print(json.dumps(data))
 
@@ -82,6 +82,13 @@ def start_heartbeat_logger(interval=60):
     t = threading.Thread(target=loop, daemon=True)
     t.start()
 
-load_state()
-record_start()
-start_heartbeat_logger(float(os.getenv('HEARTBEAT_INTERVAL', '60')))
+@on_startup
+def start():
+    """Record this process start and launch the heartbeat logger.
+
+    Runs once per process through :func:`startup.run_startup_hooks` rather
+    than at import time.
+    """
+    load_state()
+    record_start()
+    start_heartbeat_logger(float(os.getenv('HEARTBEAT_INTERVAL', '60')))